@@ -1,8 +1,17 @@
+# Dependencies:
+# pip install numpy
+
 import csv
 import os
+import sys
+import json
 import collections
 import re
+from html import escape
 from datetime import datetime
+from matcher import build_matcher
+from keyword_store import KeywordStore, STORE_FILE
+from clustering import cluster_keywords
 
 # ==========================================
 # 🔧 配置区域
@@ -18,6 +27,9 @@ INTENT_RULES = {
     '🆚 对比 (Competitor)': ['vs', 'alternative', 'better than', 'review', 'comparison', '对比', '替代', '好用', '评价']
 }
 
+# 意图词表编译成一个 Aho–Corasick 自动机，每个关键词只扫一遍
+INTENT_MATCHER = build_matcher(INTENT_RULES)
+
 # 停用词表 (用于生成右侧热词榜，不影响主表格显示)
 STOP_WORDS = {
     'for', 'to', 'in', 'on', 'with', 'the', 'a', 'an', 'of', 'and', 'or', 'is', 'are', 
@@ -30,34 +42,27 @@ STOP_WORDS = {
 # 🛠️ 核心功能函数
 # ==========================================
 
+def iter_raw_data(path=RAW_FILE):
+    """逐行读取 Raw CSV (生成器)，不把整个文件读进内存"""
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+
 def load_raw_data():
     """读取 Raw CSV 文件"""
-    data = []
-    if os.path.exists(RAW_FILE):
-        try:
-            with open(RAW_FILE, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    data.append(row)
-        except Exception as e:
-            print(f"Error reading {RAW_FILE}: {e}")
-    return data
+    return list(iter_raw_data())
 
 def classify_keyword(keyword):
     """对原始关键词进行实时分类"""
-    kw_lower = keyword.lower()
-    intents = []
-    for intent_name, keywords in INTENT_RULES.items():
-        if any(k in kw_lower for k in keywords):
-            intents.append(intent_name)
+    intents = INTENT_MATCHER.match_ordered(keyword, INTENT_RULES)
     return intents if intents else ['ℹ️ 其他 (Info)']
 
-def calculate_heat(keyword, raw_data_list):
-    """计算热度分数 (1-5)"""
-    mentions = [r for r in raw_data_list if r['Keyword'] == keyword]
-    sources = set(r.get('Source', '') for r in mentions)
-    count = len(mentions)
-    
+def calculate_heat(keyword, sources, count):
+    """计算热度分数 (1-5)，sources/count 来自聚合结果，不再回扫原始数据"""
     score = 1
     if 'Google' in sources and 'Bing' in sources: score += 2
     if count > 1: score += 1
@@ -67,33 +72,66 @@ def calculate_heat(keyword, raw_data_list):
 def get_heat_icon(score):
     return "🔥" * score
 
+def tokenize_words(keyword):
+    """热词榜用的分词 (与停用词过滤)"""
+    words = re.findall(r'[\w]+', keyword.lower())
+    return [w for w in words if w not in STOP_WORDS and len(w) > 1 and not w.isdigit()]
+
 def analyze_raw_data(data):
-    """全量分析原始数据"""
-    
-    # 1. 基础统计
-    total_raw = len(data)
-    sources_count = collections.Counter(r.get('Source', 'Unknown') for r in data)
+    """
+    全量分析原始数据 (单次遍历聚合)
+    data 可以是任意行迭代器；每行只访问一次，每个去重关键词只分类、分词一次。
+    """
     
-    # 2. 关键词聚合与热度计算
+    # 1. 单次遍历：基础统计 + 关键词聚合
+    total_raw = 0
+    sources_count = collections.Counter()
     unique_keywords = {}
-    intent_stats = collections.Counter()
     
     for row in data:
+        total_raw += 1
         kw = row['Keyword']
-        if kw not in unique_keywords:
-            unique_keywords[kw] = {
+        source = row.get('Source', 'Unknown')
+        sources_count[source] += 1
+
+        info = unique_keywords.get(kw)
+        if info is None:
+            info = unique_keywords[kw] = {
                 'Keyword': kw,
                 'Sources': set(),
                 'Count': 0,
-                'Intent': classify_keyword(kw)
             }
-        unique_keywords[kw]['Sources'].add(row.get('Source', 'Unknown'))
-        unique_keywords[kw]['Count'] += 1
+        info['Sources'].add(source)
+        info['Count'] += 1
+
+    return summarize_keywords(unique_keywords, total_raw, sources_count)
+
+def analyze_store(store, run_id=None):
+    """
+    直接从关键词库聚合 (GROUP BY 在 SQLite 里完成)，结果与 analyze_raw_data 相同。
+    run_id=None 表示全部历史。
+    """
+    unique_keywords = {}
+    total_raw = 0
+    for kw, sources, count in store.aggregate(run_id):
+        unique_keywords[kw] = {'Keyword': kw, 'Sources': set(sources.split(',')), 'Count': count}
+        total_raw += count
+    analysis = summarize_keywords(unique_keywords, total_raw, store.source_counts(run_id))
+    if run_id is not None:
+        analysis['new_keywords'] = store.new_keyword_count(run_id)
+    return analysis
 
-    # 3. 处理列表
+def summarize_keywords(unique_keywords, total_raw, sources_count):
+    """unique_keywords: {kw: {'Keyword', 'Sources', 'Count'}} -> 报表用的 analysis 字典"""
+
+    # 2. 按去重关键词计算热度、意图、词频 (词频按出现次数加权，等价于逐行统计)
     processed_list = []
+    intent_stats = collections.Counter()
+    word_counter = collections.Counter()
+
     for kw, info in unique_keywords.items():
-        score = calculate_heat(kw, data)
+        info['Intent'] = classify_keyword(kw)
+        score = calculate_heat(kw, info['Sources'], info['Count'])
         info['HeatScore'] = score
         info['HeatIcon'] = get_heat_icon(score)
         info['SourceDisplay'] = " + ".join(info['Sources'])
@@ -103,19 +141,24 @@ def analyze_raw_data(data):
         for intent in info['Intent']:
             intent_stats[intent] += 1
 
-    # 4. 排序 (按热度降序)
+        for word in tokenize_words(kw):
+            word_counter[word] += info['Count']
+
+    # 3. 排序 (按热度降序)
     processed_list.sort(key=lambda x: x['HeatScore'], reverse=True)
 
-    # 5. 词频统计
-    all_text = " ".join([d['Keyword'].lower() for d in data])
-    words = re.findall(r'[\w]+', all_text)
-    clean_words = [w for w in words if w not in STOP_WORDS and len(w) > 1 and not w.isdigit()]
-    word_freq = collections.Counter(clean_words).most_common(20)
+    # 4. 词频统计
+    word_freq = word_counter.most_common(20)
+
+    # 5. 近似词聚类 (词序/空格/全半角/年份不同的变体合并成一组)
+    clusters = build_clusters(processed_list)
     
     # 6. 打包数据
     analysis = {
         'total_raw': total_raw,
         'unique_total': len(processed_list),
+        'cluster_total': len(clusters),
+        'clusters': clusters,
         'high_heat_count': sum(1 for x in processed_list if x['HeatScore'] >= 4),
         'sources_stats': dict(sources_count),
         'intent_stats': dict(intent_stats),
@@ -127,8 +170,236 @@ def analyze_raw_data(data):
     
     return analysis
 
+def build_clusters(processed_list):
+    """
+    给每个关键词标上 'Cluster'，返回按合并热度降序的聚类列表。
+    代表词取组内热度最高、出现次数最多、最短的那个；合并热度为组内热度之和。
+    """
+    labels = cluster_keywords([x['Keyword'] for x in processed_list])
+    groups = collections.defaultdict(list)
+    for info, label in zip(processed_list, labels):
+        info['Cluster'] = label
+        groups[label].append(info)
+
+    clusters = []
+    for label, members in groups.items():
+        rep = max(members, key=lambda x: (x['HeatScore'], x['Count'], -len(x['Keyword'])))
+        sources = set()
+        for m in members:
+            sources |= m['Sources']
+        clusters.append({
+            'Cluster': label,
+            'Representative': rep['Keyword'],
+            'Members': [m['Keyword'] for m in members],
+            'Size': len(members),
+            'Heat': sum(m['HeatScore'] for m in members),
+            'Count': sum(m['Count'] for m in members),
+            'Sources': sources,
+            'Intent': rep['Intent'],
+        })
+    clusters.sort(key=lambda c: (c['Heat'], c['Size']), reverse=True)
+    return clusters
+
+def build_table_payload(keywords):
+    """
+    总表数据打包成列式 JSON：关键词一列、热度一列，来源/分类用下标指向字典表。
+    比逐行拼 <tr> 小得多，浏览器端只渲染可视区域的行。
+    """
+    source_names, intent_names = [], []
+    source_index, intent_index = {}, {}
+    heat, source, intent = [], [], []
+    for r in keywords:
+        heat.append(r['HeatScore'])
+        s = source_index.get(r['SourceDisplay'])
+        if s is None:
+            s = source_index[r['SourceDisplay']] = len(source_names)
+            source_names.append(r['SourceDisplay'])
+        source.append(s)
+        i = intent_index.get(r['Intent'][0])
+        if i is None:
+            i = intent_index[r['Intent'][0]] = len(intent_names)
+            intent_names.append(r['Intent'][0])
+        intent.append(i)
+    payload = {
+        'keywords': [r['Keyword'] for r in keywords],
+        'heat': heat,
+        'source': source,
+        'intent': intent,
+        'sourceNames': source_names,
+        'intentNames': intent_names,
+    }
+    # 嵌进 <script type="application/json">，把 < 转义掉就不会提前闭合标签
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).replace('<', '\\u003c')
+
+# 总表：虚拟滚动 (只渲染可视区域的行) + 二元组倒排索引搜索 + 列排序
+TABLE_SCRIPT = r"""
+(function () {
+    const data = JSON.parse(document.getElementById('keywordData').textContent);
+    const keywords = data.keywords;
+    const total = keywords.length;
+    const ROW_HEIGHT = 32;
+    const OVERSCAN = 12;
+
+    const viewport = document.getElementById('tableViewport');
+    const tbody = document.getElementById('tableBody');
+    const status = document.getElementById('tableStatus');
+    const searchInput = document.getElementById('tableSearch');
+
+    let lower = null;       // 小写关键词，第一次搜索时生成
+    let bigrams = null;     // 二元组 -> [id, ...]，第一次搜索时生成
+    let lastQuery = '';
+    let matchIds = null;    // 上一次搜索命中的 id (输入变长时在此基础上继续筛)
+    let mask = null;        // Uint8Array，null 表示不过滤
+    let sortKey = 'heat';
+    let sortDesc = true;
+    const orders = {};      // 每列的排序结果只算一次
+    let view = null;
+
+    const escapeMap = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'};
+    const esc = (s) => String(s).replace(/[&<>"']/g, (c) => escapeMap[c]);
+
+    function ensureIndex() {
+        if (bigrams) return;
+        lower = keywords.map((k) => k.toLowerCase());
+        bigrams = new Map();
+        for (let id = 0; id < total; id++) {
+            const s = lower[id];
+            for (let j = 0; j + 1 < s.length; j++) {
+                const g = s.substr(j, 2);
+                let list = bigrams.get(g);
+                if (!list) bigrams.set(g, list = []);
+                if (list[list.length - 1] !== id) list.push(id);
+            }
+        }
+    }
+
+    function candidatesFor(q) {
+        // 新查询包含上一个查询时，结果一定是上一次结果的子集
+        if (matchIds && lastQuery && q.includes(lastQuery)) return matchIds;
+        if (q.length < 2) return null;
+        let best = null;
+        for (let j = 0; j + 1 < q.length; j++) {
+            const list = bigrams.get(q.substr(j, 2));
+            if (!list) return [];
+            if (!best || list.length < best.length) best = list;
+        }
+        return best;
+    }
+
+    function search(query) {
+        const q = query.trim().toLowerCase();
+        if (!q) {
+            mask = null;
+            matchIds = null;
+        } else {
+            ensureIndex();
+            const candidates = candidatesFor(q);
+            const ids = [];
+            if (candidates) {
+                for (const id of candidates) if (lower[id].includes(q)) ids.push(id);
+            } else {
+                for (let id = 0; id < total; id++) if (lower[id].includes(q)) ids.push(id);
+            }
+            matchIds = ids;
+            mask = new Uint8Array(total);
+            for (const id of ids) mask[id] = 1;
+        }
+        lastQuery = q;
+        rebuild();
+    }
+
+    function orderFor(key) {
+        if (orders[key]) return orders[key];
+        const order = new Int32Array(total);
+        for (let i = 0; i < total; i++) order[i] = i;
+        // 数据已按热度降序排好；其他列用稳定排序，同值保持热度顺序
+        if (key === 'keyword') {
+            order.sort((a, b) => (keywords[a] < keywords[b] ? -1 : keywords[a] > keywords[b] ? 1 : a - b));
+        } else if (key === 'source' || key === 'intent') {
+            const col = data[key];
+            order.sort((a, b) => (col[a] - col[b]) || (a - b));
+        }
+        return (orders[key] = order);
+    }
+
+    function rebuild() {
+        const order = orderFor(sortKey);
+        const reverse = sortKey === 'heat' ? !sortDesc : sortDesc;
+        const out = new Int32Array(mask ? matchIds.length : total);
+        let n = 0;
+        for (let i = 0; i < total; i++) {
+            const id = order[reverse ? total - 1 - i : i];
+            if (!mask || mask[id]) out[n++] = id;
+        }
+        view = out.subarray(0, n);
+        status.textContent = mask
+            ? `匹配 ${n} 条 (共 ${total} 条)`
+            : `共 ${total} 条 (滚动浏览全部数据)`;
+        viewport.scrollTop = 0;
+        render();
+    }
+
+    function spacer(height) {
+        return height > 0 ? `<tr style="height:${height}px"><td colspan="5" class="p-0 border-0"></td></tr>` : '';
+    }
+
+    function render() {
+        const count = view.length;
+        const visible = Math.ceil(viewport.clientHeight / ROW_HEIGHT);
+        const start = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        const end = Math.min(count, start + visible + OVERSCAN * 2);
+        let html = spacer(start * ROW_HEIGHT);
+        for (let i = start; i < end; i++) {
+            const id = view[i];
+            const kw = keywords[id];
+            html += `<tr>
+                <td class="heat-icon">${'🔥'.repeat(data.heat[id])}</td>
+                <td class="text-truncate" title="${esc(kw)}">${esc(kw)}</td>
+                <td><span class="badge bg-light text-dark border badge-source">${esc(data.sourceNames[data.source[id]])}</span></td>
+                <td><span class="badge bg-secondary badge-source">${esc(data.intentNames[data.intent[id]])}</span></td>
+                <td class="text-end"><a href="https://www.xiaohongshu.com/search_result?keyword=${encodeURIComponent(kw)}" target="_blank" class="search-btn xhs-color"><i class="fas fa-book"></i></a></td>
+            </tr>`;
+        }
+        html += spacer((count - end) * ROW_HEIGHT);
+        tbody.innerHTML = html;
+    }
+
+    let frame = 0;
+    viewport.addEventListener('scroll', () => {
+        if (!frame) frame = requestAnimationFrame(() => { frame = 0; render(); });
+    });
+    window.addEventListener('resize', render);
+
+    let timer = 0;
+    searchInput.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(() => search(this.value), 120);
+    });
+
+    document.querySelectorAll('#mainTable th[data-sort]').forEach((th) => {
+        th.addEventListener('click', () => {
+            const key = th.dataset.sort;
+            sortDesc = key === sortKey ? !sortDesc : key === 'heat';
+            sortKey = key;
+            document.querySelectorAll('#mainTable th[data-sort] .sort-arrow').forEach((el) => { el.textContent = ''; });
+            th.querySelector('.sort-arrow').textContent = sortDesc ? ' ▼' : ' ▲';
+            rebuild();
+        });
+    });
+
+    // 右侧热词按钮
+    window.filterTable = function (query) {
+        searchInput.value = query;
+        search(query);
+        document.getElementById('mainTable').scrollIntoView({behavior: 'smooth'});
+    };
+
+    rebuild();
+})();
+"""
+
 def generate_html(analysis):
-    """生成全能版仪表盘 (无限制版)"""
+    """生成全能版仪表盘 (总表数据以 JSON 内嵌，浏览器端虚拟滚动，不设条数上限)"""
     
     # 准备图表数据
     freq_labels = [x[0] for x in analysis['word_freq']]
@@ -151,10 +422,21 @@ def generate_html(analysis):
         </button>
         """
         
-    # 设置显示限制：虽然我们解除了限制，但为了防止浏览器崩溃，设置一个极高的安全上限 (比如 5000)
-    # 如果你的数据少于 5000，就会全部显示。
-    SHOW_LIMIT = 5000 
-    display_keywords = analysis['all_keywords'][:SHOW_LIMIT]
+    # 聚类表只展示有变体的组
+    cluster_rows_html = ""
+    for c in [c for c in analysis['clusters'] if c['Size'] > 1][:20]:
+        variants = [m for m in c['Members'] if m != c['Representative']]
+        preview = "、".join(escape(m) for m in variants[:6]) + (f" 等 {len(variants)} 个" if len(variants) > 6 else "")
+        cluster_rows_html += f"""
+                    <tr>
+                        <td><span class="badge bg-danger">{c['Heat']}</span></td>
+                        <td class="fw-bold">{escape(c['Representative'])}</td>
+                        <td>{c['Size']}</td>
+                        <td class="small text-muted">{preview}</td>
+                    </tr>"""
+
+    # 总表不再拼 HTML 行，全量数据打包成 JSON 交给前端按需渲染
+    table_payload = build_table_payload(analysis['all_keywords'])
 
     html = f"""
 <!DOCTYPE html>
@@ -179,6 +461,10 @@ def generate_html(analysis):
         .table-hover tbody tr:hover {{ background-color: #f7fafc; }}
         .chart-container {{ position: relative; height: 200px; width: 100%; }}
         .badge-source {{ font-size: 0.7em; opacity: 0.8; }}
+        #mainTable {{ table-layout: fixed; }}
+        #mainTable tbody tr {{ height: 32px; }}
+        #mainTable td {{ white-space: nowrap; overflow: hidden; }}
+        #mainTable th[data-sort] {{ cursor: pointer; user-select: none; }}
     </style>
 </head>
 <body>
@@ -204,6 +490,7 @@ def generate_html(analysis):
             <div class="card kpi-card bg-danger text-white h-100 p-3">
                 <h6 class="text-uppercase mb-2" style="opacity:0.9">去重后总数 (Unique)</h6>
                 <h2 class="display-6 fw-bold mb-0">{analysis['unique_total']}</h2>
+                <small style="opacity:0.9">合并近似词后 {analysis['cluster_total']} 组</small>
                 <i class="fas fa-fire kpi-icon text-white"></i>
             </div>
         </div>
@@ -299,6 +586,18 @@ def generate_html(analysis):
         </div>
     </div>
 
+    <h5 class="section-header">🧩 近似词聚类 (Top 20)</h5>
+    <div class="card">
+        <div class="table-responsive">
+            <table class="table table-sm table-hover align-middle mb-0">
+                <thead class="table-light"><tr><th width="90">合并热度</th><th>代表词</th><th width="70">变体数</th><th>变体</th></tr></thead>
+                <tbody>
+                    {cluster_rows_html}
+                </tbody>
+            </table>
+        </div>
+    </div>
+
     <h5 class="section-header">🔍 全量数据库 (Deep Dive)</h5>
     <div class="row g-3">
         <div class="col-md-9">
@@ -308,35 +607,21 @@ def generate_html(analysis):
                     <input type="text" id="tableSearch" class="form-control form-control-sm w-25" placeholder="🔍 搜索...">
                 </div>
                 <div class="card-body p-0">
-                    <div class="table-responsive" style="max-height: 800px; overflow-y: auto;">
+                    <div class="table-responsive" id="tableViewport" style="height: 800px; overflow-y: auto;">
                         <table class="table table-sm table-hover align-middle mb-0" id="mainTable">
                             <thead class="table-light sticky-top">
                                 <tr>
-                                    <th width="80">热度</th>
-                                    <th>关键词</th>
-                                    <th>来源</th>
-                                    <th>分类</th>
-                                    <th class="text-end">调研</th>
+                                    <th width="80" data-sort="heat">热度<span class="sort-arrow"> ▼</span></th>
+                                    <th data-sort="keyword">关键词<span class="sort-arrow"></span></th>
+                                    <th width="140" data-sort="source">来源<span class="sort-arrow"></span></th>
+                                    <th width="160" data-sort="intent">分类<span class="sort-arrow"></span></th>
+                                    <th width="60" class="text-end">调研</th>
                                 </tr>
                             </thead>
-                            <tbody>
-                                {"".join([f'''
-                                <tr>
-                                    <td class="heat-icon">{r['HeatIcon']}</td>
-                                    <td>{r['Keyword']}</td>
-                                    <td><span class="badge bg-light text-dark border badge-source">{r['SourceDisplay']}</span></td>
-                                    <td><span class="badge bg-secondary badge-source">{r['Intent'][0]}</span></td>
-                                    <td class="text-end">
-                                        <a href="https://www.xiaohongshu.com/search_result?keyword={r['Keyword']}" target="_blank" class="search-btn xhs-color"><i class="fas fa-book"></i></a>
-                                    </td>
-                                </tr>
-                                ''' for r in display_keywords])} 
-                            </tbody>
+                            <tbody id="tableBody"></tbody>
                         </table>
-                        <div class="p-2 text-center text-muted small">
-                            当前展示了 {len(display_keywords)} 条数据 (Total Available: {analysis['unique_total']})
-                        </div>
                     </div>
+                    <div class="p-2 text-center text-muted small border-top" id="tableStatus"></div>
                 </div>
             </div>
         </div>
@@ -375,25 +660,9 @@ def generate_html(analysis):
         options: {{ responsive: true, maintainAspectRatio: false, plugins: {{ legend: {{ position: 'bottom' }} }} }}
     }});
 
-    // Filter Logic
-    const searchInput = document.getElementById('tableSearch');
-    const table = document.getElementById('mainTable');
-    const trs = table.getElementsByTagName('tr');
-
-    function filterTable(query) {{
-        searchInput.value = query;
-        const filter = query.toLowerCase();
-        for (let i = 1; i < trs.length; i++) {{
-            const td = trs[i].getElementsByTagName('td')[1];
-            if (td) {{
-                const txtValue = td.textContent || td.innerText;
-                trs[i].style.display = txtValue.toLowerCase().indexOf(filter) > -1 ? "" : "none";
-            }}
-        }}
-        table.scrollIntoView({{behavior: "smooth"}});
-    }}
-    searchInput.addEventListener('keyup', function() {{ filterTable(this.value); }});
 </script>
+<script type="application/json" id="keywordData">{table_payload}</script>
+<script>{TABLE_SCRIPT}</script>
 </body>
 </html>
     """
@@ -403,11 +672,19 @@ def generate_html(analysis):
     print(f"✅ Dashboard generated successfully: {REPORT_FILE}")
 
 def main():
-    raw_data = load_raw_data()
-    if not raw_data:
-        print("❌ No raw_keywords.csv found!")
+    if os.path.exists(STORE_FILE):
+        store = KeywordStore(STORE_FILE)
+        run_id = None if '--all' in sys.argv else store.latest_run()
+        analysis = analyze_store(store, run_id)
+        store.close()
+        if 'new_keywords' in analysis:
+            print(f"🆕 run #{run_id}: 新词 {analysis['new_keywords']} 个")
+    else:
+        # 兼容旧版：还没有关键词库时读 raw_keywords.csv
+        analysis = analyze_raw_data(iter_raw_data())
+    if not analysis['total_raw']:
+        print("❌ No keyword data found! Run miner.py first.")
         return
-    analysis = analyze_raw_data(raw_data)
     generate_html(analysis)
 
 if __name__ == "__main__":
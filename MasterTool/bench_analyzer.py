@@ -0,0 +1,45 @@
+"""
+analyzer.py 性能基准
+用合成的 raw_keywords 行测试 analyze_raw_data() 在不同数据量下的耗时，
+每行耗时 (µs/row) 基本不变即说明是线性复杂度。
+
+用法:
+    python bench_analyzer.py                 # 默认 10k / 100k / 1M 行
+    python bench_analyzer.py 50000 2000000   # 自定义行数
+"""
+
+import sys
+import time
+import random
+
+from analyzer import analyze_raw_data
+
+PREFIXES = ['telegram', 'tg', '电报', '纸飞机', 'telegram 账号', 'telegram premium']
+TAILS = ['下载', '教程', '怎么', 'price', 'buy', 'apk', 'error', 'vs whatsapp', '中文版', '注册', '登录', '购买', '报错']
+
+
+def synthetic_rows(n, unique_ratio=0.4, seed=42):
+    """生成 n 行数据，约 unique_ratio 比例的去重关键词，来源 Google/Bing 混合"""
+    rnd = random.Random(seed)
+    vocab_size = max(1, int(n * unique_ratio))
+    rows = []
+    for _ in range(n):
+        i = rnd.randrange(vocab_size)
+        kw = f"{PREFIXES[i % len(PREFIXES)]} {TAILS[(i // len(PREFIXES)) % len(TAILS)]} {i}"
+        rows.append({'Keyword': kw, 'Source': rnd.choice(('Google', 'Bing')), 'Seed': 'Telegram'})
+    return rows
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(f"{'rows':>10} {'unique':>10} {'seconds':>9} {'µs/row':>8}")
+    for n in sizes:
+        rows = synthetic_rows(n)
+        start = time.perf_counter()
+        analysis = analyze_raw_data(rows)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>10} {analysis['unique_total']:>10} {elapsed:>9.2f} {elapsed / n * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import csv
 import os
-import sys
+from functools import lru_cache
+from matcher import build_matcher
+from keyword_store import KeywordStore, STORE_FILE
 
 # Configuration Files
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -31,100 +33,138 @@ def load_blacklist():
     
     return blacklist
 
-def classify_intent(keyword):
-    """Classifies keyword based on generic rules"""
-    keyword_lower = keyword.lower()
-    intents = []
-    
-    for intent, terms in INTENT_RULES.items():
-        for term in terms:
-            if term in keyword_lower:
-                intents.append(intent)
-                break # One match per category is enough
-    
+BLACKLIST_CATEGORY = '__blacklist__'
+
+@lru_cache(maxsize=8)
+def get_matcher(blacklist=()):
+    """One Aho-Corasick automaton for the blacklist and all intent terms (built once)"""
+    return build_matcher(INTENT_RULES, list(blacklist), BLACKLIST_CATEGORY)
+
+def format_intents(intents):
     if not intents:
         return 'Informational' # Default fallback
-    
     return ', '.join(intents)
 
-def is_blacklisted(keyword, blacklist):
-    """Checks if keyword contains any blacklisted term"""
-    keyword_lower = keyword.lower()
-    for term in blacklist:
-        if term in keyword_lower:
-            return True
-    return False
+def classify_intent(keyword, matcher=None):
+    """Classifies keyword based on generic rules"""
+    matcher = matcher or get_matcher()
+    return format_intents(matcher.match_ordered(keyword, INTENT_RULES))
+
+def is_blacklisted(keyword, matcher):
+    """Checks if keyword contains any blacklisted term (matcher from get_matcher(tuple(blacklist)))"""
+    return matcher.contains(keyword, BLACKLIST_CATEGORY)
+
+def scan_keyword(keyword, matcher):
+    """Single pass: returns (is_blacklisted, intent) for one keyword"""
+    categories = matcher.match_ordered(keyword, [*INTENT_RULES, BLACKLIST_CATEGORY])
+    if categories and categories[-1] == BLACKLIST_CATEGORY:
+        return True, None
+    return False, format_intents(categories)
+
+FIELDNAMES = ['Keyword', 'Intent', 'Source', 'Seed']
+
+def read_rows(path=INPUT_FILE):
+    """Yields raw rows one at a time"""
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        # Check if CSV has data
+        if not reader.fieldnames:
+            raise ValueError("Input CSV is empty or invalid.")
+        yield from reader
+
+def read_store_rows(path=STORE_FILE, run_id=None):
+    """Yields rows from the keyword store (latest run by default) in the raw CSV row format"""
+    store = KeywordStore(path)
+    try:
+        yield from store.iter_rows(run_id if run_id is not None else store.latest_run())
+    finally:
+        store.close()
+
+def open_raw_rows():
+    """Keyword store if it exists, otherwise the legacy raw_keywords.csv. Returns (rows, source_name) or None."""
+    if os.path.exists(STORE_FILE):
+        return read_store_rows(STORE_FILE), STORE_FILE
+    if os.path.exists(INPUT_FILE):
+        return read_rows(INPUT_FILE), INPUT_FILE
+    return None
+
+def clean_rows(rows, matcher, stats=None):
+    """Drops blacklisted keywords and yields classified rows; counts go into stats"""
+    stats = stats if stats is not None else {}
+    stats.setdefault('processed', 0)
+    stats.setdefault('filtered', 0)
+    for row in rows:
+        keyword = (row.get('Keyword') or '').strip()
+        if not keyword:
+            continue
+
+        stats['processed'] += 1
+
+        blacklisted, intent = scan_keyword(keyword, matcher)
+        if blacklisted:
+            stats['filtered'] += 1
+            continue
+
+        # Create new row with classification
+        yield {
+            'Keyword': keyword,
+            'Intent': intent,
+            'Source': row.get('Source', 'Unknown'),
+            'Seed': row.get('Seed', '')
+        }
+
+def write_rows(rows, path=OUTPUT_FILE, fieldnames=FIELDNAMES):
+    """
+    Writes rows to CSV and passes them through, so a later stage can consume
+    the same stream. The file is only created once the first row arrives.
+    """
+    f = None
+    try:
+        for row in rows:
+            if f is None:
+                f = open(path, 'w', newline='', encoding='utf-8')
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+            writer.writerow(row)
+            yield row
+    finally:
+        if f is not None:
+            f.close()
 
 def main():
     print("Starting Cleaner...")
     
-    if not os.path.exists(INPUT_FILE):
-        print(f"Error: Input file '{INPUT_FILE}' not found.")
+    raw = open_raw_rows()
+    if raw is None:
+        print(f"Error: Neither '{STORE_FILE}' nor '{INPUT_FILE}' found.")
         print("Please run miner.py first to generate raw keywords.")
         return
+    rows, source_name = raw
+    print(f"Reading from {source_name}")
 
     blacklist = load_blacklist()
     if not blacklist and os.path.exists(BLACKLIST_FILE):
         print("Warning: Blacklist is empty.")
 
-    processed_count = 0
-    filtered_count = 0
-    
-    final_tasks = []
+    matcher = get_matcher(tuple(blacklist))
+
+    stats = {}
+    saved_count = 0
 
     try:
-        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            
-            # Check if CSV has data
-            if not reader.fieldnames:
-                print("Error: Input CSV is empty or invalid.")
-                return
-
-            for row in reader:
-                keyword = row.get('Keyword', '').strip()
-                if not keyword:
-                    continue
-                
-                processed_count += 1
-                
-                if is_blacklisted(keyword, blacklist):
-                    filtered_count += 1
-                    continue
-                
-                intent = classify_intent(keyword)
-                
-                # Create new row with classification
-                new_row = {
-                    'Keyword': keyword,
-                    'Intent': intent,
-                    'Source': row.get('Source', 'Unknown'),
-                    'Seed': row.get('Seed', '')
-                }
-                final_tasks.append(new_row)
-                
+        for _ in write_rows(clean_rows(rows, matcher, stats)):
+            saved_count += 1
     except Exception as e:
-        print(f"Error reading {INPUT_FILE}: {e}")
+        print(f"Error: {e}")
         return
 
-    # Write results
-    try:
-        if final_tasks:
-            fieldnames = ['Keyword', 'Intent', 'Source', 'Seed']
-            with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(final_tasks)
-            
-            print(f"Processing complete.")
-            print(f"Total processed: {processed_count}")
-            print(f"Filtered (Blacklist): {filtered_count}")
-            print(f"Saved to {OUTPUT_FILE}: {len(final_tasks)}")
-        else:
-            print("No valid keywords found after filtering.")
-            
-    except Exception as e:
-        print(f"Error saving to {OUTPUT_FILE}: {e}")
+    if saved_count:
+        print(f"Processing complete.")
+        print(f"Total processed: {stats['processed']}")
+        print(f"Filtered (Blacklist): {stats['filtered']}")
+        print(f"Saved to {OUTPUT_FILE}: {saved_count}")
+    else:
+        print("No valid keywords found after filtering.")
 
 if __name__ == "__main__":
     main()
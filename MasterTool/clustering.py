@@ -0,0 +1,158 @@
+# Dependencies:
+# pip install numpy
+
+"""
+近似词聚类 (MinHash + LSH)
+联想词里大量是同一个词的变体：词序不同、空格不同、全角/半角、末尾带年份。
+先做归一化把完全等价的合并，再对归一化结果的字符二元组做 MinHash，
+用 LSH 分桶找候选，只和桶内代表比较，整体接近线性，不做两两比较。
+合并时比较的是两组的代表 (根) 的真实 Jaccard (MinHash 只负责找候选，估计值有误差)，
+避免 A≈B≈C 一路传递把不相干的词串成一大组。
+字符 n-gram 不依赖分词，中文同样适用。
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+
+NUM_PERM = 64 # MinHash 签名长度
+BANDS = 16 # LSH 分段数 (每段 NUM_PERM // BANDS 行)
+THRESHOLD = 0.8 # 估计 Jaccard 相似度达到多少才算同一组
+
+YEAR_RE = re.compile(r'(?<!\d)(?:19|20)\d{2}(?!\d)\s*年?')
+TOKEN_RE = re.compile(r'\w+')
+# 中英文之间补空格，'telegram下载' 与 'telegram 下载' 归一化结果相同
+SCRIPT_BOUNDARY_RE = re.compile(r'(?<=[a-z0-9])(?=[\u4e00-\u9fa5])|(?<=[\u4e00-\u9fa5])(?=[a-z0-9])')
+CJK_RE = re.compile(r'[\u4e00-\u9fa5]')
+
+
+def normalize_keyword(keyword):
+    """
+    全角转半角、小写、去掉年份和标点；英文词按词序排序，中文片段去掉空格按原顺序拼接
+    (中文的空格是随意加的，'电报 下载' == '电报下载')。
+    'Telegram  下载 2025' == '下载 telegram' == 'telegram下载'
+    """
+    text = unicodedata.normalize('NFKC', keyword).lower()
+    text = YEAR_RE.sub(' ', text)
+    text = SCRIPT_BOUNDARY_RE.sub(' ', text)
+    tokens = TOKEN_RE.findall(text)
+    latin = sorted(t for t in tokens if not CJK_RE.search(t))
+    cjk = ''.join(t for t in tokens if CJK_RE.search(t))
+    return ' '.join(latin + ([cjk] if cjk else [])) or keyword.strip().lower()
+
+
+def shingles(text):
+    """字符二元组集合，与 minhash_signatures 一致 (两端补分隔符)"""
+    text = '\x00' + text + '\x00'
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=1):
+    """
+    所有文本一次性向量化计算 MinHash：文本拼成一个码点数组，相邻码点组成二元组，
+    每个排列只对去重后的二元组做 multiply-shift 哈希，再按文本做 minimum.reduceat。
+    返回 (len(texts), num_perm) 的 uint32 数组。
+    每个文本两端都有分隔符，首尾二元组 (\x00, x) / (x, \x00) 都保留，
+    空文本则是 (\x00, \x00)，所以每个文本至少有一个二元组，reduceat 的分段与行一一对应。
+    """
+    joined = '\x00' + '\x00'.join(texts) + '\x00'
+    cp = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    grams = cp[:-1] * np.uint64(0x110000) + cp[1:]
+    owner = np.cumsum(cp[:-1] == 0) - 1
+    starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+    unique_grams, inverse = np.unique(grams, return_inverse=True)
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+    sig = np.empty((len(texts), num_perm), dtype=np.uint32)
+    with np.errstate(over='ignore'):
+        for k in range(num_perm):
+            hashed = ((unique_grams * a[k] + b[k]) >> np.uint64(32)).astype(np.uint32)
+            sig[:, k] = np.minimum.reduceat(hashed[inverse], starts)
+    return sig
+
+
+def lsh_pairs(sig, bands=BANDS, threshold=THRESHOLD):
+    """
+    按段分桶，同桶内每个成员只与桶里第一个成员比较签名 (估计 Jaccard)，
+    返回去重后的 (i, j) 数组。
+    """
+    n, num_perm = sig.shape
+    rows = num_perm // bands
+    pairs = []
+    mix = np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over='ignore'):
+        for band in range(bands):
+            block = sig[:, band * rows:(band + 1) * rows]
+            key = np.zeros(n, dtype=np.uint64)
+            for col in range(rows):
+                key = (key ^ block[:, col].astype(np.uint64)) * mix
+            order = np.argsort(key, kind='stable')
+            sorted_key = key[order]
+            head = np.r_[True, sorted_key[1:] != sorted_key[:-1]]
+            leader = order[np.maximum.accumulate(np.where(head, np.arange(n), 0))]
+            member = ~head
+            if not member.any():
+                continue
+            i, j = leader[member], order[member]
+            similar = (sig[i] == sig[j]).mean(axis=1) >= threshold
+            pairs.append(np.stack([i[similar], j[similar]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    # (i, j) 编码成一个整数去重，比按行 unique 快得多
+    code = np.unique(np.concatenate(pairs).astype(np.int64) @ np.array([n, 1], dtype=np.int64))
+    return np.stack([code // n, code % n], axis=1)
+
+
+def _find(parent, x):
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def cluster_keywords(keywords, threshold=THRESHOLD, bands=BANDS, num_perm=NUM_PERM):
+    """
+    keywords: 关键词列表。返回与输入等长的组号列表 (组号为 0..k-1)。
+    归一化后完全相同的直接同组；其余通过 MinHash/LSH 合并。
+    """
+    norm_ids = {}
+    norm_of = []
+    for kw in keywords:
+        norm = normalize_keyword(kw)
+        if norm not in norm_ids:
+            norm_ids[norm] = len(norm_ids)
+        norm_of.append(norm_ids[norm])
+
+    texts = list(norm_ids)
+    parent = list(range(len(texts)))
+    if len(texts) > 1:
+        sig = minhash_signatures(texts, num_perm)
+        pairs = lsh_pairs(sig, bands, threshold)
+        # 最相似的先合并；候选只是签名估计，合并前用真实 Jaccard 复核
+        similarity = (sig[pairs[:, 0]] == sig[pairs[:, 1]]).mean(axis=1)
+        grams = {}
+        for i, j in pairs[np.argsort(-similarity, kind='stable')].tolist():
+            ri, rj = _find(parent, i), _find(parent, j)
+            if ri == rj:
+                continue
+            for r in (ri, rj):
+                if r not in grams:
+                    grams[r] = shingles(texts[r])
+            if jaccard(grams[ri], grams[rj]) >= threshold:
+                parent[rj] = ri
+
+    cluster_ids = {}
+    labels = []
+    for nid in norm_of:
+        root = _find(parent, nid)
+        if root not in cluster_ids:
+            cluster_ids[root] = len(cluster_ids)
+        labels.append(cluster_ids[root])
+    return labels
@@ -0,0 +1,329 @@
+# Dependencies:
+# pip install beautifulsoup4 numpy
+
+"""
+内容缺口分析 (Content Gap Mapper)
+把挖到的关键词 (final_tasks.csv) 和站内已有文章 (blog/*.html) 对上号：
+哪些词已经有文章覆盖，哪些高热度的搞钱/引流词还没有任何文章。
+
+倒排索引建在文章的标题、keywords/description 和正文上，中文按字二元组切分，
+英文/数字按整词。索引落盘到 content_index.json，只重新解析有改动的文章。
+
+用法:
+    python content_gap.py                 # 增量更新索引并给 final_tasks.csv 打分
+    python content_gap.py --rebuild       # 全量重建索引
+    python content_gap.py --min-heat 3    # 缺口阈值 (热度 1-5)
+    python content_gap.py --self-check    # 回归检查：同一个词写不写空格，是否覆盖的判断必须一致
+"""
+
+import os
+import re
+import csv
+import json
+import math
+import glob
+import argparse
+import collections
+import unicodedata
+
+from bs4 import BeautifulSoup
+
+from analyzer import calculate_heat, classify_keyword
+
+# ==========================================
+# 🔧 配置区域
+# ==========================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.dirname(BASE_DIR)
+BLOG_GLOB = os.path.join(SITE_DIR, 'blog', '*.html')
+TASKS_FILE = os.path.join(BASE_DIR, 'final_tasks.csv')
+INDEX_FILE = os.path.join(BASE_DIR, 'content_index.json')
+OUTPUT_FILE = os.path.join(BASE_DIR, 'content_gap.csv')
+
+INDEX_VERSION = 1
+FIELD_WEIGHTS = {'title': 3, 'meta': 2, 'body': 1} # 标题命中比正文命中更说明"这篇就是写这个的"
+COVER_THRESHOLD = 0.8 # 关键词的词项 (按 IDF 加权) 有多少比例出现在文章里才算覆盖
+MIN_HEAT = 4
+GAP_INTENTS = ('搞钱', '引流')
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 回归检查用：(不带空格, 带空格) 的同一个关键词
+SPACING_PAIRS = [
+    ('telegram账号怎么注册', 'telegram 账号 怎么 注册'),
+    ('电报账号购买', '电报 账号 购买'),
+    ('tg中文语言包', 'tg 中文 语言包'),
+]
+
+TERM_RE = re.compile(r'[\u4e00-\u9fa5]+|[a-z0-9]+')
+
+# ==========================================
+# 🛠️ 分词
+# ==========================================
+
+def tokenize_runs(text):
+    """按连续片段分组的词项：[[片段 1 的词项], [片段 2 的词项], ...]"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    runs = []
+    for run in TERM_RE.findall(text):
+        if run[0] >= '\u4e00' and len(run) > 1:
+            runs.append([run[i:i + 2] for i in range(len(run) - 1)])
+        else:
+            runs.append([run])
+    return runs
+
+
+def tokenize(text):
+    """中文连续片段切成字二元组 (单字保留单字)，英文/数字按整词；全角先转半角"""
+    return [term for run in tokenize_runs(text) for term in run]
+
+# ==========================================
+# 📚 索引
+# ==========================================
+
+def extract_fields(path):
+    """从一篇文章里取出标题、meta (keywords + description)、正文"""
+    with open(path, 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+
+    title = soup.title.get_text(" ", strip=True) if soup.title else ''
+    meta = []
+    for name in ('keywords', 'description'):
+        tag = soup.find('meta', attrs={'name': name})
+        if tag and tag.get('content'):
+            meta.append(tag['content'])
+
+    body = soup.find('article') or soup.find('main') or soup.body or soup
+    for tag in body.find_all(['script', 'style', 'nav', 'header', 'footer']):
+        tag.decompose()
+    return {
+        'title': title,
+        'meta': ' '.join(meta),
+        'body': body.get_text(" ", strip=True),
+    }
+
+
+class ContentIndex:
+    """
+    用法:
+        index = ContentIndex.load()
+        index.update(glob.glob(BLOG_GLOB))  # 只解析新增/改动的文章
+        index.save()
+        index.search('telegram 注册')        # -> [(doc_id, score, coverage), ...]，index.urls[doc_id] 是文章地址
+    """
+
+    def __init__(self):
+        self.docs = {} # rel_path -> {'mtime', 'size', 'url', 'title', 'terms': {term: 加权词频}}
+        self._postings = None
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        index = cls()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                index.docs = data['docs']
+        return index
+
+    def save(self, path=INDEX_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'docs': self.docs}, f, ensure_ascii=False)
+
+    def update(self, paths):
+        """增量更新：mtime/size 没变的跳过，已删除的移除。返回 (更新数, 删除数)"""
+        seen = set()
+        updated = 0
+        for path in paths:
+            rel = os.path.relpath(path, SITE_DIR).replace(os.sep, '/')
+            if rel.endswith('index.html'):
+                continue # 列表页不算内容覆盖
+            seen.add(rel)
+            stat = os.stat(path)
+            doc = self.docs.get(rel)
+            if doc and doc['mtime'] == stat.st_mtime and doc['size'] == stat.st_size:
+                continue
+
+            fields = extract_fields(path)
+            terms = collections.Counter()
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for term in tokenize(text):
+                    terms[term] += weight
+            self.docs[rel] = {
+                'mtime': stat.st_mtime,
+                'size': stat.st_size,
+                'url': '/' + rel[:-len('.html')],
+                'title': fields['title'],
+                'terms': dict(terms),
+            }
+            updated += 1
+
+        removed = [rel for rel in self.docs if rel not in seen]
+        for rel in removed:
+            del self.docs[rel]
+        if updated or removed:
+            self._postings = None
+        return updated, len(removed)
+
+    def _build(self):
+        """倒排表里直接存好每个 (词, 文章) 的 BM25 分量，查询时只剩查表相加"""
+        n = len(self.docs)
+        lengths = {rel: sum(doc['terms'].values()) for rel, doc in self.docs.items()}
+        avgdl = (sum(lengths.values()) / n) if n else 1
+        df = collections.Counter()
+        for doc in self.docs.values():
+            df.update(doc['terms'].keys())
+
+        self.idf = {term: math.log(1 + (n - c + 0.5) / (c + 0.5)) for term, c in df.items()}
+        self.missing_idf = math.log(1 + (n + 0.5) / 0.5) # 语料里没出现过的词
+        self.urls = [doc['url'] for doc in self.docs.values()]
+        self.titles = [doc['title'] for doc in self.docs.values()]
+        postings = collections.defaultdict(list)
+        for doc_id, (rel, doc) in enumerate(self.docs.items()):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[rel] / avgdl)
+            for term, tf in doc['terms'].items():
+                postings[term].append((doc_id, self.idf[term] * tf * (BM25_K1 + 1) / (tf + norm)))
+        self._postings = dict(postings)
+
+    def query_weights(self, keyword):
+        """
+        {词项: IDF}。没写空格的中文会切出跨词的二元组 ('账号怎么注册' 里的 '号怎'、'么注')，
+        它们在语料里自然不存在：两边相邻的二元组都在词表里时，这个字已经被覆盖，不计入。
+        其他词表外的词 (真正没写过的词) 仍按 missing_idf 计入，拉低覆盖率。
+        """
+        if self._postings is None:
+            self._build()
+        weights = {}
+        for run in tokenize_runs(keyword):
+            for k, term in enumerate(run):
+                if term in self.idf:
+                    weights[term] = self.idf[term]
+                elif not (0 < k < len(run) - 1 and run[k - 1] in self.idf and run[k + 1] in self.idf):
+                    weights[term] = self.missing_idf
+        return weights
+
+    def search(self, keyword, limit=None):
+        """
+        返回包含任一词项的所有文章 [(doc_id, score, coverage)]，按 BM25 分数降序；
+        coverage = 命中词项的 IDF 占比。limit 只截断返回结果，覆盖率对每篇文章都算。
+        """
+        weights = self.query_weights(keyword)
+        total_idf = sum(weights.values())
+        if not total_idf:
+            return []
+        scores = collections.defaultdict(float)
+        matched = collections.defaultdict(float)
+        for term, idf in weights.items():
+            for doc_id, weight in self._postings.get(term, ()):
+                scores[doc_id] += weight
+                matched[doc_id] += idf
+        ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+        return [(doc_id, scores[doc_id], matched[doc_id] / total_idf) for doc_id in ranked]
+
+# ==========================================
+# 🎯 打分
+# ==========================================
+
+def load_tasks(path=TASKS_FILE):
+    """final_tasks.csv 逐行聚合成 {keyword: {'Sources', 'Count'}}"""
+    keywords = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            kw = row['Keyword']
+            info = keywords.get(kw)
+            if info is None:
+                info = keywords[kw] = {'Sources': set(), 'Count': 0}
+            info['Sources'].add(row.get('Source', 'Unknown'))
+            info['Count'] += 1
+    return keywords
+
+
+def score_keywords(index, keywords):
+    """每个关键词一行结果：热度、意图、最相关的文章和覆盖率"""
+    results = []
+    for kw, info in keywords.items():
+        heat = calculate_heat(kw, info['Sources'], info['Count'])
+        intents = classify_keyword(kw)
+        hits = index.search(kw) # 所有相关文章，排第 4 的文章也可能完整覆盖
+        covering = [h for h in hits if h[2] >= COVER_THRESHOLD]
+        best = covering[0] if covering else (hits[0] if hits else None)
+        results.append({
+            'Keyword': kw,
+            'Intent': ', '.join(intents),
+            'Heat': heat,
+            'Covered': bool(covering),
+            'Best Post': index.urls[best[0]] if best else '',
+            'Score': round(best[1], 2) if best else 0,
+            'Coverage': round(best[2], 2) if best else 0,
+            'Other Posts': ' '.join(index.urls[h[0]] for h in covering[1:]),
+        })
+    return results
+
+
+def self_check(index, pairs=SPACING_PAIRS):
+    """
+    同一个关键词带不带空格，"是否已被覆盖"的判断必须一致。返回不一致的 [(关键词, 关键词)]
+    (各篇文章的覆盖率可以略有不同：不带空格时跨词二元组如 '号购' 若在语料里出现，会偏向含完整短语的文章)
+    """
+    failures = []
+    for unspaced, spaced in pairs:
+        covered = [any(c >= COVER_THRESHOLD for _, _, c in index.search(kw)) for kw in (unspaced, spaced)]
+        if covered[0] != covered[1]:
+            failures.append((unspaced, spaced))
+    return failures
+
+
+def is_gap(result, min_heat=MIN_HEAT):
+    return (not result['Covered'] and result['Heat'] >= min_heat
+            and any(tag in result['Intent'] for tag in GAP_INTENTS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词 × 站内文章 覆盖分析")
+    parser.add_argument('--tasks', default=TASKS_FILE, help="关键词文件 (cleaner.py 输出)")
+    parser.add_argument('--rebuild', action='store_true', help="忽略已有索引，全量重建")
+    parser.add_argument('--min-heat', type=int, default=MIN_HEAT, help=f"缺口热度阈值，默认 {MIN_HEAT}")
+    parser.add_argument('--self-check', action='store_true', help="只跑空格/无空格写法的覆盖率回归检查")
+    args = parser.parse_args()
+
+    if args.self_check:
+        index = ContentIndex()
+        index.update(glob.glob(BLOG_GLOB))
+        failures = self_check(index)
+        for unspaced, spaced in failures:
+            print(f"❌ 覆盖判断不一致: '{unspaced}' vs '{spaced}'")
+        print(f"✅ 空格回归检查通过 ({len(SPACING_PAIRS)} 组)" if not failures else f"❌ {len(failures)} 组不一致")
+        raise SystemExit(1 if failures else 0)
+
+    if not os.path.exists(args.tasks):
+        print(f"❌ {args.tasks} 不存在，请先运行 cleaner.py (或 pipeline.py)")
+        return
+
+    index = ContentIndex() if args.rebuild else ContentIndex.load()
+    updated, removed = index.update(glob.glob(BLOG_GLOB))
+    if updated or removed or args.rebuild:
+        index.save()
+    print(f"📚 文章索引: {len(index.docs)} 篇 (本次解析 {updated} 篇，移除 {removed} 篇)")
+
+    keywords = load_tasks(args.tasks)
+    results = score_keywords(index, keywords)
+    gaps = [r for r in results if is_gap(r, args.min_heat)]
+    results.sort(key=lambda r: (is_gap(r, args.min_heat), not r['Covered'], r['Heat']), reverse=True)
+
+    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()) if results else ['Keyword'])
+        writer.writeheader()
+        writer.writerows(results)
+
+    covered = sum(1 for r in results if r['Covered'])
+    print(f"🎯 关键词 {len(results)} 个：已覆盖 {covered}，未覆盖 {len(results) - covered}")
+    print(f"🕳️  高热度搞钱/引流缺口 (热度 ≥ {args.min_heat}): {len(gaps)} 个")
+    for r in sorted(gaps, key=lambda r: r['Heat'], reverse=True)[:20]:
+        nearest = f" (最接近: {r['Best Post']} {r['Coverage']:.0%})" if r['Best Post'] else ""
+        print(f"   {'🔥' * r['Heat']:<10} {r['Keyword']}{nearest}")
+    print(f"✅ 明细已保存至: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
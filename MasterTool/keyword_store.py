@@ -0,0 +1,239 @@
+"""
+关键词库 (SQLite)
+替代 raw_keywords.csv 在各阶段之间传数据：每个关键词一行，按来源记录首次/最近
+出现时间，保留种子血缘 (seed → parent → keyword)。miner 边挖边 upsert，
+analyzer 直接用聚合查询出统计结果，跨多次运行的历史也都在库里。
+
+用法:
+    python keyword_store.py                      # 库概况 + 最近几次运行
+    python keyword_store.py export raw.csv       # 导出某次运行 (默认最近一次) 为旧版 CSV
+    python keyword_store.py lineage "关键词"      # 查看一个词是从哪个种子一路扩展来的
+"""
+
+import os
+import csv
+import sys
+import time
+import json
+import sqlite3
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_FILE = os.path.join(BASE_DIR, 'keywords.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    options TEXT
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    id INTEGER PRIMARY KEY,
+    keyword TEXT NOT NULL UNIQUE,
+    seed TEXT NOT NULL,
+    parent TEXT,
+    depth INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    first_run INTEGER NOT NULL,
+    last_run INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keyword_sources (
+    keyword_id INTEGER NOT NULL REFERENCES keywords(id),
+    source TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    first_run INTEGER NOT NULL,
+    last_run INTEGER NOT NULL,
+    runs INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (keyword_id, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_keywords_seed ON keywords(seed);
+CREATE INDEX IF NOT EXISTS idx_keywords_last_run ON keywords(last_run);
+CREATE INDEX IF NOT EXISTS idx_sources_run ON keyword_sources(last_run, source);
+"""
+
+
+class KeywordStore:
+    """
+    用法:
+        store = KeywordStore()
+        run_id = store.begin_run({'depth': 1})
+        store.upsert('telegram 下载', 'Google', seed='Telegram', parent='telegram x', depth=1, run_id=run_id)
+        store.finish_run(run_id)
+        store.aggregate(run_id)  # -> [(keyword, 'Bing,Google', 2), ...]
+    """
+
+    COMMIT_EVERY = 200
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self._pending = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    # ---------- 运行记录 ----------
+
+    def begin_run(self, options=None):
+        cur = self.conn.execute(
+            "INSERT INTO runs (started_at, options) VALUES (?, ?)",
+            (time.time(), json.dumps(options or {}, ensure_ascii=False)),
+        )
+        self.conn.commit()
+        return cur.lastrowid
+
+    def finish_run(self, run_id):
+        self.conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+        self.conn.commit()
+
+    def unfinished_run(self):
+        """最近一次没跑完的运行 (断点续跑时沿用同一个 run_id)"""
+        row = self.conn.execute(
+            "SELECT id FROM runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def latest_run(self):
+        """最近一次有数据的运行"""
+        row = self.conn.execute("SELECT MAX(last_run) FROM keyword_sources").fetchone()
+        return row[0]
+
+    def runs(self, limit=10):
+        return self.conn.execute(
+            "SELECT r.id, r.started_at, r.finished_at,"
+            " (SELECT COUNT(*) FROM keywords k WHERE k.first_run = r.id)"
+            " FROM runs r ORDER BY r.id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+
+    # ---------- 写入 ----------
+
+    def upsert(self, keyword, source, seed, parent=None, depth=0, run_id=0, seen_at=None):
+        """一个 (关键词, 来源) 出现一次；同一次运行里重复调用是幂等的"""
+        now = seen_at or time.time()
+        self.conn.execute(
+            "INSERT INTO keywords (keyword, seed, parent, depth, first_seen, last_seen, first_run, last_run)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(keyword) DO UPDATE SET last_seen = excluded.last_seen, last_run = excluded.last_run",
+            (keyword, seed, parent, depth, now, now, run_id, run_id),
+        )
+        keyword_id = self.conn.execute("SELECT id FROM keywords WHERE keyword = ?", (keyword,)).fetchone()[0]
+        self.conn.execute(
+            "INSERT INTO keyword_sources (keyword_id, source, first_seen, last_seen, first_run, last_run)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(keyword_id, source) DO UPDATE SET"
+            "  last_seen = excluded.last_seen,"
+            "  runs = runs + (last_run != excluded.last_run),"
+            "  last_run = excluded.last_run",
+            (keyword_id, source, now, now, run_id, run_id),
+        )
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+    # ---------- 查询 ----------
+
+    def _run_filter(self, run_id, alias='ks'):
+        if run_id is None:
+            return "", ()
+        return f" WHERE {alias}.last_run = ?", (run_id,)
+
+    def pairs(self, run_id=None):
+        """某次运行 (None = 全部历史) 里出现过的 {(keyword, source)}"""
+        where, params = self._run_filter(run_id)
+        return set(self.conn.execute(
+            "SELECT k.keyword, ks.source FROM keyword_sources ks JOIN keywords k ON k.id = ks.keyword_id" + where,
+            params,
+        ))
+
+    def iter_rows(self, run_id=None):
+        """按旧版 raw_keywords.csv 的格式逐行产出 {'Keyword', 'Source', 'Seed'}"""
+        where, params = self._run_filter(run_id)
+        cur = self.conn.execute(
+            "SELECT k.keyword, ks.source, k.seed FROM keyword_sources ks"
+            " JOIN keywords k ON k.id = ks.keyword_id" + where + " ORDER BY k.id, ks.source",
+            params,
+        )
+        for keyword, source, seed in cur:
+            yield {'Keyword': keyword, 'Source': source, 'Seed': seed}
+
+    def aggregate(self, run_id=None):
+        """每个关键词一行: (keyword, 逗号分隔的来源, 行数)，相当于对旧 CSV 做 GROUP BY"""
+        where, params = self._run_filter(run_id)
+        return self.conn.execute(
+            "SELECT k.keyword, GROUP_CONCAT(ks.source), COUNT(*) FROM keyword_sources ks"
+            " JOIN keywords k ON k.id = ks.keyword_id" + where + " GROUP BY ks.keyword_id ORDER BY ks.keyword_id",
+            params,
+        ).fetchall()
+
+    def source_counts(self, run_id=None):
+        where, params = self._run_filter(run_id)
+        return dict(self.conn.execute(
+            "SELECT ks.source, COUNT(*) FROM keyword_sources ks" + where + " GROUP BY ks.source",
+            params,
+        ).fetchall())
+
+    def new_keyword_count(self, run_id):
+        """这次运行里第一次出现的词"""
+        return self.conn.execute("SELECT COUNT(*) FROM keywords WHERE first_run = ?", (run_id,)).fetchone()[0]
+
+    def lineage(self, keyword):
+        """[keyword, parent, parent 的 parent, ..., seed]"""
+        chain = []
+        seed = None
+        while keyword and keyword not in chain:
+            chain.append(keyword)
+            row = self.conn.execute("SELECT parent, seed FROM keywords WHERE keyword = ?", (keyword,)).fetchone()
+            if not row:
+                break
+            keyword, seed = row
+        if seed and seed not in chain:
+            chain.append(seed)
+        return chain
+
+    def export_csv(self, path, run_id=None):
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Keyword', 'Source', 'Seed'])
+            for row in self.iter_rows(run_id):
+                writer.writerow([row['Keyword'], row['Source'], row['Seed']])
+                count += 1
+        return count
+
+
+def main():
+    if not os.path.exists(STORE_FILE):
+        print(f"❌ {STORE_FILE} 不存在，请先运行 miner.py")
+        return
+    store = KeywordStore()
+    args = sys.argv[1:]
+    try:
+        if args and args[0] == 'export':
+            path = args[1] if len(args) > 1 else os.path.join(BASE_DIR, 'raw_keywords.csv')
+            count = store.export_csv(path, store.latest_run())
+            print(f"✅ 已导出 {count} 行 → {path}")
+        elif args and args[0] == 'lineage' and len(args) > 1:
+            print(" ← ".join(store.lineage(args[1])))
+        else:
+            total = store.conn.execute("SELECT COUNT(*) FROM keywords").fetchone()[0]
+            print(f"📦 {STORE_FILE}: {total} 个关键词")
+            for run_id, started, finished, new in store.runs():
+                status = time.strftime('%Y-%m-%d %H:%M', time.localtime(started))
+                print(f"  run #{run_id}  {status}  {'✅' if finished else '⏸️ '}  新词 {new}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+多模式匹配器 (Aho–Corasick)
+黑名单和意图词表一次性编译成自动机，每个关键词只扫描一遍，
+就能拿到所有命中的类别，耗时与词表大小无关。
+"""
+
+from collections import deque
+
+
+class KeywordMatcher:
+    """
+    用法:
+        matcher = KeywordMatcher()
+        matcher.add_terms('Guide', ['教程', 'how to'])
+        matcher.add_terms('__blacklist__', ['破解'])
+        matcher.build()
+        matcher.match('telegram 破解 教程')  # -> {'Guide', '__blacklist__'}
+    匹配不区分大小写 (与原来的 term in keyword.lower() 一致)。
+    """
+
+    def __init__(self):
+        # 状态 0 是根节点；goto[s] = {字符: 下一状态}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [0] # 每个状态命中的类别位掩码 (已合并 fail 链)
+        self.categories = [] # 位 -> 类别名
+        self._category_bit = {}
+        self._built = False
+
+    def _bit(self, category):
+        if category not in self._category_bit:
+            self._category_bit[category] = 1 << len(self.categories)
+            self.categories.append(category)
+        return self._category_bit[category]
+
+    def add_terms(self, category, terms):
+        bit = self._bit(category)
+        for term in terms:
+            term = term.lower()
+            if not term:
+                continue
+            state = 0
+            for ch in term:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(0)
+                    self.goto[state][ch] = nxt
+                state = nxt
+            self.output[state] |= bit
+        self._built = False
+        return self
+
+    def build(self):
+        """BFS 计算 fail 指针，并把 fail 链上的输出合并进来"""
+        queue = deque()
+        for nxt in self.goto[0].values():
+            self.fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.output[nxt] |= self.output[self.fail[nxt]]
+        self._built = True
+        return self
+
+    def match_mask(self, text):
+        """返回命中类别的位掩码；全部类别都命中后提前结束"""
+        if not self._built:
+            self.build()
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        full = (1 << len(self.categories)) - 1
+        state = 0
+        found = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found |= output[state]
+                if found == full:
+                    break
+        return found
+
+    def match(self, text):
+        """返回命中的类别集合"""
+        mask = self.match_mask(text)
+        return {cat for i, cat in enumerate(self.categories) if mask >> i & 1}
+
+    def match_ordered(self, text, order):
+        """按给定顺序返回命中的类别 (用于保持 INTENT_RULES 的展示顺序)"""
+        mask = self.match_mask(text)
+        return [cat for cat in order if mask & self._category_bit.get(cat, 0)]
+
+    def contains(self, text, category):
+        return bool(self.match_mask(text) & self._category_bit.get(category, 0))
+
+
+def build_matcher(rules, blacklist=None, blacklist_category='__blacklist__'):
+    """rules: {类别: [词, ...]}；blacklist 作为一个额外类别编进同一个自动机"""
+    matcher = KeywordMatcher()
+    for category, terms in rules.items():
+        matcher.add_terms(category, terms)
+    if blacklist:
+        matcher.add_terms(blacklist_category, blacklist)
+    return matcher.build()
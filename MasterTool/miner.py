@@ -1,5 +1,5 @@
 # Dependencies:
-# pip install tqdm requests
+# pip install tqdm aiohttp
 
 import warnings
 import os
@@ -8,28 +8,60 @@ import os
 warnings.filterwarnings("ignore")
 os.environ['PYTHONWARNINGS'] = 'ignore'
 
-import csv
-import sys
 import time
-import requests
 import json
 import random
 import string
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import argparse
+import sqlite3
+import heapq
+import itertools
+import contextlib
+import aiohttp
 from tqdm import tqdm
 from collections import defaultdict
+from keyword_store import KeywordStore, STORE_FILE
 
 # ==========================================
 # 🔧 配置区域
 # ==========================================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SEEDS_FILE = os.path.join(BASE_DIR, 'seeds.txt')
-OUTPUT_FILE = os.path.join(BASE_DIR, 'raw_keywords.csv')
+CHECKPOINT_FILE = os.path.join(BASE_DIR, 'miner_checkpoint.jsonl')
+CACHE_FILE = os.path.join(BASE_DIR, 'suggest_cache.sqlite')
 
 MAX_WORKERS = 8
-DELAY_MIN = 0.5
-DELAY_MAX = 1.0
+REQUEST_TIMEOUT = 5
+LOCALE = 'zh-CN'
+CACHE_TTL_HOURS = 24 * 7 # 联想词缓存有效期
+
+# 递归扩展：通过共识筛选的联想词会作为新查询继续挖，直到深度或请求预算用完
+MAX_DEPTH = 1 # 0 = 只挖种子 (旧行为)
+REQUEST_BUDGET = 5000 # 本轮最多发出的网络请求数 (缓存命中不计)
+
+# 后缀字母表：ASCII 之外再加常见中文联想起始字
+SUFFIX_ALPHABETS = {
+    'ascii': list(string.ascii_lowercase),
+    'cjk': ['怎', '下', '中', '注', '登', '官', '账', '安', '教', '手', '电', '网', '能', '为', '收', '被', '封', '买', '版', '号'],
+    'digits': list(string.digits),
+}
+DEFAULT_ALPHABETS = ['ascii', 'cjk']
+
+# 每个来源独立限速 (令牌桶): rate = 每秒请求数, burst = 允许的瞬时并发
+SOURCES = {
+    'Google': {
+        'url': "http://suggestqueries.google.com/complete/search",
+        'rate': 4.0,
+        'burst': 4,
+    },
+    'Bing': {
+        'url': "https://api.bing.com/osjson.aspx",
+        'rate': 4.0,
+        'burst': 4,
+    },
+}
 
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -50,139 +82,474 @@ def load_seeds():
         seeds = [line.strip() for line in f if line.strip()]
     return seeds
 
-def get_suggestions(url, params, source_name):
-    try:
+class TokenBucket:
+    """令牌桶限速：取代原来的 time.sleep 随机等待，按来源控制请求速率"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class SourceClient:
+    """每个来源一个连接池 (aiohttp.ClientSession) + 一个令牌桶"""
+
+    def __init__(self, name, url, rate, burst):
+        self.name = name
+        self.url = url
+        self.bucket = TokenBucket(rate, burst)
+        self.session = None
+        self.requests = 0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=MAX_WORKERS)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def fetch_json(self, params):
+        await self.bucket.acquire()
+        self.requests += 1
         headers = {'User-Agent': random.choice(USER_AGENTS)}
-        time.sleep(random.uniform(DELAY_MIN, DELAY_MAX))
-        response = requests.get(url, params=params, headers=headers, timeout=5)
-        if response.status_code == 200:
-            if source_name == 'Google':
-                data = response.json()
-                if len(data) > 1: return data[1]
-            elif source_name == 'Bing':
-                data = response.json()
-                if isinstance(data, list) and len(data) > 1: return data[1]
-                elif 'SearchSuggestions' in data: return [item['Query'] for item in data['SearchSuggestions']]
-    except:
-        pass
+        async with self.session.get(self.url, params=params, headers=headers) as response:
+            if response.status != 200:
+                return None
+            # Google 返回 text/javascript，不校验 content-type
+            return await response.json(content_type=None)
+
+# ==========================================
+# 💾 联想词缓存 (source, query, locale) -> suggestions
+# ==========================================
+
+class SuggestionCache:
+    """SQLite 持久化缓存：重复运行同一批种子时只请求新词或过期词"""
+
+    COMMIT_EVERY = 100
+
+    def __init__(self, path=CACHE_FILE, ttl_hours=CACHE_TTL_HOURS):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS suggestions ("
+            " source TEXT NOT NULL, query TEXT NOT NULL, locale TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL, suggestions TEXT NOT NULL,"
+            " PRIMARY KEY (source, query, locale))"
+        )
+
+    def get(self, source, query, locale=LOCALE):
+        row = self.conn.execute(
+            "SELECT suggestions, fetched_at FROM suggestions WHERE source = ? AND query = ? AND locale = ?",
+            (source, query, locale),
+        ).fetchone()
+        if row and time.time() - row[1] < self.ttl:
+            self.hits += 1
+            return json.loads(row[0])
+        self.misses += 1
+        return None
+
+    def put(self, source, query, suggestions, locale=LOCALE):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO suggestions (source, query, locale, fetched_at, suggestions) VALUES (?, ?, ?, ?, ?)",
+            (source, query, locale, time.time(), json.dumps(suggestions, ensure_ascii=False)),
+        )
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def parse_suggestions(data, source_name):
+    if not data:
+        return []
+    if source_name == 'Google':
+        if len(data) > 1: return data[1]
+    elif source_name == 'Bing':
+        if isinstance(data, list) and len(data) > 1: return data[1]
+        elif 'SearchSuggestions' in data: return [item['Query'] for item in data['SearchSuggestions']]
     return []
 
-def mine_google(query):
+async def get_suggestions(client, params, query, cache=None):
+    """返回联想词列表；请求失败返回 None (与“没有联想词”的 [] 区分开)"""
+    # 先查缓存，命中则不占用限速令牌
+    if cache:
+        cached = cache.get(client.name, query, LOCALE)
+        if cached is not None:
+            return cached
+    try:
+        data = await client.fetch_json(params)
+    except Exception:
+        return None
+    if data is None:
+        return None # 请求失败不写缓存，下次重试
+    suggestions = parse_suggestions(data, client.name)
+    if cache:
+        cache.put(client.name, query, suggestions, LOCALE)
+    return suggestions
+
+async def mine_google(client, query, cache=None):
     # 保持全球中文环境
-    url = "http://suggestqueries.google.com/complete/search"
-    params = {'client': 'chrome', 'q': query, 'hl': 'zh-CN', 'ds': ''}
-    return get_suggestions(url, params, 'Google')
+    params = {'client': 'chrome', 'q': query, 'hl': LOCALE, 'ds': ''}
+    return await get_suggestions(client, params, query, cache)
 
-def mine_bing(query):
-    url = "https://api.bing.com/osjson.aspx"
-    params = {'query': query, 'mkt': 'zh-CN'}
-    return get_suggestions(url, params, 'Bing')
+async def mine_bing(client, query, cache=None):
+    params = {'query': query, 'mkt': LOCALE}
+    return await get_suggestions(client, params, query, cache)
 
-def mine_single_task(task):
+async def mine_single_task(clients, task, cache=None):
     """
     注意：这里不再做过滤，而是先把所有东西都挖回来。
     筛选逻辑放到最后统一处理，因为我们需要对比 Google 和 Bing 的结果。
+    Google 和 Bing 并行请求，各自受自己的令牌桶约束。
+    所有来源都请求失败时返回 None，调用方不记断点，重新运行时会重试。
     """
-    query, seed = task
+    query, seed = task[0], task[1]
     results = []
-    
-    # 挖 Google
-    g_results = mine_google(query)
-    for kw in g_results:
+
+    g_results, b_results = await asyncio.gather(
+        mine_google(clients['Google'], query, cache),
+        mine_bing(clients['Bing'], query, cache),
+    )
+    if g_results is None and b_results is None:
+        return None
+    for kw in g_results or []:
         results.append({'kw': kw, 'source': 'Google', 'seed': seed})
-        
-    # 挖 Bing
-    b_results = mine_bing(query)
-    for kw in b_results:
+    for kw in b_results or []:
         results.append({'kw': kw, 'source': 'Bing', 'seed': seed})
-        
+
     return results
 
-def get_suffixes():
-    suffixes = list(string.ascii_lowercase)
+def get_suffixes(alphabets=None):
+    suffixes = []
+    for name in (alphabets or DEFAULT_ALPHABETS):
+        suffixes.extend(SUFFIX_ALPHABETS[name])
     return suffixes
 
-def main():
+def passes_consensus(kw, sources):
+    """核心策略：中文直接留；英文必须 Google + Bing 双平台都推荐"""
+    if contains_chinese(kw):
+        return True
+    return 'Google' in sources and 'Bing' in sources
+
+class Frontier:
+    """
+    扩展队列 (优先队列 + 去重集合)
+    优先级 = 共识来源数，来源越多越先挖；同优先级时浅层优先。
+    """
+
+    SEED_PRIORITY = 10
+
+    def __init__(self, max_depth=MAX_DEPTH):
+        self.max_depth = max_depth
+        self.heap = []
+        self.seen = set() # 已出队 (已查询) 的 query
+        self.counter = itertools.count()
+
+    @staticmethod
+    def key(query):
+        return ' '.join(query.lower().split())
+
+    def push(self, query, seed, depth, priority):
+        if depth > self.max_depth or self.key(query) in self.seen:
+            return
+        # 同一个词可能因为后来拿到更多来源而再次入队 (更高优先级)，出队时再去重
+        heapq.heappush(self.heap, (-priority, depth, next(self.counter), query, seed))
+
+    def add_seeds(self, seeds, suffixes):
+        for seed in seeds:
+            self.push(seed, seed, 0, self.SEED_PRIORITY)
+            for suffix in suffixes:
+                self.push(f"{seed} {suffix}", seed, 0, self.SEED_PRIORITY)
+
+    def _drop_seen(self):
+        while self.heap and self.key(self.heap[0][3]) in self.seen:
+            heapq.heappop(self.heap)
+
+    def __len__(self):
+        self._drop_seen()
+        return len(self.heap)
+
+    def pop(self):
+        self._drop_seen()
+        if not self.heap:
+            return None
+        _, depth, _, query, seed = heapq.heappop(self.heap)
+        self.seen.add(self.key(query))
+        return query, seed, depth
+
+    def mark_done(self, query):
+        self.seen.add(self.key(query))
+
+    def expand(self, task, results, temp_storage):
+        """把本次结果里通过共识筛选的联想词放进下一层"""
+        query, seed, depth = task
+        if depth >= self.max_depth:
+            return
+        for kw in {item['kw'] for item in results}:
+            sources = temp_storage[kw]['sources']
+            if passes_consensus(kw, sources):
+                self.push(kw, seed, depth + 1, len(sources))
+
+# ==========================================
+# 💾 断点续跑
+# ==========================================
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    """读取已完成的任务: { query: record }，容忍被中断时写了一半的最后一行"""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[record['query']] = record
+    return done
+
+class Checkpoint:
+    """每完成一个任务就追加一行 JSONL，崩溃后可从断点继续"""
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, task, results):
+        query, seed, depth = task
+        record = {'query': query, 'seed': seed, 'depth': depth, 'results': results}
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def record_results(temp_storage, results, task=None):
+    for item in results:
+        kw = item['kw']
+        # 记录数据
+        temp_storage[kw]['sources'].add(item['source'])
+        # 记录来源种子 (保留第一个遇到的即可)，连同发现它的查询词和层数
+        if not temp_storage[kw]['seed']:
+            temp_storage[kw]['seed'] = item['seed']
+            if task:
+                temp_storage[kw]['parent'] = task[0]
+                temp_storage[kw]['depth'] = task[2] + 1
+
+class KeywordStream:
+    """
+    边挖边入库：(关键词, 来源) 一旦通过共识筛选就立即 upsert 到关键词库，
+    不再等全部挖完才一次性写出。英文词在拿到第二个来源时才会写入两条来源记录。
+    """
+
+    def __init__(self, store, run_id):
+        self.store = store
+        self.run_id = run_id
+        # 断点续跑时沿用同一个 run，已入库的不再重复写
+        self.emitted = store.pairs(run_id)
+
+    def offer(self, results, temp_storage):
+        added = False
+        for kw in {item['kw'] for item in results}:
+            data = temp_storage[kw]
+            if not passes_consensus(kw, data['sources']):
+                continue
+            # 展平来源 (如果两个都有，就存两条记录，方便 Analyzer 统计热度)
+            for src in data['sources']:
+                if (kw, src) not in self.emitted:
+                    self.emitted.add((kw, src))
+                    self.store.upsert(kw, src, data['seed'], data['parent'], data['depth'], self.run_id)
+                    added = True
+        # 与断点文件同步提交：断点里记为完成的任务，其结果一定已经入库
+        if added:
+            self.store.commit()
+
+    def kept_keywords(self):
+        return len({kw for kw, _ in self.emitted})
+
+async def run_frontier(frontier, temp_storage, checkpoint, endpoints=None, cache=None, budget=REQUEST_BUDGET, stream=None):
+    """
+    多个 worker 从同一个 Frontier 取任务；结果回来后立即扩展下一层。
+    队列暂时为空但仍有任务在跑时，worker 等待新词入队而不是退出。
+    """
+    endpoints = endpoints or {}
+    clients = {
+        name: SourceClient(name, endpoints.get(name, cfg['url']), cfg['rate'], cfg['burst'])
+        for name, cfg in SOURCES.items()
+    }
+    changed = asyncio.Condition()
+    in_flight = 0
+    failed = 0
+
+    def spent():
+        return sum(c.requests for c in clients.values())
+
+    with tqdm(total=len(frontier), desc="Mining", unit="task", ncols=100) as pbar:
+        async def worker():
+            nonlocal in_flight, failed
+            while True:
+                async with changed:
+                    while not len(frontier) and in_flight:
+                        await changed.wait()
+                    # 预算按最坏情况预留：每个任务每个来源一次请求
+                    if not len(frontier) or spent() + in_flight * len(clients) >= budget:
+                        changed.notify_all()
+                        return
+                    task = frontier.pop()
+                    in_flight += 1
+                try:
+                    results = await mine_single_task(clients, task, cache)
+                    if results is None:
+                        failed += 1
+                        continue # 不写断点，下次 --resume 重试
+                    record_results(temp_storage, results, task)
+                    if stream:
+                        stream.offer(results, temp_storage)
+                    checkpoint.write(task, results)
+                    frontier.expand(task, results, temp_storage)
+                except Exception as e:
+                    failed += 1
+                    tqdm.write(f"❌ 任务出错 {task[0]!r}: {e!r}")
+                finally:
+                    async with changed:
+                        in_flight -= 1
+                        pbar.total = pbar.n + 1 + len(frontier) + in_flight
+                        pbar.update(1)
+                        changed.notify_all()
+
+        async with contextlib.AsyncExitStack() as stack:
+            for client in clients.values():
+                await stack.enter_async_context(client)
+            await asyncio.gather(*(worker() for _ in range(MAX_WORKERS)))
+
+    if failed:
+        print(f"⚠️  {failed} 个任务请求失败或出错，未写入断点，重新运行时会重试")
+    return spent(), failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="关键词挖掘 (Google + Bing 共识模式)")
+    parser.add_argument('--fresh', action='store_true', help="忽略断点文件，从头开始")
+    parser.add_argument('--stub', metavar='URL', help="使用本地模拟建议服务 (见 stub_server.py)，例如 http://127.0.0.1:8765")
+    parser.add_argument('--no-cache', action='store_true', help="不读写联想词缓存")
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL_HOURS, help=f"缓存有效期 (小时)，默认 {CACHE_TTL_HOURS}")
+    parser.add_argument('--depth', type=int, default=MAX_DEPTH, help=f"递归扩展深度，0 = 只挖种子，默认 {MAX_DEPTH}")
+    parser.add_argument('--budget', type=int, default=REQUEST_BUDGET, help=f"最多发出的网络请求数，默认 {REQUEST_BUDGET}")
+    parser.add_argument('--alphabets', default=','.join(DEFAULT_ALPHABETS),
+                        help=f"种子后缀字母表，可选 {', '.join(SUFFIX_ALPHABETS)}")
+    args = parser.parse_args(argv)
+
     print("🚀 启动【智能共识】挖掘模式 (Consensus Mode)...")
     print("🛡️  策略：保留中文 OR 保留(Google+Bing)共同推荐的英文热词")
-    
+
     seeds = load_seeds()
     if not seeds:
         print("❌ seeds.txt 为空")
         return
 
-    # 1. 生成任务
-    suffixes = get_suffixes()
-    tasks = []
-    for seed in seeds:
-        tasks.append((seed, seed))
-        for suffix in suffixes:
-            tasks.append((f"{seed} {suffix}", seed))
-            
-    print(f"📋 任务数: {len(tasks)}")
-    
+    # 1. 生成种子任务 (第 0 层)
+    alphabets = [a.strip() for a in args.alphabets.split(',') if a.strip() in SUFFIX_ALPHABETS]
+    frontier = Frontier(max_depth=args.depth)
+    frontier.add_seeds(seeds, get_suffixes(alphabets))
+    print(f"📋 种子任务数: {len(frontier)} | 扩展深度: {args.depth} | 请求预算: {args.budget}")
+
     # 2. 临时存储所有数据 (用于对比)
     # 格式: { "关键词": { "sources": {"Google", "Bing"}, "seed": "xxx" } }
-    temp_storage = defaultdict(lambda: {'sources': set(), 'seed': ''})
-    
-    print("⏳ 正在全面挖掘 (先采集，后清洗)...")
-    
-    with tqdm(total=len(tasks), desc="Mining", unit="task", ncols=100) as pbar:
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            future_to_task = {executor.submit(mine_single_task, task): task for task in tasks}
-            
-            for future in as_completed(future_to_task):
-                try:
-                    results = future.result()
-                    if results:
-                        for item in results:
-                            kw = item['kw']
-                            src = item['source']
-                            # 记录数据
-                            temp_storage[kw]['sources'].add(src)
-                            # 记录来源种子 (保留第一个遇到的即可)
-                            if not temp_storage[kw]['seed']:
-                                temp_storage[kw]['seed'] = item['seed']
-                    pbar.update(1)
-                except:
-                    pbar.update(1)
-
-    # 3. 核心清洗逻辑 (Smart Filtering)
-    print(f"\n🧹 正在清洗数据 (原始数据量: {len(temp_storage)})...")
-    final_keywords = []
-    
-    for kw, data in temp_storage.items():
-        sources = data['sources']
-        seed = data['seed']
-        
-        # --- 你的核心策略 ---
-        is_chinese = contains_chinese(kw)
-        is_consensus = ('Google' in sources and 'Bing' in sources) # 两个都有
-        
-        should_keep = False
-        
-        if is_chinese:
-            should_keep = True # 中文直接留
-        elif is_consensus:
-            should_keep = True # 英文如果双平台推荐，说明是热词，留！
-        
-        if should_keep:
-            # 存入列表，展平来源 (如果两个都有，就存两条记录，方便 Analyzer 统计热度)
-            for src in sources:
-                final_keywords.append([kw, src, seed])
-
-    print(f"✨ 清洗完成！保留了 {len(final_keywords)} 条【高价值】数据")
-    print(f"🗑️  丢弃了 {len(temp_storage) - len(set(x[0] for x in final_keywords))} 条【单平台英文噪音】")
-
-    # 4. 保存
-    if final_keywords:
-        with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Keyword', 'Source', 'Seed'])
-            writer.writerows(final_keywords)
-        print(f"✅ 结果已保存至: {OUTPUT_FILE}")
+    temp_storage = defaultdict(lambda: {'sources': set(), 'seed': '', 'parent': None, 'depth': 0})
+
+    if args.fresh and os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+    resuming = os.path.exists(CHECKPOINT_FILE)
+    done = load_checkpoint(CHECKPOINT_FILE)
+    if done:
+        # 按原顺序重放：恢复结果，并重建扩展队列
+        for query, record in done.items():
+            task = (query, record.get('seed', query), record.get('depth', 0))
+            record_results(temp_storage, record['results'], task)
+        for query, record in done.items():
+            task = (query, record.get('seed', query), record.get('depth', 0))
+            frontier.mark_done(query)
+            frontier.expand(task, record['results'], temp_storage)
+        print(f"♻️  从断点恢复: 已完成 {len(done)} 个任务，队列中还有 {len(frontier)} 个")
+
+    endpoints = {}
+    if args.stub:
+        base = args.stub.rstrip('/')
+        endpoints = {'Google': f"{base}/complete/search", 'Bing': f"{base}/osjson.aspx"}
+
+    # 模拟服务的结果单独缓存，避免污染真实数据
+    cache = None
+    if not args.no_cache:
+        cache_path = CACHE_FILE if not args.stub else CACHE_FILE.replace('.sqlite', '.stub.sqlite')
+        cache = SuggestionCache(cache_path, args.cache_ttl)
+
+    store = KeywordStore(STORE_FILE)
+    # 断点文件在 = 上一轮没完成 (哪怕所有任务都失败了、断点是空的)，沿用它的 run
+    run_id = store.unfinished_run() if resuming else None
+    if run_id is None:
+        run_id = store.begin_run({'depth': args.depth, 'budget': args.budget, 'alphabets': alphabets, 'stub': bool(args.stub)})
+    stream = KeywordStream(store, run_id)
+
+    print(f"⏳ 正在挖掘 (边挖边筛，通过共识筛选的词实时写入关键词库 run #{run_id})...")
+    checkpoint = Checkpoint(CHECKPOINT_FILE)
+    try:
+        spent, failed = asyncio.run(run_frontier(frontier, temp_storage, checkpoint, endpoints, cache, args.budget, stream))
+    except KeyboardInterrupt:
+        print(f"\n⏸️  已中断，进度已保存到 {CHECKPOINT_FILE}，重新运行即可从断点继续")
+        store.close()
+        return
+    finally:
+        checkpoint.close()
+        if cache:
+            cache.close()
+
+    print(f"📡 网络请求: {spent}/{args.budget} | 已查询 {len(frontier.seen)} 个词，未展开 {len(frontier)} 个")
+    if cache:
+        print(f"💾 缓存命中 {cache.hits} 次，实际请求 {cache.misses} 次")
+
+    # 3. 汇总 (筛选已在挖掘过程中完成)
+    kept = stream.kept_keywords()
+    print(f"\n✨ 原始数据量: {len(temp_storage)}，保留了 {len(stream.emitted)} 条【高价值】数据")
+    print(f"🗑️  丢弃了 {len(temp_storage) - kept} 条【单平台英文噪音】")
+
+    # 预算用完还有词没展开，或有任务失败：保留断点，run 也不结束，重新运行时接着挖
+    complete = not len(frontier) and not failed
+    if complete:
+        store.finish_run(run_id)
+    if stream.emitted:
+        print(f"✅ 结果已写入: {STORE_FILE} (run #{run_id}，新词 {store.new_keyword_count(run_id)} 个)")
     else:
         print("⚠️ 未保留任何数据")
+    store.close()
+    if complete:
+        # 本轮已完整结束，清理断点
+        if os.path.exists(CHECKPOINT_FILE):
+            os.remove(CHECKPOINT_FILE)
+    else:
+        print(f"⏸️  本轮未完成 (未展开 {len(frontier)} 个，失败 {failed} 个)，断点已保留在 {CHECKPOINT_FILE}，"
+              f"重新运行 (可加大 --budget) 即可继续")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,67 @@
+"""
+一键流水线：挖掘 → 清洗 → 分析
+miner.py 边挖边把结果 upsert 到关键词库 (keywords.sqlite)；挖完后清洗和分析在同一条
+生成器链上逐行处理 (读关键词库 → 黑名单过滤/意图分类 → 写 final_tasks.csv → 聚合)，
+中间不再把整张表读进内存。
+
+用法:
+    python pipeline.py                                   # 完整流程
+    python pipeline.py --stub http://127.0.0.1:8765      # 其余参数原样传给 miner.py
+    python pipeline.py --skip-mine                       # 直接处理库里最近一次运行的数据
+"""
+
+import os
+import argparse
+
+import miner
+import cleaner
+import analyzer
+
+
+def run_clean_analyze(rows, output_path=cleaner.OUTPUT_FILE):
+    """原始行 → clean_rows → final_tasks.csv (边写边传) → analyze_raw_data，返回 (analysis, stats)"""
+    blacklist = cleaner.load_blacklist()
+    matcher = cleaner.get_matcher(tuple(blacklist))
+    stats = {}
+    rows = cleaner.clean_rows(rows, matcher, stats)
+    rows = cleaner.write_rows(rows, output_path)
+    analysis = analyzer.analyze_raw_data(rows)
+    return analysis, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="挖掘 → 清洗 → 分析 一键流水线 (其余参数传给 miner.py)")
+    parser.add_argument('--skip-mine', action='store_true', help="跳过挖掘，直接处理现有数据")
+    args, miner_args = parser.parse_known_args()
+
+    if not args.skip_mine:
+        print("=" * 40 + "\n⛏️  Step 1/2: 挖掘\n" + "=" * 40)
+        miner.main(miner_args)
+        # 被中断时断点文件还在，此时不继续往下跑
+        if os.path.exists(miner.CHECKPOINT_FILE):
+            return
+
+    raw = cleaner.open_raw_rows()
+    if raw is None:
+        print(f"❌ {miner.STORE_FILE} 不存在，请先运行挖掘")
+        return
+    rows, source_name = raw
+
+    print("=" * 40 + "\n🧹 Step 2/2: 清洗 + 分析\n" + "=" * 40)
+    print(f"📥 数据来源: {source_name}")
+    try:
+        analysis, stats = run_clean_analyze(rows)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    print(f"🧹 处理 {stats.get('processed', 0)} 条，黑名单过滤 {stats.get('filtered', 0)} 条，"
+          f"保留 {analysis['total_raw']} 条 → {cleaner.OUTPUT_FILE}")
+    if not analysis['total_raw']:
+        print("⚠️ 清洗后没有剩余关键词，跳过报表")
+        return
+    analyzer.generate_html(analysis)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+本地模拟建议服务 (Stub Suggestion Server)
+模拟 Google / Bing 联想词接口，用于离线调试 miner.py 的并发、限速与断点续跑。
+
+用法:
+    python stub_server.py --port 8765
+    python miner.py --stub http://127.0.0.1:8765
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# 每个查询返回的模拟联想词 (部分两边都有 -> 触发共识逻辑)
+SHARED_TAILS = ['教程', '下载', 'download']
+GOOGLE_TAILS = ['官网', 'app']
+BING_TAILS = ['中文版', 'web']
+
+
+def make_suggestions(query, tails):
+    return [f"{query} {tail}" for tail in SHARED_TAILS + tails]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0 # 每个请求的模拟延迟 (秒)
+    error_rate = 0.0 # 随机返回 503 的比例
+    hits = Counter() # path -> 请求次数
+    lock = threading.Lock()
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+
+        with self.lock:
+            self.hits[parsed.path] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_error(503)
+            return
+
+        if parsed.path == '/complete/search':
+            query = params.get('q', [''])[0]
+            body = [query, make_suggestions(query, GOOGLE_TAILS), [], {}]
+        elif parsed.path == '/osjson.aspx':
+            query = params.get('query', [''])[0]
+            body = [query, make_suggestions(query, BING_TAILS)]
+        elif parsed.path == '/stats':
+            body = dict(self.hits)
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(host='127.0.0.1', port=0, latency=0.0, error_rate=0.0):
+    """在后台线程启动服务，返回 (server, base_url)。port=0 表示随机端口。"""
+    handler = type('Handler', (StubHandler,), {'latency': latency, 'error_rate': error_rate, 'hits': Counter()})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟 Google/Bing 联想词接口")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="每个请求的延迟 (秒)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="随机 503 比例 (0~1)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.host, args.port, args.latency, args.error_rate)
+    print(f"🧪 Stub suggestion server running at {base_url}  (Ctrl+C 停止)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
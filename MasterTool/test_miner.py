@@ -0,0 +1,89 @@
+"""
+miner.py 端到端测试：对本地模拟建议服务 (stub_server.py) 跑完整的 main()，
+覆盖预算用完后的断点续跑和请求失败后的重试。
+
+    cd MasterTool && python -m pytest -q
+"""
+
+import os
+import json
+
+import pytest
+
+import miner
+from keyword_store import KeywordStore
+from stub_server import start_stub_server
+
+SEEDS = ['telegram', '电报']
+ARGS = ['--no-cache', '--depth', '0', '--alphabets', 'digits']
+TASKS = len(SEEDS) * 11 # 每个种子 + 10 个数字后缀
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """所有文件都放到临时目录，限速放开"""
+    (tmp_path / 'seeds.txt').write_text('\n'.join(SEEDS) + '\n', encoding='utf-8')
+    monkeypatch.setattr(miner, 'SEEDS_FILE', str(tmp_path / 'seeds.txt'))
+    monkeypatch.setattr(miner, 'CHECKPOINT_FILE', str(tmp_path / 'miner_checkpoint.jsonl'))
+    monkeypatch.setattr(miner, 'CACHE_FILE', str(tmp_path / 'suggest_cache.sqlite'))
+    monkeypatch.setattr(miner, 'STORE_FILE', str(tmp_path / 'keywords.sqlite'))
+    monkeypatch.setattr(miner, 'SOURCES', {name: dict(cfg, rate=1000.0, burst=8) for name, cfg in miner.SOURCES.items()})
+    return tmp_path
+
+
+@pytest.fixture
+def stub():
+    server, base_url = start_stub_server()
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+
+
+def checkpoint_queries():
+    if not os.path.exists(miner.CHECKPOINT_FILE):
+        return None
+    with open(miner.CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
+        return [json.loads(line)['query'] for line in f]
+
+
+def runs():
+    store = KeywordStore(miner.STORE_FILE)
+    try:
+        return [(run_id, finished_at is not None, new) for run_id, _, finished_at, new in store.runs()]
+    finally:
+        store.close()
+
+
+def test_resume_after_budget(workdir, stub):
+    server, base_url = stub
+    hits = server.RequestHandlerClass.hits
+
+    miner.main(['--stub', base_url, '--budget', '10'] + ARGS)
+    first = checkpoint_queries()
+    assert first and len(first) < TASKS # 预算用完：断点保留，还有任务没挖
+    [(run_id, finished, _)] = runs()
+    assert (run_id, finished) == (1, False)
+
+    miner.main(['--stub', base_url, '--budget', '1000'] + ARGS)
+    assert checkpoint_queries() is None # 跑完才清理断点
+    # 第二次只挖剩下的任务，已完成的不重复请求
+    assert hits['/complete/search'] == TASKS
+    assert hits['/osjson.aspx'] == TASKS
+    [(run_id, finished, new)] = runs()
+    assert (run_id, finished) == (1, True) and new > 0
+
+
+def test_failed_requests_are_retried(workdir, stub):
+    server, base_url = stub
+    server.RequestHandlerClass.error_rate = 1.0
+
+    miner.main(['--stub', base_url, '--budget', '1000'] + ARGS)
+    assert checkpoint_queries() == [] # 全部失败：一个任务都不记为完成
+    assert runs() == [(1, False, 0)]
+
+    server.RequestHandlerClass.error_rate = 0.0
+    miner.main(['--stub', base_url, '--budget', '1000'] + ARGS)
+    assert checkpoint_queries() is None
+    assert server.RequestHandlerClass.hits['/complete/search'] == 2 * TASKS # 失败的任务第二次全部重新请求
+    [(run_id, finished, new)] = runs()
+    assert (run_id, finished) == (1, True) and new > 0
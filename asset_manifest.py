@@ -0,0 +1,107 @@
+"""
+Content-hash fingerprinting for /assets/.
+
+Every top-level file in assets/ (logo.png, favicon.ico, search.js, ...) is
+copied to name.<hash>.ext and the mapping is written to asset-manifest.json:
+
+    {"/assets/logo.png": "/assets/logo.3f2a9c01de.png", ...}
+
+build.py sends every href/src it already passes through clean_url() through
+asset_url() as well, so pages reference the fingerprinted copy and the
+one-year immutable cache on /assets/* can never serve a stale file.
+A reference that is already fingerprinted (from a previous build) is mapped
+back to its source name first, so rebuilding is idempotent and picks up
+the new hash when the file changes.
+
+Files that are fingerprinted by their own stage (tailwind.<hash>.css,
+icons.<hash>.svg) and sub-directories (img/, search/) are left alone.
+"""
+import os
+import re
+import glob
+import json
+import shutil
+import hashlib
+
+# ================= Configuration =================
+ASSETS_DIR = "assets"
+MANIFEST_FILE = "asset-manifest.json"
+HASH_LENGTH = 10
+
+FINGERPRINT_RE = re.compile(r'^(?P<stem>.+)\.[0-9a-f]{%d}(?P<ext>\.[A-Za-z0-9]+)$' % HASH_LENGTH)
+ASSET_REF = r'/' + re.escape(ASSETS_DIR) + r'/[A-Za-z0-9_.-]+\.[A-Za-z0-9]+(?![\w/-])'
+
+# logical URL -> fingerprinted URL, filled by fingerprint_assets()
+_manifest = {}
+
+
+def logical_url(url):
+    """'/assets/logo.3f2a9c01de.png' -> '/assets/logo.png' (when that source exists); other URLs unchanged"""
+    directory, _, name = url.rpartition('/')
+    match = FINGERPRINT_RE.match(name)
+    if match:
+        original = f"{directory}/{match.group('stem')}{match.group('ext')}"
+        if original in _manifest:
+            return original
+    return url
+
+
+def asset_url(url):
+    """Root-relative asset URL (query/fragment kept) -> current fingerprinted URL; anything else unchanged"""
+    if not url or not url.startswith(f"/{ASSETS_DIR}/"):
+        return url
+    path, rest = re.match(r'([^?#]*)(.*)', url, re.S).groups()
+    return _manifest.get(logical_url(path), path) + rest
+
+
+def fingerprint_assets(assets_dir=ASSETS_DIR, manifest_path=MANIFEST_FILE):
+    """
+    Copy every source asset to name.<hash>.ext, remove superseded copies and
+    write the manifest. Returns (manifest, number of new copies).
+    """
+    _manifest.clear()
+    sources = [path for path in sorted(glob.glob(os.path.join(assets_dir, '*')))
+               if os.path.isfile(path) and not FINGERPRINT_RE.match(os.path.basename(path))]
+    written = 0
+    for path in sources:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:HASH_LENGTH]
+        stem, ext = os.path.splitext(os.path.basename(path))
+        name = f"{stem}.{digest}{ext}"
+        target = os.path.join(assets_dir, name)
+        if not os.path.exists(target):
+            shutil.copy2(path, target)
+            written += 1
+        # Older fingerprints of this file (the pages are rewritten to the new one in the same build)
+        for old in glob.glob(os.path.join(assets_dir, f"{glob.escape(stem)}.*{ext}")):
+            old_name = os.path.basename(old)
+            match = FINGERPRINT_RE.match(old_name)
+            if old_name != name and match and match.group('stem') == stem:
+                os.remove(old)
+        _manifest[f"/{assets_dir}/{stem}{ext}"] = f"/{assets_dir}/{name}"
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(_manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return dict(_manifest), written
+
+
+def rewrite_asset_refs(paths, origin=''):
+    """
+    Text pass for pages build.py does not rebuild (go/, templates, ...):
+    every /assets/<file> reference, root-relative or on our own origin
+    (schema.org logos), is pointed at the current fingerprint.
+    Returns the number of files changed.
+    """
+    prefix = r'(?:(?<![\w./-])' + (r'|(?<=' + re.escape(origin) + r')' if origin else '') + ')'
+    pattern = re.compile(prefix + ASSET_REF)
+    changed = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        updated = pattern.sub(lambda m: asset_url(m.group(0)), html)
+        if updated != html:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(updated)
+            changed += 1
+    return changed
@@ -0,0 +1,178 @@
+/*
+ * Site search (index generated by build.py -> assets/search/)
+ * docs.json is fetched on first open; shard files are fetched lazily,
+ * only for the first characters that appear in the query.
+ */
+(function () {
+    'use strict';
+
+    var BASE = '/assets/search/';
+    var TERM_RE = /[\u4e00-\u9fa5]+|[a-z0-9]+/g;
+    var MAX_RESULTS = 10;
+
+    var meta = null;       // docs.json
+    var metaPromise = null;
+    var shards = {};       // shard id -> Promise<{term: [doc, weight, ...]}>
+    var overlay, input, list, timer;
+
+    function tokenize(text) {
+        var terms = [];
+        var runs = (text.normalize ? text.normalize('NFKC') : text).toLowerCase().match(TERM_RE) || [];
+        runs.forEach(function (run) {
+            if (run.charCodeAt(0) >= 0x4e00 && run.length > 1) {
+                for (var i = 0; i + 1 < run.length; i++) terms.push(run.substr(i, 2));
+            } else {
+                terms.push(run);
+            }
+        });
+        return terms;
+    }
+
+    function shardOf(term) {
+        var id = (term.charCodeAt(0) % meta.shards).toString(16);
+        return id.length < 2 ? '0' + id : id;
+    }
+
+    function loadMeta() {
+        if (!metaPromise) {
+            metaPromise = fetch(BASE + 'docs.json').then(function (r) { return r.json(); })
+                .then(function (data) { meta = data; return data; });
+        }
+        return metaPromise;
+    }
+
+    function loadShard(id) {
+        if (!shards[id]) {
+            shards[id] = fetch(BASE + id + '.json?v=' + meta.v)
+                .then(function (r) { return r.ok ? r.json() : {}; })
+                .catch(function () { return {}; });
+        }
+        return shards[id];
+    }
+
+    function postingsFor(term, shard, isLast) {
+        if (shard[term]) return [shard[term]];
+        // The last word may still be being typed: treat Latin words and a lone
+        // Chinese character as a prefix (all terms sharing a first character live in one shard)
+        if (isLast && (/^[a-z0-9]+$/.test(term) || term.length === 1)) {
+            return Object.keys(shard).filter(function (t) { return t.indexOf(term) === 0; })
+                .map(function (t) { return shard[t]; });
+        }
+        return [];
+    }
+
+    function search(query) {
+        var terms = tokenize(query).filter(function (t, i, all) { return all.indexOf(t) === i; });
+        if (!terms.length) return Promise.resolve([]);
+        return loadMeta().then(function () {
+            var ids = terms.map(shardOf).filter(function (t, i, all) { return all.indexOf(t) === i; });
+            return Promise.all(ids.map(loadShard)).then(function (loaded) {
+                var byId = {};
+                ids.forEach(function (id, i) { byId[id] = loaded[i]; });
+                var n = meta.docs.length;
+                var scores = {}, hits = {};
+                terms.forEach(function (term, i) {
+                    var lists = postingsFor(term, byId[shardOf(term)], i === terms.length - 1);
+                    lists.forEach(function (flat) {
+                        var idf = Math.log(1 + n / (flat.length / 2));
+                        for (var j = 0; j < flat.length; j += 2) {
+                            var doc = flat[j];
+                            scores[doc] = (scores[doc] || 0) + flat[j + 1] * idf;
+                            hits[doc] = (hits[doc] || 0) + 1 / lists.length;
+                        }
+                    });
+                });
+                return Object.keys(scores)
+                    .sort(function (a, b) { return (hits[b] - hits[a]) || (scores[b] - scores[a]); })
+                    .slice(0, MAX_RESULTS)
+                    .map(function (doc) { return meta.docs[doc]; });
+            });
+        });
+    }
+
+    function escapeHtml(s) {
+        return String(s).replace(/[&<>"']/g, function (c) {
+            return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+        });
+    }
+
+    function render(results, query) {
+        if (!query.trim()) {
+            list.innerHTML = '';
+            return;
+        }
+        if (!results.length) {
+            list.innerHTML = '<li class="tgs-empty">没有找到相关文章</li>';
+            return;
+        }
+        list.innerHTML = results.map(function (doc) {
+            return '<li><a href="' + escapeHtml(doc[0]) + '"><strong>' + escapeHtml(doc[1]) + '</strong>' +
+                '<span>' + escapeHtml(doc[2]) + '</span></a></li>';
+        }).join('');
+    }
+
+    function build() {
+        // Styled here (not with Tailwind classes) so the overlay does not depend on the page CSS build
+        var style = document.createElement('style');
+        style.textContent =
+            '.tgs-overlay{position:fixed;inset:0;z-index:100;background:rgba(2,6,23,.8);backdrop-filter:blur(4px);display:none;padding:10vh 1rem}' +
+            '.tgs-overlay.open{display:block}' +
+            '.tgs-panel{max-width:40rem;margin:0 auto;background:#1e293b;border:1px solid rgba(255,255,255,.1);border-radius:1rem;overflow:hidden;box-shadow:0 25px 50px rgba(0,0,0,.5)}' +
+            '.tgs-input{width:100%;padding:1rem 1.25rem;background:transparent;border:0;border-bottom:1px solid rgba(255,255,255,.1);color:#fff;font-size:1rem;outline:none}' +
+            '.tgs-list{list-style:none;margin:0;padding:.5rem;max-height:60vh;overflow-y:auto}' +
+            '.tgs-list a{display:block;padding:.75rem;border-radius:.5rem;color:#e2e8f0;text-decoration:none}' +
+            '.tgs-list a:hover,.tgs-list a:focus{background:rgba(36,161,222,.15);outline:none}' +
+            '.tgs-list strong{display:block;color:#fff;font-size:.95rem}' +
+            '.tgs-list span{display:block;color:#94a3b8;font-size:.8rem;margin-top:.25rem;overflow:hidden;text-overflow:ellipsis;white-space:nowrap}' +
+            '.tgs-empty{padding:1rem;color:#94a3b8;text-align:center;font-size:.9rem}';
+        document.head.appendChild(style);
+
+        overlay = document.createElement('div');
+        overlay.className = 'tgs-overlay';
+        overlay.setAttribute('role', 'dialog');
+        overlay.setAttribute('aria-label', '站内搜索');
+        overlay.innerHTML = '<div class="tgs-panel"><input class="tgs-input" type="search" placeholder="搜索教程，例如：注册、下载、中文" autocomplete="off"><ul class="tgs-list"></ul></div>';
+        document.body.appendChild(overlay);
+        input = overlay.querySelector('input');
+        list = overlay.querySelector('ul');
+
+        overlay.addEventListener('click', function (e) { if (e.target === overlay) close(); });
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            var query = input.value;
+            timer = setTimeout(function () {
+                search(query).then(function (results) {
+                    if (input.value === query) render(results, query);
+                });
+            }, 100);
+        });
+    }
+
+    function open() {
+        if (!overlay) build();
+        overlay.classList.add('open');
+        input.focus();
+        loadMeta();
+    }
+
+    function close() {
+        if (overlay) overlay.classList.remove('open');
+    }
+
+    document.addEventListener('click', function (e) {
+        var toggle = e.target.closest && e.target.closest('[data-search-toggle]');
+        if (toggle) {
+            e.preventDefault();
+            open();
+        }
+    });
+    document.addEventListener('keydown', function (e) {
+        var typing = /^(INPUT|TEXTAREA|SELECT)$/.test(document.activeElement && document.activeElement.tagName);
+        if ((e.key === '/' && !typing) || (e.key === 'k' && (e.ctrlKey || e.metaKey))) {
+            e.preventDefault();
+            open();
+        } else if (e.key === 'Escape') {
+            close();
+        }
+    });
+})();
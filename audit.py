@@ -1,14 +1,18 @@
 import os
-import sys
-import re
 import csv
+import time
+import json
+import argparse
 import requests
 import concurrent.futures
 from bs4 import BeautifulSoup
-from colorama import init, Fore, Style
-from urllib.parse import urlparse, urljoin, unquote
-from collections import defaultdict, deque
-from pathlib import Path
+from colorama import init, Fore
+from urllib.parse import unquote
+from collections import defaultdict
+from link_graph import LinkGraph
+from audit_output import FindingsWriter, summarize_findings, write_sarif
+from audit_rules import PageModel, RuleRegistry
+from audit_crawl import Crawler, clean_url_path, rel_path_of
 
 # Initialize colorama
 init(autoreset=True)
@@ -25,8 +29,26 @@ class Config:
         self.ignore_url_substrings = ['cdn-cgi']
         self.ignore_files_substrings = ['google', '404.html', 'template']
         self.redirects = {}
+
+        # Link Graph: pages whose click distance is reported in 'Hub Depth'
+        self.hub_pages = ['/', '/blog']
+
+        # Rule overrides from audit_config.json: {"rules": {"missing_h1": {"enabled": false, "weight": 3}}}
+        self.rule_settings = {}
         
     def load(self):
+        # Load audit_config.json (optional)
+        config_path = os.path.join(self.root_dir, 'audit_config.json')
+        if os.path.exists(config_path):
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.rule_settings = data.get('rules', {})
+                self.hub_pages = data.get('hub_pages', self.hub_pages)
+                print(f"{Fore.CYAN}Loaded rule settings for {len(self.rule_settings)} rules from audit_config.json")
+            except Exception as e:
+                print(f"{Fore.RED}[WARN] Failed to read audit_config.json: {e}")
+
         # Load _redirects
         redirects_path = os.path.join(self.root_dir, '_redirects')
         if os.path.exists(redirects_path):
@@ -67,30 +89,45 @@ class Config:
             print(f"{Fore.RED}[ERROR] Failed to read index.html: {e}")
 
 class Auditor:
-    def __init__(self):
+    def __init__(self, findings_path='audit_findings.jsonl', sarif_path=None):
         self.config = Config()
         self.config.load()
+
+        # Findings are streamed to JSONL as they happen; the report is built from that file
+        self.findings_path = findings_path
+        self.sarif_path = sarif_path
+        self.findings = None
+
+        # Audit checks; weights and on/off switches come from audit_config.json
+        self.rules = RuleRegistry(settings=self.config.rule_settings)
         
         self.html_files = [] # List of full paths
         self.inbound_links = defaultdict(int) # clean_path -> count
         self.outbound_internal_links = defaultdict(int) # clean_path -> count
+        self.outbound_external_links = defaultdict(int) # clean_path -> count
         self.internal_graph = defaultdict(set) # clean_path -> set(clean_target_paths)
         self.page_details = {} # clean_path -> {title, depth, etc}
         self.external_links = set() # Set of (url, source_file)
+        self.link_graph = None # LinkGraph built from internal_graph
+        self.crawler = None # Set in crawl mode; links are then resolved against HTTP responses
         
         self.score = 100
-        self.issues = {
-            'local_dead_links': 0,
-            'external_dead_links': 0,
-            'missing_h1': 0,
-            'bad_url_format': 0,
-            'missing_schema': 0,
-            'orphans': 0,
-            'short_meta_desc': 0
-        }
+        self.issues = {rule_id: 0 for rule_id in self.rules.rules}
         
         # Cache for validation
         self.checked_external_urls = {} # url -> status_code
+        self.image_sizes = {} # image URL -> bytes on disk (0 if not found)
+
+    def report_finding(self, rule_id, severity, message, page=None, target=None, echo=True):
+        """Print a finding to the console and append it to the findings stream"""
+        if echo:
+            if severity == 'error':
+                print(f"{Fore.RED}[ERROR] {message}")
+            else:
+                print(f"{Fore.YELLOW}[WARN] {message}")
+        if self.findings:
+            self.findings.emit(rule_id, severity, page, message, target=target,
+                               deduction=self.rules.weight(rule_id))
 
     def is_ignored_file(self, file_path):
         name = os.path.basename(file_path)
@@ -192,7 +229,19 @@ class Auditor:
     def audit_page(self, file_path):
         rel_path = os.path.relpath(file_path, self.config.root_dir)
         clean_source = self.get_clean_path(file_path)
+
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+
+            model = self.build_model(content, file_path, rel_path, clean_source)
+            self.check_model(model)
         
+        except Exception as e:
+            print(f"{Fore.RED}[ERROR] Processing {rel_path}: {e}")
+
+    def build_model(self, content, file_path, rel_path, clean_source):
+        """Parse a page (from disk or from a crawl response) into its PageModel"""
         # Initialize page details
         if clean_source not in self.page_details:
             self.page_details[clean_source] = {
@@ -201,148 +250,109 @@ class Auditor:
                 'depth': float('inf')
             }
 
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # --- Metadata ---
-                # Title
-                title_tag = soup.find('title')
-                if title_tag and title_tag.string:
-                    self.page_details[clean_source]['title'] = title_tag.string.strip()
-
-                # Meta Description Check
-                meta_desc = soup.find('meta', attrs={'name': 'description'})
-                if meta_desc and meta_desc.get('content'):
-                    desc_len = len(meta_desc['content'].strip())
-                    if desc_len < 100:
-                        print(f"{Fore.YELLOW}[WARN] Meta description too short ({desc_len} chars): {rel_path}")
-                        self.score -= 2
-                        self.issues['short_meta_desc'] += 1
-
-                # --- Semantics ---
-                # H1 Check
-                h1s = soup.find_all('h1')
-                if len(h1s) != 1:
-                    if 'section.html' not in rel_path and 'go/' not in rel_path:
-                         print(f"{Fore.RED}[ERROR] H1 count is {len(h1s)} (expected 1): {rel_path}")
-                         self.score -= 5
-                         self.issues['missing_h1'] += 1
-                
-                # Schema Check
-                if 'sitemap.html' not in rel_path and 'section.html' not in rel_path and 'go/' not in rel_path:
-                    schema = soup.find('script', type='application/ld+json')
-                    if not schema:
-                        print(f"{Fore.YELLOW}[WARN] Missing JSON-LD Schema: {rel_path}")
-                        self.score -= 2
-                        self.issues['missing_schema'] += 1
-                    
-                # Breadcrumb Check (simplified)
-                breadcrumb = soup.find(attrs={"aria-label": "breadcrumb"}) or soup.find(class_=lambda x: x and 'breadcrumb' in x)
-                # Not strictly deducting for breadcrumb per spec summary, but good to check. 
-                # Spec says "Check page contains..." under Semantics. Let's warn if missing on non-home pages?
-                # Spec doesn't assign specific points for breadcrumb in "Reporting" section, only "Missing Schema".
-                # So I'll just log it as info or warning without deduction if strict.
-                # However, usually breadcrumb is good.
-                
-                # --- Links ---
-                links = soup.find_all('a')
-                for link in links:
-                    href = link.get('href')
-                    if not href:
-                        continue
-                        
-                    if self.is_ignored_url(href):
-                        continue
-                        
-                    # External Links
-                    if href.startswith('http://') or href.startswith('https://'):
-                        # Check for absolute internal URL
-                        if self.config.base_url and href.startswith(self.config.base_url):
-                            print(f"{Fore.YELLOW}[WARN] Absolute Internal URL: {href} in {rel_path}")
-                            self.score -= 2
-                            self.issues['bad_url_format'] += 1
-                            # Treat as internal for existence check?
-                            # Convert to relative path to check existence
-                            local_href = href[len(self.config.base_url):]
-                            candidates = self.resolve_local_link(file_path, local_href)
-                            exists, resolved_path = self.check_local_resource_exists(candidates)
-                            if not exists:
-                                print(f"{Fore.RED}[ERROR] Dead Link (Internal Absolute): {href} in {rel_path}")
-                                self.score -= 10
-                                self.issues['local_dead_links'] += 1
-                            else:
-                                clean_source = self.get_clean_path(file_path)
-                                self.outbound_internal_links[clean_source] += 1
-                                clean_target = self.get_clean_path(resolved_path)
-                                self.inbound_links[clean_target] += 1
-                                self.internal_graph[clean_source].add(clean_target)
-                        else:
-                            # True External
-                            self.external_links.add(href)
-                            rel = link.get('rel', [])
-                            if 'nofollow' not in rel and 'noopener' not in rel:
-                                # Simple domain check to see if it's "authority" is hard. 
-                                # Spec says "Check rel=nofollow (for non-authority) or rel=noopener".
-                                # We'll just warn if neither is present.
-                                # print(f"{Fore.YELLOW}[WARN] External link missing rel='noopener': {href}")
-                                pass 
-                        continue
-                        
-                    # Internal Links
-                    # Check for redirects
-                    if href in self.config.redirects:
-                        # Count as inbound link for the redirect source itself
-                        # This prevents the redirect URL from being marked as orphan if it exists as a file (like /go/buy)
-                        # or just acknowledges it's being linked to.
-                        # We use the href as the key.
-                        # Ensure href starts with /
-                        clean_href = href if href.startswith('/') else '/' + href
-                        self.inbound_links[clean_href] += 1
-
-                        # Treat as valid, check if target is external
-                        target = self.config.redirects[href]
-                        if target.startswith('http'):
-                            self.external_links.add(target)
-                        else:
-                            clean_source = self.get_clean_path(file_path)
-                            self.outbound_internal_links[clean_source] += 1
-                        continue
+        soup = BeautifulSoup(content, 'html.parser')
+
+        # Single pass over the DOM; every rule reads from this model
+        start = time.perf_counter()
+        model = PageModel.from_soup(soup, file_path, rel_path, clean_source, html=content)
+        self.rules.record('page_model', time.perf_counter() - start)
+
+        if model.title:
+            self.page_details[clean_source]['title'] = model.title
+        return model
+
+    def check_model(self, model):
+        start = time.perf_counter()
+        self.collect_links(model)
+        self.rules.record('link_resolution', time.perf_counter() - start)
+
+        model.metrics['image_bytes'] = sum(self.image_size(src) for src in model.images)
+        self.page_details[model.clean_path].update(model.metrics, page_type=model.page_type)
+
+        self.rules.run_page(model, self)
+
+    def image_size(self, src):
+        """Bytes of a local image (root-relative or on our own domain); external images count as 0"""
+        if src not in self.image_sizes:
+            path = src.split('#')[0].split('?')[0]
+            if self.config.base_url and path.startswith(self.config.base_url):
+                path = path[len(self.config.base_url):]
+            local = os.path.join(self.config.root_dir, unquote(path).lstrip('/'))
+            self.image_sizes[src] = os.path.getsize(local) if path.startswith('/') and os.path.isfile(local) else 0
+        return self.image_sizes[src]
+
+    def resolve_target(self, file_path, href):
+        """href -> (exists, clean target path): on disk, or in the crawl results in crawl mode"""
+        if self.crawler:
+            return self.crawler.resolve(file_path, href)
+        candidates = self.resolve_local_link(file_path, href)
+        exists, resolved_path = self.check_local_resource_exists(candidates)
+        return exists, self.get_clean_path(resolved_path) if exists else None
+
+    def collect_links(self, model):
+        """
+        Resolve every anchor on the page once: update the link graph and
+        attach the resolved links to the model for the link rules.
+        """
+        file_path = model.file_path
+        clean_source = model.clean_path
 
-                    # URL Format Checks
-                    if not href.startswith('/'):
-                        print(f"{Fore.YELLOW}[WARN] Relative path used: {href} in {rel_path}")
-                        self.score -= 2
-                        self.issues['bad_url_format'] += 1
-                        
-                    if href.endswith('.html'):
-                        print(f"{Fore.YELLOW}[WARN] Link ends with .html: {href} in {rel_path}")
-                        self.score -= 2
-                        self.issues['bad_url_format'] += 1
-
-                    # Dead Link Check (Local File System)
-                    candidates = self.resolve_local_link(file_path, href)
-                    exists, resolved_path = self.check_local_resource_exists(candidates)
-                    
-                    if not exists:
-                        print(f"{Fore.RED}[ERROR] Dead Link (Local): {href} in {rel_path}")
-                        self.score -= 10
-                        self.issues['local_dead_links'] += 1
-                    else:
-                        # Link Equity (Inbound Links)
-                        # Map resolved path to clean URL
-                        clean_target = self.get_clean_path(resolved_path)
-                        self.inbound_links[clean_target] += 1
-                        
-                        clean_source = self.get_clean_path(file_path)
+        for href, rel in model.anchors:
+            if self.is_ignored_url(href):
+                continue
+                
+            # External Links
+            if href.startswith('http://') or href.startswith('https://'):
+                # Check for absolute internal URL
+                if self.config.base_url and href.startswith(self.config.base_url):
+                    # Convert to relative path to check existence
+                    local_href = href[len(self.config.base_url):]
+                    exists, clean_target = self.resolve_target(file_path, local_href)
+                    model.links.append({'href': href, 'kind': 'absolute_internal', 'exists': exists, 'resolved': clean_target})
+                    if exists and clean_target:
                         self.outbound_internal_links[clean_source] += 1
+                        self.inbound_links[clean_target] += 1
                         self.internal_graph[clean_source].add(clean_target)
-        
-        except Exception as e:
-            print(f"{Fore.RED}[ERROR] Processing {rel_path}: {e}")
+                else:
+                    # True External
+                    self.external_links.add(href)
+                    self.outbound_external_links[clean_source] += 1
+                    model.links.append({'href': href, 'kind': 'external', 'exists': None, 'resolved': None, 'rel': rel})
+                continue
+                
+            # Internal Links
+            # Check for redirects
+            if href in self.config.redirects:
+                # Count as inbound link for the redirect source itself
+                # This prevents the redirect URL from being marked as orphan if it exists as a file (like /go/buy)
+                # Ensure href starts with /
+                clean_href = href if href.startswith('/') else '/' + href
+                self.inbound_links[clean_href] += 1
+
+                # Treat as valid, check if target is external
+                target = self.config.redirects[href]
+                if target.startswith('http'):
+                    self.external_links.add(target)
+                    self.outbound_external_links[clean_source] += 1
+                else:
+                    self.outbound_internal_links[clean_source] += 1
+                model.links.append({'href': href, 'kind': 'redirect', 'exists': True, 'resolved': target})
+                continue
+
+            # Dead Link Check (Local File System, or HTTP status in crawl mode)
+            exists, clean_target = self.resolve_target(file_path, href)
+            model.links.append({'href': href, 'kind': 'internal', 'exists': exists, 'resolved': clean_target})
+            
+            if exists and clean_target:
+                # Link Equity (Inbound Links)
+                self.inbound_links[clean_target] += 1
+                self.outbound_internal_links[clean_source] += 1
+                self.internal_graph[clean_source].add(clean_target)
 
     def check_external_links(self):
+        if not self.rules.is_enabled('external_dead_links'):
+            return
+
         print(f"\n{Fore.BLUE}Checking {len(self.external_links)} external links...")
         
         def check_url(url):
@@ -359,41 +369,57 @@ class Auditor:
             future_to_url = {executor.submit(check_url, url): url for url in self.external_links}
             for future in concurrent.futures.as_completed(future_to_url):
                 url, status = future.result()
-                if status >= 400 or status == 0:
-                    print(f"{Fore.RED}[ERROR] Dead External Link: {url} (Status: {status})")
-                    self.score -= 5
-                    self.issues['external_dead_links'] += 1
+                self.checked_external_urls[url] = status
+
+        self.rules.run_site(self, 'external_dead_links')
+
+    def build_link_graph(self):
+        """Compile internal_graph into a CSR LinkGraph"""
+        self.link_graph = LinkGraph(self.internal_graph, pages=self.page_details.keys())
+        return self.link_graph
+
+    def audited_pages(self):
+        """Clean paths of every audited page (files on disk, or crawled HTML pages)"""
+        if self.crawler:
+            return list(self.page_details)
+        return [self.get_clean_path(file_path) for file_path in self.html_files]
 
     def calculate_click_depth(self):
-        """Calculate click depth (distance from root) using BFS"""
-        queue = deque([('/', 0)])
-        visited = {'/'}
-        
-        # Ensure root is in page_details even if not scanned yet (should be)
-        if '/' in self.page_details:
-            self.page_details['/']['depth'] = 0
-            
-        while queue:
-            current_page, depth = queue.popleft()
-            
-            # Update depth for current page
-            if current_page in self.page_details:
-                self.page_details[current_page]['depth'] = min(self.page_details[current_page]['depth'], depth)
-            
-            # Find neighbors
-            if current_page in self.internal_graph:
-                for neighbor in self.internal_graph[current_page]:
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        queue.append((neighbor, depth + 1))
-                        
-    def save_csv_report(self):
+        """Calculate click depth (distance from root) using a sparse BFS"""
+        graph = self.build_link_graph()
+        depths = graph.hub_depths(['/'])
+        root_depths = depths.get('/', depths[None])
+
+        for page, details in self.page_details.items():
+            details['depth'] = root_depths.get(page, float('inf'))
+
+    def analyze_link_graph(self):
+        """PageRank, strongly connected components and hub depth on the CSR graph"""
+        graph = self.link_graph if self.link_graph is not None else self.build_link_graph()
+
+        pagerank = graph.pagerank()
+        components, component_sizes = graph.strongly_connected_components()
+        hub_depths = graph.hub_depths(self.config.hub_pages)[None]
+
+        for page, details in self.page_details.items():
+            details['pagerank'] = pagerank.get(page, 0.0)
+            details['scc'] = components.get(page, -1)
+            details['scc_size'] = component_sizes.get(details['scc'], 0)
+            details['hub_depth'] = hub_depths.get(page, float('inf'))
+
+        return pagerank, component_sizes
+
+    def save_csv_report(self, issues_by_page=None):
         filename = 'audit_report.csv'
         print(f"\n{Fore.CYAN}Generating CSV report: {filename}...")
         
         try:
             with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['URL', 'Title', 'Click Depth', 'Inbound Links', 'Outbound Internal', 'Outbound External', 'Status']
+                fieldnames = ['URL', 'Title', 'Click Depth', 'Inbound Links', 'Outbound Internal', 'Outbound External',
+                              'PageRank', 'SCC', 'SCC Size', 'Hub Depth', 'Issues', 'Status',
+                              'TTFB ms', 'Latency ms', 'Bytes', 'Content-Encoding', 'Cache-Control',
+                              'Page Type', 'HTML Bytes', 'HTML Gzip Bytes', 'DOM Nodes', 'DOM Depth', 'JSON-LD',
+                              'JSON-LD Bytes', 'Blocking Scripts', 'Blocking Stylesheets', 'Image Bytes']
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 
                 writer.writeheader()
@@ -405,6 +431,9 @@ class Auditor:
                     depth = details['depth']
                     if depth == float('inf'):
                         depth = 'Orphan'
+                    hub_depth = details.get('hub_depth', float('inf'))
+                    if hub_depth == float('inf'):
+                        hub_depth = 'Unreachable'
                         
                     writer.writerow({
                         'URL': url,
@@ -412,45 +441,121 @@ class Auditor:
                         'Click Depth': depth,
                         'Inbound Links': self.inbound_links.get(url, 0),
                         'Outbound Internal': self.outbound_internal_links.get(url, 0),
-                        'Outbound External': 0, # TODO: Track per page if needed, currently global set
-                        'Status': '200' # Assumed existing local file
+                        'Outbound External': self.outbound_external_links.get(url, 0),
+                        'PageRank': f"{details.get('pagerank', 0.0):.6f}",
+                        'SCC': details.get('scc', -1),
+                        'SCC Size': details.get('scc_size', 0),
+                        'Hub Depth': hub_depth,
+                        'Issues': (issues_by_page or {}).get(url, 0),
+                        'Status': details.get('status', '200'), # Local files are assumed to be served
+                        # Response measurements, crawl mode only
+                        'TTFB ms': f"{details['ttfb'] * 1000:.1f}" if 'ttfb' in details else '',
+                        'Latency ms': f"{details['latency'] * 1000:.1f}" if 'latency' in details else '',
+                        'Bytes': details.get('bytes', ''),
+                        'Content-Encoding': details.get('content_encoding', ''),
+                        'Cache-Control': details.get('cache_control', ''),
+                        # Page weight (PageModel.metrics)
+                        'Page Type': details.get('page_type', ''),
+                        'HTML Bytes': details.get('html_bytes', ''),
+                        'HTML Gzip Bytes': details.get('html_gzip_bytes', ''),
+                        'DOM Nodes': details.get('dom_nodes', ''),
+                        'DOM Depth': details.get('dom_depth', ''),
+                        'JSON-LD': details.get('jsonld_count', ''),
+                        'JSON-LD Bytes': details.get('jsonld_bytes', ''),
+                        'Blocking Scripts': details.get('blocking_scripts', ''),
+                        'Blocking Stylesheets': details.get('blocking_stylesheets', ''),
+                        'Image Bytes': details.get('image_bytes', ''),
                     })
             print(f"{Fore.GREEN}CSV report saved successfully.")
         except Exception as e:
             print(f"{Fore.RED}Failed to save CSV report: {e}")
 
+    def crawl_site(self, start_url, concurrency):
+        """
+        Fetch the site over HTTP instead of reading files: every HTML page the
+        crawl reaches is parsed once into its PageModel, and once the crawl
+        is complete (so every link target has a status) the same link
+        resolution and page rules run on it.
+        """
+        self.crawler = Crawler(start_url, concurrency=concurrency)
+        models = []
+
+        def on_html(url, record, html):
+            path = url[len(self.crawler.origin):]
+            clean_source = clean_url_path(path.split('?')[0])
+            rel_path = rel_path_of(path.split('?')[0])
+            if clean_source in self.page_details or self.is_ignored_file(rel_path):
+                return []
+            try:
+                model = self.build_model(html, url, rel_path, clean_source)
+            except Exception as e:
+                print(f"{Fore.RED}[ERROR] Processing {url}: {e}")
+                return []
+            self.page_details[clean_source].update(
+                status=str(record['status']), ttfb=record['ttfb'], latency=record['latency'], bytes=record['bytes'],
+                content_encoding=record['headers'].get('content-encoding', ''),
+                cache_control=record['headers'].get('cache-control', ''))
+            models.append(model)
+            return [href for href, _ in model.anchors if not self.is_ignored_url(href)]
+
+        print(f"{Fore.BLUE}Crawling {self.crawler.origin} ({concurrency} connections)...")
+        results = self.crawler.run(on_html)
+
+        for model in models:
+            try:
+                self.check_model(model)
+            except Exception as e:
+                print(f"{Fore.RED}[ERROR] Processing {model.file_path}: {e}")
+
+        self.print_crawl_summary(results)
+
+    def print_crawl_summary(self, results):
+        elapsed = self.crawler.elapsed
+        print(f"{Fore.CYAN}Fetched {len(results)} URLs in {elapsed:.2f}s "
+              f"({len(results) / elapsed if elapsed else 0:,.0f} req/s), {len(self.page_details)} HTML pages audited.")
+
+        status_counts = defaultdict(int)
+        for record in results.values():
+            status_counts[record['status']] += 1
+        print("  Status codes: " + ', '.join(f"{status or 'error'}: {count}" for status, count in sorted(status_counts.items())))
+
+        # Entries build_model() created for pages whose fetch or parse then failed carry no timing
+        timed = {url: d for url, d in self.page_details.items() if d.get('latency') is not None}
+        if timed:
+            latencies = sorted(d['latency'] for d in timed.values())
+            ttfbs = sorted(d['ttfb'] for d in timed.values())
+            p50, p95 = latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(f"  HTML latency: p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, "
+                  f"max TTFB {ttfbs[-1] * 1000:.1f} ms; {sum(d.get('bytes', 0) for d in timed.values()) / 1024:.1f} KB transferred")
+
+        uncompressed = sorted(url for url, d in timed.items() if not d.get('content_encoding'))
+        uncached = sorted(url for url, d in timed.items() if not d.get('cache_control'))
+        if uncompressed:
+            print(f"{Fore.YELLOW}  HTML served without compression: {len(uncompressed)} pages (e.g. {uncompressed[0]})")
+        if uncached:
+            print(f"{Fore.YELLOW}  HTML served without Cache-Control: {len(uncached)} pages (e.g. {uncached[0]})")
+        for path, record in sorted(results.items()):
+            if record['status'] == 0 or record['status'] >= 400:
+                print(f"{Fore.RED}  {record['status'] or record['error']}: {path}")
+
     def generate_report(self):
         self.calculate_click_depth()
+        pagerank, component_sizes = self.analyze_link_graph()
         
         print(f"\n{Fore.MAGENTA}{'='*30} AUDIT REPORT {'='*30}")
         
         # Orphans
         # Initialize counts for all known pages to 0 if not present
-        for file_path in self.html_files:
-            clean_path = self.get_clean_path(file_path)
+        for clean_path in self.audited_pages():
             if clean_path not in self.inbound_links:
                 self.inbound_links[clean_path] = 0
                 
-        orphans = []
-        ignored_orphans = ['/404', '/google', '/layout_template', '/section', '/sitemap'] # Basic ignored
-        
-        for page, count in self.inbound_links.items():
-            if count == 0:
-                # Check if ignored
-                is_ignored = False
-                if page == '/' or page == '': is_ignored = True
-                for ig in ignored_orphans:
-                    if ig in page: is_ignored = True
-                
-                if not is_ignored:
-                    orphans.append(page)
+        orphans = self.rules.run_site(self, 'orphans')
 
         if orphans:
             print(f"\n{Fore.YELLOW}Orphan Pages (No Inbound Links):")
-            for o in orphans:
-                print(f"  {o}")
-                self.score -= 5
-                self.issues['orphans'] += 1
+            for _, page, _ in orphans:
+                print(f"  {page}")
         
         # Top Pages
         print(f"\n{Fore.GREEN}Top 10 Pages by Inbound Internal Links:")
@@ -458,6 +563,22 @@ class Auditor:
         for page, count in top_pages:
             print(f"  {page}: {count}")
 
+        # Link Equity (PageRank)
+        print(f"\n{Fore.GREEN}Top 10 Pages by Internal PageRank:")
+        known_pages = [p for p in pagerank if p in self.page_details]
+        for page in sorted(known_pages, key=lambda p: pagerank[p], reverse=True)[:10]:
+            print(f"  {page}: {pagerank[page]:.4f}")
+
+        # Strongly Connected Components
+        print(f"\n{Fore.BLUE}Strongly Connected Components: {len(component_sizes)}")
+        if component_sizes:
+            print(f"  Largest component: {component_sizes[0]} of {len(self.link_graph)} pages")
+            trapped = [p for p, d in self.page_details.items() if d.get('scc', 0) != 0]
+            if trapped:
+                print(f"{Fore.YELLOW}  Pages outside the main component (can't navigate back):")
+                for p in sorted(trapped):
+                    print(f"    {p}")
+
         # Weakly Linked Pages
         print(f"\n{Fore.YELLOW}Weakly Linked Pages (Inbound < 3, excluding orphans):")
         weak_pages = [p for p, c in self.inbound_links.items() if 0 < c < 3]
@@ -489,8 +610,7 @@ class Auditor:
         low_link_pages = []
         no_link_pages = []
         
-        for file_path in self.html_files:
-            clean_path = self.get_clean_path(file_path)
+        for clean_path in self.audited_pages():
             count = self.outbound_internal_links[clean_path]
             
             if count == 0:
@@ -514,8 +634,11 @@ class Auditor:
         else:
              print(f"{Fore.GREEN}  All pages have 3+ internal outbound links.")
 
-        # Final Score
-        self.score = max(0, self.score)
+        # Final Score (replayed from the findings stream)
+        summary = summarize_findings(self.findings_path)
+        for rule_id, count in summary['by_rule'].items():
+            self.issues[rule_id] = count
+        self.score = max(0, 100 - summary['deductions'])
         
         score_color = Fore.GREEN
         if self.score < 80: score_color = Fore.YELLOW
@@ -525,35 +648,63 @@ class Auditor:
         
         if self.score < 100:
             print(f"\n{Fore.WHITE}Deductions Breakdown:")
-            if self.issues['local_dead_links']: print(f"  Local Dead Links: -{self.issues['local_dead_links'] * 10}")
-            if self.issues['external_dead_links']: print(f"  External Dead Links: -{self.issues['external_dead_links'] * 5}")
-            if self.issues['missing_h1']: print(f"  Missing H1: -{self.issues['missing_h1'] * 5}")
-            if self.issues['bad_url_format']: print(f"  Bad URL Format: -{self.issues['bad_url_format'] * 2}")
-            if self.issues['missing_schema']: print(f"  Missing Schema: -{self.issues['missing_schema'] * 2}")
-            if self.issues['orphans']: print(f"  Orphans: -{self.issues['orphans'] * 5}")
+            for rule_id, deduction in summary['deductions_by_rule'].items():
+                if deduction:
+                    print(f"  {self.rules.labels().get(rule_id, rule_id)}: -{deduction}")
             
             print(f"\n{Fore.CYAN}Actionable Advice:")
             print("  Run 'python3 fix_links.py' to attempt automatic link fixes.")
             print("  Run 'python3 build.py' to rebuild static assets if needed.")
 
-        self.save_csv_report()
+        self.save_csv_report(summary['by_page'])
+
+        # Rule Timings
+        print(f"\n{Fore.BLUE}Rule Timings (cumulative):")
+        for name, seconds, calls in self.rules.timing_report():
+            print(f"  {name}: {seconds * 1000:.1f} ms over {calls} runs")
 
-    def run(self):
+        print(f"{Fore.CYAN}Findings stream: {self.findings_path} ({summary['total']} records)")
+        if self.sarif_path:
+            write_sarif(self.findings_path, self.sarif_path, self.rules.labels(), self.config.base_url)
+            print(f"{Fore.CYAN}SARIF log: {self.sarif_path}")
+
+    def run(self, crawl_url=None, concurrency=16):
         print(f"{Fore.GREEN}Starting SEO Audit...")
         if self.config.base_url:
             print(f"Base URL: {self.config.base_url}")
         else:
             print(f"{Fore.YELLOW}Base URL not detected.")
              
-        self.scan_files()
+        if not crawl_url:
+            self.scan_files()
         
-        print(f"{Fore.BLUE}Auditing pages...")
-        for file in self.html_files:
-            self.audit_page(file)
-            
-        self.check_external_links()
-        self.generate_report()
+        self.findings = FindingsWriter(self.findings_path)
+        try:
+            if crawl_url:
+                self.crawl_site(crawl_url, concurrency)
+            else:
+                print(f"{Fore.BLUE}Auditing pages...")
+                for file in self.html_files:
+                    self.audit_page(file)
+                
+            self.check_external_links()
+            self.generate_report()
+        finally:
+            self.findings.close()
 
 if __name__ == "__main__":
-    audit = Auditor()
-    audit.run()
+    parser = argparse.ArgumentParser(description="SEO audit for the static site")
+    parser.add_argument('--findings', default='audit_findings.jsonl', help="JSONL file that receives every finding as it is found")
+    parser.add_argument('--sarif', default=None, help="Also write a SARIF 2.1.0 log to this path")
+    parser.add_argument('--crawl', nargs='?', const='local', default=None, metavar='URL',
+                        help="Audit over HTTP by crawling from / on URL; without a URL (or 'local') serve.py is started on the build")
+    parser.add_argument('--concurrency', type=int, default=16, help="Parallel connections in crawl mode (default: 16)")
+    args = parser.parse_args()
+
+    audit = Auditor(findings_path=args.findings, sarif_path=args.sarif)
+    if args.crawl == 'local':
+        from serve import serve_in_background
+        with serve_in_background() as base_url:
+            audit.run(crawl_url=base_url, concurrency=args.concurrency)
+    else:
+        audit.run(crawl_url=args.crawl, concurrency=args.concurrency)
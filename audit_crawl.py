@@ -0,0 +1,271 @@
+import ssl
+import time
+import zlib
+import asyncio
+import concurrent.futures
+from collections import deque
+from urllib.parse import urljoin, urlsplit, unquote
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ================= Configuration =================
+USER_AGENT = 'SEOAuditBot/1.0 (crawl)'
+ACCEPT_ENCODING = 'br, gzip' if brotli else 'gzip' # Only ask for what can be decoded for parsing
+REQUEST_TIMEOUT = 10 # Seconds per request
+MAX_PAGES = 5000
+MAX_REDIRECTS = 5
+RECORD_HEADERS = ['content-type', 'content-encoding', 'cache-control', 'etag', 'location', 'link']
+
+
+def clean_url_path(path):
+    """Served URL path -> the clean path audit.py reports on ('/blog/' -> '/blog', '/about.html' -> '/about')"""
+    path = unquote(path) or '/'
+    if path.endswith('.html'):
+        path = path[:-5]
+    if path == '/index' or path.endswith('/index'):
+        path = path[:-5]
+    path = path.rstrip('/')
+    return path or '/'
+
+
+def rel_path_of(path):
+    """Served URL path -> the file the clean URL maps to, for rule messages and excludes"""
+    path = unquote(path).lstrip('/')
+    if not path or path.endswith('/'):
+        return path + 'index.html'
+    return path if '.' in path.rsplit('/', 1)[-1] else path + '.html'
+
+
+class Response:
+    def __init__(self, status, headers, body, ttfb, elapsed):
+        self.status = status
+        self.headers = headers # lower-case name -> value
+        self.body = body       # Bytes as received (still compressed)
+        self.ttfb = ttfb
+        self.elapsed = elapsed
+
+    def text(self):
+        encoding = self.headers.get('content-encoding', '').lower()
+        body = self.body
+        if encoding == 'gzip':
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            body = zlib.decompress(body)
+        elif encoding == 'br':
+            body = brotli.decompress(body)
+        return body.decode('utf-8', errors='ignore')
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection per crawl worker"""
+
+    def __init__(self, origin):
+        parts = urlsplit(origin)
+        self.https = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 80)
+        self.host_header = parts.netloc
+        self.reader = self.writer = None
+
+    async def request(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port, ssl=ssl.create_default_context() if self.https else None)
+        request = (f"GET {path} HTTP/1.1\r\nHost: {self.host_header}\r\nUser-Agent: {USER_AGENT}\r\n"
+                   f"Accept: text/html,*/*;q=0.8\r\nAccept-Encoding: {ACCEPT_ENCODING}\r\n\r\n")
+        start = time.perf_counter()
+        self.writer.write(request.encode('utf-8'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        ttfb = time.perf_counter() - start
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self.read_chunked()
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        elif status in (204, 304):
+            body = b''
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return Response(status, headers, body, ttfb, time.perf_counter() - start)
+
+    async def read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Crawler:
+    """
+    Breadth-first crawl of one origin with `concurrency` keep-alive connections.
+
+    Starts from `/` (plus the URLs listed in /sitemap.xml, so pages nothing
+    links to are still fetched and show up as orphans). For every HTML page
+    on_html(url, record, html) is called once and returns the hrefs to follow;
+    it runs on a separate thread, so parsing does not hold up the responses
+    still being read (and inflate their measured latency).
+    Redirects are recorded, not followed transparently: their Location is
+    queued like any other link. Nothing outside the origin is requested.
+
+    results: URL path -> {'status', 'ttfb', 'latency', 'bytes', 'headers', 'depth', 'error'}
+    """
+
+    def __init__(self, origin, concurrency=16, max_pages=MAX_PAGES):
+        parts = urlsplit(origin)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.concurrency = concurrency
+        self.max_pages = max_pages
+        self.results = {}
+        self.elapsed = 0.0
+
+    def same_origin(self, url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}" == self.origin
+
+    def target_path(self, page_url, href):
+        """Link on page_url -> URL path on this origin (query kept), or None for other origins"""
+        url = urljoin(page_url, href).split('#')[0]
+        if not self.same_origin(url):
+            return None
+        parts = urlsplit(url)
+        return (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+
+    def resolve(self, page_url, href):
+        """
+        Link -> (exists, clean target path) from the crawl results, following
+        recorded redirects. Links the crawl did not reach are assumed to exist.
+        """
+        path = self.target_path(page_url, href)
+        if path is None:
+            return False, None
+        for _ in range(MAX_REDIRECTS + 1):
+            record = self.results.get(path)
+            if record is None:
+                return True, clean_url_path(path.split('?')[0])
+            location = record['headers'].get('location')
+            if 300 <= record['status'] < 400 and location:
+                next_path = self.target_path(self.origin + path, location)
+                if next_path is None:
+                    return True, None # Redirect off-site (go/ links): fine, but no internal target
+                path = next_path
+                continue
+            return 200 <= record['status'] < 400, clean_url_path(path.split('?')[0])
+        return False, None
+
+    def run(self, on_html):
+        start = time.perf_counter()
+        asyncio.run(self._crawl(on_html))
+        self.elapsed = time.perf_counter() - start
+        return self.results
+
+    async def _crawl(self, on_html):
+        queue = deque([('/', 0)])
+        seen = {'/'}
+        pending = asyncio.Event()
+        active = [0]
+
+        def enqueue(path, depth):
+            if path and path not in seen and len(seen) < self.max_pages:
+                seen.add(path)
+                queue.append((path, depth))
+                pending.set()
+
+        async def worker():
+            connection = Connection(self.origin)
+            try:
+                while True:
+                    if not queue:
+                        if not active[0]:
+                            pending.set() # Wake the other workers so they can finish too
+                            return
+                        pending.clear()
+                        await pending.wait()
+                        continue
+                    path, depth = queue.popleft()
+                    active[0] += 1
+                    try:
+                        for href in await self.fetch(connection, path, depth, on_html):
+                            enqueue(self.target_path(self.origin + path, href), depth + 1)
+                    finally:
+                        active[0] -= 1
+            finally:
+                connection.close()
+
+        # Sitemap URLs go after the start page, one level below it
+        connection = Connection(self.origin)
+        try:
+            sitemap = await asyncio.wait_for(connection.request('/sitemap.xml'), REQUEST_TIMEOUT)
+            if sitemap.status == 200:
+                for loc in sitemap_locations(sitemap.text()):
+                    enqueue(urlsplit(loc).path or '/', 1)
+        except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, zlib.error):
+            pass
+        finally:
+            connection.close()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as self.parser:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def fetch(self, connection, path, depth, on_html):
+        record = {'status': 0, 'ttfb': 0.0, 'latency': 0.0, 'bytes': 0, 'headers': {}, 'depth': depth, 'error': None}
+        self.results[path] = record
+        response = None
+        for attempt in range(2): # A reused keep-alive connection may have been closed by the server
+            try:
+                response = await asyncio.wait_for(connection.request(path), REQUEST_TIMEOUT)
+                break
+            except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                connection.close()
+                record['error'] = str(e) or e.__class__.__name__
+        if response is None:
+            return []
+        record.update(status=response.status, ttfb=response.ttfb, latency=response.elapsed,
+                      bytes=len(response.body), error=None,
+                      headers={name: response.headers[name] for name in RECORD_HEADERS if name in response.headers})
+
+        if 300 <= response.status < 400 and 'location' in response.headers:
+            return [response.headers['location']]
+        if response.status != 200 or 'text/html' not in response.headers.get('content-type', 'text/html'):
+            return []
+        try:
+            html = response.text()
+        except (zlib.error, OSError) as e:
+            record['error'] = f"decode failed: {e}"
+            return []
+        links = await asyncio.get_running_loop().run_in_executor(self.parser, on_html, self.origin + path, record, html)
+        return links or []
+
+
+def sitemap_locations(xml):
+    locations = []
+    for part in xml.split('<loc>')[1:]:
+        locations.append(part.split('</loc>', 1)[0].strip())
+    return locations
@@ -0,0 +1,126 @@
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+
+SEVERITY_TO_SARIF = {'error': 'error', 'warning': 'warning', 'info': 'note'}
+
+
+class FindingsWriter:
+    """
+    Append-only JSONL stream of audit findings.
+    Every record is flushed as soon as it is emitted, so an interrupted audit
+    still leaves a readable file behind and nothing is buffered in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'w', encoding='utf-8', buffering=1)
+
+    def emit(self, rule_id, severity, page, message, target=None, deduction=0):
+        record = {
+            'ts': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'rule_id': rule_id,
+            'severity': severity,
+            'page': page,
+            'target': target,
+            'message': message,
+            'deduction': deduction,
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+        return record
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_findings(path):
+    """Yield finding records one by one (tolerates a truncated last line)"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Partial write from an interrupted run
+                continue
+
+
+def summarize_findings(path):
+    """
+    Single streaming pass over the findings file.
+    Returns totals per rule, total deduction and per-page issue counts.
+    """
+    summary = {
+        'total': 0,
+        'deductions': 0,
+        'by_rule': defaultdict(int),
+        'deductions_by_rule': defaultdict(int),
+        'by_page': defaultdict(int),
+    }
+    for record in read_findings(path):
+        summary['total'] += 1
+        summary['deductions'] += record.get('deduction', 0)
+        summary['by_rule'][record['rule_id']] += 1
+        summary['deductions_by_rule'][record['rule_id']] += record.get('deduction', 0)
+        if record.get('page'):
+            summary['by_page'][record['page']] += 1
+    return summary
+
+
+def write_sarif(findings_path, sarif_path, rule_descriptions=None, base_url=None):
+    """
+    Convert the JSONL findings into a SARIF 2.1.0 log.
+    Results are written one at a time so the conversion never loads the full run.
+    """
+    rule_descriptions = rule_descriptions or {}
+    rule_ids = set(rule_descriptions)
+    for record in read_findings(findings_path):
+        rule_ids.add(record['rule_id'])
+
+    rules = [
+        {'id': rule_id, 'shortDescription': {'text': rule_descriptions.get(rule_id, rule_id)}}
+        for rule_id in sorted(rule_ids)
+    ]
+    header = {
+        '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+        'version': '2.1.0',
+    }
+    driver = {'name': 'SEOAuditBot', 'informationUri': base_url or '', 'rules': rules}
+
+    with open(sarif_path, 'w', encoding='utf-8') as f:
+        # Stream the document: header, then results, then the closing brackets
+        f.write(json.dumps(header, ensure_ascii=False)[:-1])
+        f.write(', "runs": [{"tool": {"driver": ')
+        f.write(json.dumps(driver, ensure_ascii=False))
+        f.write('}, "results": [')
+        first = True
+        for record in read_findings(findings_path):
+            result = {
+                'ruleId': record['rule_id'],
+                'level': SEVERITY_TO_SARIF.get(record['severity'], 'warning'),
+                'message': {'text': record['message']},
+            }
+            location = record.get('page') or record.get('target')
+            if location:
+                result['locations'] = [{'physicalLocation': {'artifactLocation': {'uri': location}}}]
+            if record.get('target'):
+                result['properties'] = {'target': record['target']}
+            if not first:
+                f.write(', ')
+            f.write(json.dumps(result, ensure_ascii=False))
+            first = False
+        f.write(']}]}\n')
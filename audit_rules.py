@@ -0,0 +1,370 @@
+import time
+import gzip
+from collections import defaultdict
+
+from page_types import template_of
+
+
+class PageModel:
+    """
+    Everything the page rules need, collected in one traversal of the parsed DOM.
+    Rules only read from this model, so adding a rule never adds another DOM pass.
+    """
+
+    def __init__(self, file_path, rel_path, clean_path):
+        self.file_path = file_path
+        self.rel_path = rel_path
+        self.clean_path = clean_path
+
+        self.title = None
+        self.meta_description = None
+        self.h1_count = 0
+        self.schema_count = 0
+        self.anchors = [] # [(href, rel)] in document order
+        self.links = [] # Resolved link dicts, filled in by the Auditor
+        self.images = [] # URL each <img> downloads (largest candidate of its first <picture> source)
+        self.page_type = template_of(rel_path)
+        # Page weight; image_bytes is filled in by the Auditor, which knows where the files are
+        self.metrics = {'html_bytes': 0, 'html_gzip_bytes': 0, 'dom_nodes': 0, 'dom_depth': 0,
+                        'jsonld_count': 0, 'jsonld_bytes': 0, 'blocking_scripts': 0, 'blocking_stylesheets': 0,
+                        'image_bytes': 0}
+
+    @classmethod
+    def from_soup(cls, soup, file_path, rel_path, clean_path, html=None):
+        model = cls(file_path, rel_path, clean_path)
+        metrics = model.metrics
+        seen_title = False
+        seen_description = False
+        if html is not None:
+            raw = html.encode('utf-8')
+            metrics['html_bytes'] = len(raw)
+            metrics['html_gzip_bytes'] = len(gzip.compress(raw, compresslevel=9, mtime=0)) # As optimize.py serves it
+
+        # Depth-first in document order, tracking depth and whether we are inside <head> / <noscript>
+        stack = [(tag, 1, False, False) for tag in reversed(soup.find_all(True, recursive=False))]
+        while stack:
+            tag, depth, in_head, in_noscript = stack.pop()
+            name = tag.name
+            metrics['dom_nodes'] += 1
+            metrics['dom_depth'] = max(metrics['dom_depth'], depth)
+            child_state = (in_head or name == 'head', in_noscript or name == 'noscript')
+            stack.extend((child, depth + 1) + child_state for child in reversed(tag.find_all(True, recursive=False)))
+
+            if name == 'a':
+                href = tag.get('href')
+                if href:
+                    model.anchors.append((href, tag.get('rel', [])))
+            elif name == 'h1':
+                model.h1_count += 1
+            elif name == 'meta':
+                if not seen_description and tag.get('name') == 'description':
+                    seen_description = True
+                    model.meta_description = tag.get('content')
+            elif name == 'title':
+                if not seen_title:
+                    seen_title = True
+                    if tag.string:
+                        model.title = tag.string.strip()
+            elif name == 'script':
+                if tag.get('type') == 'application/ld+json':
+                    model.schema_count += 1
+                    metrics['jsonld_count'] += 1
+                    metrics['jsonld_bytes'] += len((tag.string or '').encode('utf-8'))
+                elif (in_head and tag.get('src') and tag.get('type') in (None, 'text/javascript', 'application/javascript')
+                      and not tag.has_attr('async') and not tag.has_attr('defer')):
+                    metrics['blocking_scripts'] += 1
+            elif name == 'link':
+                if (in_head and not in_noscript and 'stylesheet' in tag.get('rel', [])
+                        and tag.get('media', 'all') in ('all', 'screen') and not tag.has_attr('disabled')):
+                    metrics['blocking_stylesheets'] += 1
+            elif name == 'img':
+                src = tag.get('src')
+                picture = tag.parent if tag.parent is not None and tag.parent.name == 'picture' else None
+                source = picture.find('source', srcset=True) if picture else None
+                if source:
+                    src = largest_candidate(source['srcset']) or src
+                elif tag.get('srcset'):
+                    src = largest_candidate(tag['srcset']) or src
+                if src:
+                    model.images.append(src)
+
+        return model
+
+
+def largest_candidate(srcset):
+    """'a.avif 480w, b.avif 1200w' -> 'b.avif' (the candidate a wide screen downloads)"""
+    best, best_width = None, -1
+    for candidate in srcset.split(','):
+        parts = candidate.split()
+        if not parts:
+            continue
+        width = parts[1] if len(parts) > 1 else '1x'
+        try:
+            value = float(width[:-1])
+        except ValueError:
+            value = 0
+        if value > best_width:
+            best, best_width = parts[0], value
+    return best
+
+
+class Rule:
+    """
+    Base class for audit checks.
+
+    Page rules implement check_page(model, auditor); site rules implement
+    check_site(auditor) and run once after every page has been audited.
+    Both yield (message, page, target) tuples.
+    """
+    rule_id = None
+    label = None
+    severity = 'warning'
+    weight = 0 # Score deduction per finding
+    scope = 'page'
+    echo = True # Print findings to the console as they are found
+    exclude = [] # rel_path substrings this rule skips
+
+    def __init__(self, **options):
+        self.enabled = True
+        self.configure(options)
+
+    def configure(self, options):
+        for key, value in options.items():
+            if key == 'enabled':
+                self.enabled = bool(value)
+            elif hasattr(self, key):
+                setattr(self, key, value)
+
+    def is_excluded(self, rel_path):
+        return any(pattern in rel_path for pattern in self.exclude)
+
+    def check_page(self, model, auditor):
+        return []
+
+    def check_site(self, auditor):
+        return []
+
+
+class ShortMetaDescriptionRule(Rule):
+    rule_id = 'short_meta_desc'
+    label = 'Short Meta Description'
+    weight = 2
+    min_length = 100
+
+    def check_page(self, model, auditor):
+        if model.meta_description:
+            desc_len = len(model.meta_description.strip())
+            if desc_len < self.min_length:
+                yield f"Meta description too short ({desc_len} chars): {model.rel_path}", model.clean_path, None
+
+
+class H1CountRule(Rule):
+    rule_id = 'missing_h1'
+    label = 'Missing H1'
+    severity = 'error'
+    weight = 5
+    expected = 1
+    exclude = ['section.html', 'go/']
+
+    def check_page(self, model, auditor):
+        if model.h1_count != self.expected:
+            yield f"H1 count is {model.h1_count} (expected {self.expected}): {model.rel_path}", model.clean_path, None
+
+
+class SchemaRule(Rule):
+    rule_id = 'missing_schema'
+    label = 'Missing Schema'
+    weight = 2
+    exclude = ['sitemap.html', 'section.html', 'go/']
+
+    def check_page(self, model, auditor):
+        if not model.schema_count:
+            yield f"Missing JSON-LD Schema: {model.rel_path}", model.clean_path, None
+
+
+class UrlFormatRule(Rule):
+    rule_id = 'bad_url_format'
+    label = 'Bad URL Format'
+    weight = 2
+
+    def check_page(self, model, auditor):
+        for link in model.links:
+            href = link['href']
+            if link['kind'] == 'absolute_internal':
+                yield f"Absolute Internal URL: {href} in {model.rel_path}", model.clean_path, href
+            elif link['kind'] == 'internal':
+                if not href.startswith('/'):
+                    yield f"Relative path used: {href} in {model.rel_path}", model.clean_path, href
+                if href.endswith('.html'):
+                    yield f"Link ends with .html: {href} in {model.rel_path}", model.clean_path, href
+
+
+class DeadLinkRule(Rule):
+    rule_id = 'local_dead_links'
+    label = 'Local Dead Links'
+    severity = 'error'
+    weight = 10
+
+    def check_page(self, model, auditor):
+        for link in model.links:
+            if link['kind'] == 'absolute_internal' and not link['exists']:
+                yield f"Dead Link (Internal Absolute): {link['href']} in {model.rel_path}", model.clean_path, link['href']
+            elif link['kind'] == 'internal' and not link['exists']:
+                yield f"Dead Link (Local): {link['href']} in {model.rel_path}", model.clean_path, link['href']
+
+
+class PageBudgetRule(Rule):
+    """
+    Page weight against per-page-type budgets (home, blog-index, post, page;
+    '*' applies to every type). One finding per metric over budget.
+    audit_config.json overrides single values:
+        {"rules": {"page_budget": {"budgets": {"post": {"dom_nodes": 2000}}}}}
+    """
+    rule_id = 'page_budget'
+    label = 'Over Page Budget'
+    weight = 2
+    budgets = {
+        '*': {'html_gzip_bytes': 30_000, 'dom_nodes': 1500, 'dom_depth': 32, 'jsonld_bytes': 8_000,
+              'blocking_scripts': 0, 'blocking_stylesheets': 1, 'image_bytes': 500_000},
+        'home': {'html_gzip_bytes': 40_000, 'dom_nodes': 2000},
+        'blog-index': {'html_gzip_bytes': 40_000, 'dom_nodes': 2000, 'jsonld_bytes': 32_000}, # ItemList of every post
+        'post': {'image_bytes': 1_000_000},
+    }
+
+    def configure(self, options):
+        options = dict(options)
+        overrides = options.pop('budgets', {})
+        super().configure(options)
+        self.budgets = {page_type: dict(limits) for page_type, limits in self.budgets.items()}
+        for page_type, limits in overrides.items():
+            self.budgets.setdefault(page_type, {}).update(limits)
+
+    def budget_for(self, page_type):
+        return dict(self.budgets.get('*', {}), **self.budgets.get(page_type, {}))
+
+    def check_page(self, model, auditor):
+        for metric, limit in self.budget_for(model.page_type).items():
+            value = model.metrics.get(metric, 0)
+            if value > limit:
+                yield (f"{metric} is {value:,} (budget {limit:,} for {model.page_type}): {model.rel_path}",
+                       model.clean_path, metric)
+
+
+class ExternalDeadLinkRule(Rule):
+    rule_id = 'external_dead_links'
+    label = 'External Dead Links'
+    severity = 'error'
+    weight = 5
+    scope = 'site'
+
+    def check_site(self, auditor):
+        for url, status in auditor.checked_external_urls.items():
+            if status >= 400 or status == 0:
+                yield f"Dead External Link: {url} (Status: {status})", None, url
+
+
+class OrphanRule(Rule):
+    rule_id = 'orphans'
+    label = 'Orphans'
+    weight = 5
+    scope = 'site'
+    echo = False # generate_report prints its own orphan listing
+    ignored = ['/404', '/google', '/layout_template', '/section', '/sitemap']
+
+    def check_site(self, auditor):
+        for page, count in auditor.inbound_links.items():
+            if count != 0:
+                continue
+            if page == '/' or page == '':
+                continue
+            if any(ig in page for ig in self.ignored):
+                continue
+            yield f"Orphan page (no inbound links): {page}", page, None
+
+
+DEFAULT_RULES = [
+    ShortMetaDescriptionRule,
+    H1CountRule,
+    SchemaRule,
+    UrlFormatRule,
+    DeadLinkRule,
+    PageBudgetRule,
+    ExternalDeadLinkRule,
+    OrphanRule,
+]
+
+
+class RuleRegistry:
+    """Holds the rule objects, applies config overrides and records per-rule timing"""
+
+    def __init__(self, rules=None, settings=None):
+        self.rules = {}
+        for rule_cls in (rules if rules is not None else DEFAULT_RULES):
+            self.register(rule_cls())
+        self.timings = defaultdict(float) # rule_id -> cumulative seconds
+        self.calls = defaultdict(int)
+        if settings:
+            self.configure(settings)
+
+    def register(self, rule):
+        self.rules[rule.rule_id] = rule
+        return rule
+
+    def configure(self, settings):
+        """settings: {rule_id: {'enabled': bool, 'weight': int, ...}}"""
+        for rule_id, options in settings.items():
+            if rule_id in self.rules:
+                self.rules[rule_id].configure(options)
+
+    def get(self, rule_id):
+        return self.rules.get(rule_id)
+
+    def is_enabled(self, rule_id):
+        rule = self.rules.get(rule_id)
+        return bool(rule and rule.enabled)
+
+    def weight(self, rule_id):
+        rule = self.rules.get(rule_id)
+        return rule.weight if rule else 0
+
+    def labels(self):
+        return {rule_id: rule.label or rule_id for rule_id, rule in self.rules.items()}
+
+    def page_rules(self):
+        return [r for r in self.rules.values() if r.enabled and r.scope == 'page']
+
+    def site_rules(self):
+        return [r for r in self.rules.values() if r.enabled and r.scope == 'site']
+
+    def record(self, name, seconds):
+        self.timings[name] += seconds
+        self.calls[name] += 1
+
+    def _run(self, rule, results):
+        start = time.perf_counter()
+        findings = list(results)
+        self.record(rule.rule_id, time.perf_counter() - start)
+        return findings
+
+    def run_page(self, model, auditor):
+        """Run every enabled page rule against one PageModel, reporting through the auditor"""
+        for rule in self.page_rules():
+            if rule.is_excluded(model.rel_path):
+                continue
+            for message, page, target in self._run(rule, rule.check_page(model, auditor)):
+                auditor.report_finding(rule.rule_id, rule.severity, message, page=page, target=target, echo=rule.echo)
+
+    def run_site(self, auditor, rule_id):
+        """Run one site-level rule. Returns its findings (empty if disabled)."""
+        rule = self.rules.get(rule_id)
+        if not rule or not rule.enabled:
+            return []
+        findings = self._run(rule, rule.check_site(auditor))
+        for message, page, target in findings:
+            auditor.report_finding(rule.rule_id, rule.severity, message, page=page, target=target, echo=rule.echo)
+        return findings
+
+    def timing_report(self):
+        """[(name, seconds, calls)] sorted by cumulative time, slowest first"""
+        return sorted(((name, secs, self.calls[name]) for name, secs in self.timings.items()),
+                      key=lambda x: x[1], reverse=True)
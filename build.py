@@ -5,6 +5,14 @@ import json
 import random
 from datetime import datetime
 from bs4 import BeautifulSoup, Comment
+from search_index import SearchIndexBuilder
+from tailwind_css import build_stylesheet, link_stylesheet
+from icon_sprite import build_sprite, ICON_CSS
+from image_pipeline import ImagePipeline
+from asset_manifest import fingerprint_assets, asset_url, logical_url, rewrite_asset_refs
+from critical_css import inline_critical_css, CRITICAL_BUDGET
+from cache_headers import write_headers
+from optimize import EXCLUDE_FILES
 
 # ================= Configuration =================
 DOMAIN = "https://tgmai.top"
@@ -12,6 +20,7 @@ BLOG_DIR = "blog"
 INDEX_FILE = "index.html"
 BLOG_INDEX_FILE = os.path.join(BLOG_DIR, "index.html")
 TEMPLATE_FILE = "layout_template.html"
+SEARCH_SCRIPT = "/assets/search.js"
 
 # Colors and Categories Configuration
 CATEGORY_CONFIG = {
@@ -118,7 +127,15 @@ def clean_url(url):
         # If we are in /blog/, ../index.html means /index.html -> /
         url = url.replace('../', '/') 
     
-    return url
+    # Static assets -> content-hashed copy (asset-manifest.json)
+    return asset_url(url)
+
+def page_url(path):
+    """Served URL of a built HTML file: blog/foo.html -> /blog/foo, blog/index.html -> /blog/"""
+    url = '/' + path.replace(os.sep, '/')
+    if url.endswith('/index.html'):
+        return url[:-len('index.html')]
+    return clean_url(url)
 
 def resolve_anchor_to_root(url):
     """
@@ -137,7 +154,7 @@ def resolve_anchor_to_root(url):
         
     # If it's a relative path (not starting with /), prepend /
     if not url.startswith('/'):
-        return '/' + url
+        return asset_url('/' + url)
         
     return url
 
@@ -171,6 +188,8 @@ def get_layout_components():
     
     nav = soup.find('nav')
     footer = soup.find('footer')
+    if nav:
+        add_search_button(nav)
     
     # Extract Brand Assets (Favicons)
     favicons = []
@@ -192,11 +211,46 @@ def get_layout_components():
                     tag['href'] = '/' + href
                 elif href.startswith('http') and DOMAIN in href:
                     tag['href'] = href.replace(DOMAIN, '')
+                tag['href'] = asset_url(tag['href'])
                 
                 favicons.append(tag)
     
     return nav, footer, favicons
 
+def add_search_button(nav):
+    """Add the search toggle (handled by /assets/search.js) to the desktop and mobile nav bars"""
+    if nav.find(attrs={'data-search-toggle': True}):
+        return
+    desktop = nav.find('div', class_="hidden md:flex items-center gap-4")
+    if desktop:
+        button = BeautifulSoup(
+            '<button type="button" data-search-toggle="" aria-label="搜索文章" title="搜索文章 (/)" '
+            'class="text-slate-300 hover:text-white transition"><i class="fa-solid fa-magnifying-glass"></i></button>',
+            'html.parser')
+        desktop.insert(0, button)
+    mobile = nav.find('div', class_="-mr-2 flex md:hidden")
+    if mobile:
+        button = BeautifulSoup(
+            '<button type="button" data-search-toggle="" aria-label="搜索文章" '
+            'class="mr-2 inline-flex items-center justify-center rounded-md bg-slate-800 p-2 text-slate-400 hover:bg-slate-700 hover:text-white">'
+            '<i class="fa-solid fa-magnifying-glass text-xl"></i></button>',
+            'html.parser')
+        mobile.insert(0, button)
+
+def ensure_search_script(soup):
+    """Load the search UI script (deferred) once per page"""
+    head = soup.head
+    if head and not head.find('script', src=lambda src: src and logical_url(src) == SEARCH_SCRIPT):
+        head.append(soup.new_tag('script', src=asset_url(SEARCH_SCRIPT), defer=''))
+        head.append('\n')
+
+def clean_meta_images(soup):
+    """og:image / twitter:image get the same clean_url() treatment as href/src (absolute URLs stay absolute)"""
+    for tag in soup.find_all('meta', content=True):
+        if tag.get('property') in ('og:image', 'og:image:url') or tag.get('name') == 'twitter:image':
+            url = tag['content']
+            tag['content'] = DOMAIN + clean_url(url) if url.startswith(DOMAIN + '/') else clean_url(url)
+
 def generate_recommendations(posts, current_filename):
     """Generate HTML for recommended reading (random 2 posts excluding current)"""
     others = [p for p in posts if p['filename'] != current_filename]
@@ -333,12 +387,12 @@ def reconstruct_head(soup, metadata, favicons):
         "publisher": {
             "@type": "Organization", 
             "name": "TGMai.top", 
-            "logo": {"@type": "ImageObject", "url": "/assets/logo.svg"}
+            "logo": {"@type": "ImageObject", "url": asset_url("/assets/logo.svg")}
         },
         "mainEntityOfPage": {"@type": "WebPage", "@id": metadata['canonical_url']}
     }
     if metadata.get('image'):
-        schema_blog['image'] = metadata['image']
+        schema_blog['image'] = asset_url(metadata['image'])
         
     script_blog = soup.new_tag('script', type="application/ld+json")
     script_blog.string = json.dumps(schema_blog, ensure_ascii=False, indent=2)
@@ -423,6 +477,21 @@ def generate_toc(main_tag):
 def process_posts():
     print("Starting Build Process...")
     
+    # 0. Images: recompress PNGs, AVIF/WebP variants, favicon (cached by content hash)
+    images = ImagePipeline.load()
+    image_stats = images.process()
+    if image_stats is None:
+        print("Images: skipped (pip install pillow), post images keep a plain <img>")
+    else:
+        print(f"Images: {image_stats['processed']} processed, {image_stats['cached']} cached, "
+              f"{image_stats['variants']} variants written, {image_stats['saved_bytes'] / 1024:.1f} KB saved by PNG recompression"
+              + (", favicon.ico regenerated" if image_stats['favicon'] else ""))
+
+    # 0.1 Fingerprint assets/ (after the image stage, which may rewrite favicon.ico / logo.png);
+    # from here on clean_url() maps /assets/<file> to its content-hashed copy
+    manifest, copied = fingerprint_assets()
+    print(f"Assets: {len(manifest)} fingerprinted ({copied} new copies), manifest written")
+
     # 1. Get Layout & Favicons from Index
     nav_component, footer_component, favicons = get_layout_components()
     if not nav_component or not footer_component:
@@ -536,6 +605,7 @@ def process_posts():
     posts.sort(key=lambda x: (x['date'], x['filename']), reverse=True)
     
     # 3. Process each post (Write phase)
+    search_builder = SearchIndexBuilder()
     for post in posts:
         print(f"Processing {post['filename']}...")
         with open(post['filepath'], 'r', encoding='utf-8') as f:
@@ -578,11 +648,17 @@ def process_posts():
         # Clean links in Main
         fix_relative_links_in_post(main_tag)
         generate_toc(main_tag)
+
+        # Search index: headings are collected before recommendations are appended
+        headings_root = main_tag.find('article') or main_tag
+        headings = [h.get_text(" ", strip=True) for h in headings_root.find_all(['h2', 'h3'])]
+        search_builder.add(post['url'], post['title'], post['description'], headings)
         for a in main_tag.find_all('a', href=True):
             a['href'] = clean_url(a['href'])
         for img in main_tag.find_all('img', src=True):
             # Images in posts should also be absolute
             img['src'] = resolve_anchor_to_root(img['src'])
+            images.apply_picture(soup, img)
             
         # Inject/Update Visual Breadcrumb
         # Find existing breadcrumb to remove/update or prepend
@@ -647,6 +723,7 @@ def process_posts():
             
         # --- Phase 2: Head Reconstruction ---
         reconstruct_head(soup, post, favicons)
+        ensure_search_script(soup)
         
         # --- Phase 1: Clean URL (Global) ---
         # We already cleaned specific parts, but let's do a final pass on all tags just in case
@@ -663,6 +740,7 @@ def process_posts():
             tag['href'] = clean_url(tag['href'])
         for tag in soup.find_all(['script', 'img'], src=True):
             tag['src'] = clean_url(tag['src'])
+        clean_meta_images(soup)
             
         # SEO Link Processing
         process_seo_links(soup, is_index=False)
@@ -671,6 +749,14 @@ def process_posts():
         with open(post['filepath'], 'w', encoding='utf-8') as f:
             f.write(str(soup.prettify())) # Prettify handles indentation
             
+    if image_stats is not None:
+        images.save()
+
+    # 3.1 Write the client-side search index
+    written, total_bytes, largest = search_builder.write()
+    print(f"Search index: {len(search_builder.docs)} docs, {len(search_builder.postings)} terms, "
+          f"{total_bytes / 1024:.1f} KB total, largest shard {largest / 1024:.1f} KB ({written} files updated)")
+
     # 4. Update Index HTML
     update_index_html(posts)
     
@@ -687,6 +773,45 @@ def process_posts():
     
     # 6. Generate Sitemap
     generate_sitemap(posts)
+
+    pages = (glob.glob("*.html") + glob.glob(os.path.join(BLOG_DIR, "*.html"))
+             + glob.glob(os.path.join("go", "**", "*.html"), recursive=True))
+
+    # 7. Font Awesome icons -> subset SVG sprite (replaces the cdnjs stylesheet and webfonts)
+    sprite = build_sprite(pages)
+    if sprite is None:
+        print("Icon sprite: skipped (pip install fontawesomefree), pages keep the Font Awesome CDN stylesheet")
+    else:
+        print(f"Icon sprite: {sprite['href']} ({sprite['icons']} icons, {sprite['bytes'] / 1024:.1f} KB, "
+              f"{sprite['pages']} pages rewritten)")
+        if sprite['missing']:
+            print(f"Warning: unknown icons left as Font Awesome markup: {', '.join(sprite['missing'])}")
+
+    # 8. Compile the Tailwind classes in use to a static stylesheet (replaces the cdn.tailwindcss.com runtime)
+    stylesheet, css_stats = build_stylesheet(pages + [os.path.basename(__file__)], extra_css=ICON_CSS)
+    linked = link_stylesheet(pages, stylesheet)
+    print(f"Tailwind CSS: {stylesheet} ({css_stats['classes']} classes, {css_stats['bytes'] / 1024:.1f} KB, "
+          f"{css_stats['scanned']} files rescanned, {linked} pages relinked)")
+
+    # 8.1 Inline above-the-fold CSS per template, load the full stylesheet async, defer safe scripts
+    critical = inline_critical_css(pages, stylesheet, extra_css=ICON_CSS)
+    print(f"Critical CSS: {', '.join(f'{t} {b / 1024:.1f} KB' for t, b in critical['templates'].items())} "
+          f"({critical['analysed']} pages analysed, {critical['pages']} updated, {critical['deferred']} scripts deferred, "
+          f"{critical['preloads']} hero preloads)")
+    if critical['over_budget']:
+        print(f"Warning: critical CSS over the {CRITICAL_BUDGET / 1024:.0f} KB budget for: {', '.join(critical['over_budget'])}")
+
+    # 9. Asset references in pages the build does not parse (go/, templates) -> fingerprinted copies
+    rewritten = rewrite_asset_refs(pages, origin=DOMAIN)
+    print(f"Asset references: {rewritten} pages updated")
+
+    # 10. _headers: cache policy per built file, preload hints of each page as Link / Early Hints
+    served = [p for p in pages if os.path.basename(p) not in EXCLUDE_FILES]
+    header_stats = write_headers(served, manifest, page_url)
+    print(f"_headers: {header_stats['rules']} rules, {header_stats['hints']}/{header_stats['pages']} pages with early hints"
+          + ("" if header_stats['changed'] else " (unchanged)"))
+    if header_stats['over_limit']:
+        print("Warning: _headers exceeds the Cloudflare Pages limit of 100 rules, later rules are ignored")
     
     print("Build Complete.")
 
@@ -783,6 +908,12 @@ def update_index_html(posts):
             </a>"""
             grid_div.append(BeautifulSoup(card_html, 'html.parser'))
             
+    # Search UI
+    nav = soup.find('nav')
+    if nav:
+        add_search_button(nav)
+    ensure_search_script(soup)
+
     # Clean URLs in Index
     for tag in soup.find_all(['a', 'link'], href=True):
         # Skip SEO tags (canonical, alternate/hreflang)
@@ -791,6 +922,9 @@ def update_index_html(posts):
         if set(rel) & {'canonical', 'alternate'}:
             continue
         tag['href'] = clean_url(tag['href'])
+    for tag in soup.find_all(['script', 'img'], src=True):
+        tag['src'] = clean_url(tag['src'])
+    clean_meta_images(soup)
     
     # Fix SEO tags explicitly
     fix_seo_tags(soup, f"{DOMAIN}/")
@@ -899,6 +1033,9 @@ def update_static_page(filename, title=None, breadcrumb_name=None):
         
     for tag in soup.find_all(['script', 'img'], src=True):
         tag['src'] = clean_url(tag['src'])
+    clean_meta_images(soup)
+
+    ensure_search_script(soup)
 
     # SEO Link Processing
     process_seo_links(soup, is_index=False)
@@ -982,6 +1119,9 @@ def update_blog_index_html(posts):
         if set(rel) & {'canonical', 'alternate'}:
             continue
         tag['href'] = clean_url(tag['href'])
+    for tag in soup.find_all(['script', 'img'], src=True):
+        tag['src'] = clean_url(tag['src'])
+    clean_meta_images(soup)
         
     # Fix SEO tags explicitly
     fix_seo_tags(soup, f"{DOMAIN}/blog/")
@@ -1024,7 +1164,7 @@ def update_blog_index_html(posts):
                         "name": "TGMai",
                         "logo": {
                             "@type": "ImageObject",
-                            "url": f"{DOMAIN}/assets/logo.png"
+                            "url": f"{DOMAIN}{asset_url('/assets/logo.png')}"
                         }
                     },
                     "mainEntity": {
@@ -1047,7 +1187,7 @@ def update_blog_index_html(posts):
                     "datePublished": post['date'],
                     "dateModified": post.get('date_modified', post['date']),
                     "url": post['canonical_url'],
-                    "image": f"{DOMAIN}/assets/logo.png",
+                    "image": f"{DOMAIN}{asset_url('/assets/logo.png')}",
                     "author": {
                         "@type": "Organization",
                         "name": "TGMai"
@@ -1064,6 +1204,8 @@ def update_blog_index_html(posts):
         head.append(script_tag)
         head.append('\n')
 
+    ensure_search_script(soup)
+
     # SEO Link Processing
     process_seo_links(soup, is_index=False)
             
@@ -1097,8 +1239,8 @@ def update_sitemap_html_content(posts):
         
         # Add "All Posts" link first
         li_all = soup.new_tag('li')
-        a_all = soup.new_tag('a', href="/blog/", class_="sitemap-link font-semibold text-white")
-        icon_all = soup.new_tag('i', class_="fa-solid fa-list")
+        a_all = soup.new_tag('a', href="/blog/", attrs={'class': "sitemap-link font-semibold text-white"})
+        icon_all = soup.new_tag('i', attrs={'class': "fa-solid fa-list"})
         a_all.append(icon_all)
         a_all.append(" 博客首页 (全部文章)")
         li_all.append(a_all)
@@ -1108,8 +1250,8 @@ def update_sitemap_html_content(posts):
         # Add each post
         for post in posts:
             li = soup.new_tag('li')
-            a = soup.new_tag('a', href=post['url'], class_="sitemap-link")
-            icon = soup.new_tag('i', class_="fa-regular fa-file-lines")
+            a = soup.new_tag('a', href=post['url'], attrs={'class': "sitemap-link"})
+            icon = soup.new_tag('i', attrs={'class': "fa-regular fa-file-lines"})
             a.append(icon)
             # Use title from post
             a.append(f" {post['title']}")
@@ -0,0 +1,105 @@
+"""
+_headers generation (Cloudflare Pages format).
+
+build.py calls write_headers() last, with what the build actually produced:
+
+- every page gets the HTML policy (short max-age + stale-while-revalidate)
+  and a `Link` header made from the preload hints in its <head> (compiled
+  stylesheet, hero image, fonts), which Cloudflare also sends as 103 Early Hints;
+- /assets/* is immutable (everything pages reference there is content-hashed);
+- files under /assets/ that keep a fixed name (the fingerprinting sources and
+  the search index entry point) detach that policy and get a moderate TTL;
+- sitemaps, robots.txt and the original images get moderate TTLs.
+
+Cloudflare merges the headers of every rule that matches a path, so a more
+specific rule removes the inherited Cache-Control with `! Cache-Control`.
+"""
+import os
+import re
+
+# ================= Configuration =================
+HEADERS_FILE = "_headers"
+MAX_RULES = 100 # Cloudflare Pages limit for _headers
+
+CACHE_POLICIES = {
+    'html': "public, max-age=300, stale-while-revalidate=86400",
+    'immutable': "public, max-age=31536000, immutable",
+    'asset': "public, max-age=86400, stale-while-revalidate=604800", # Fixed-name files under /assets/, /images/
+    'feed': "public, max-age=3600, stale-while-revalidate=86400",    # Sitemaps, robots.txt
+    'index': "public, max-age=300, stale-while-revalidate=86400",    # Search index entry point (docs.json, unversioned URL)
+}
+FEED_FILES = ['sitemap.xml', 'robots.txt']
+FIXED_NAME_ASSETS = ['/assets/search/docs.json']
+IMAGE_DIRS = ['images']
+
+PRELOAD_TAG_RE = re.compile(r'<link\b(?=[^>]*\brel="(?:preload|modulepreload|preconnect)")[^>]*>')
+ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+HEAD_RE = re.compile(r'<head\b.*?</head>', re.S)
+LINK_PARAMS = ['rel', 'as', 'type', 'crossorigin', 'imagesrcset', 'imagesizes', 'fetchpriority']
+
+
+def preload_links(html):
+    """<link rel="preload" ...> tags of the page's <head> as `Link` header values"""
+    head = HEAD_RE.search(html)
+    links = []
+    for tag in PRELOAD_TAG_RE.findall(head.group(0) if head else ''):
+        attrs = dict(ATTR_RE.findall(tag))
+        target = attrs.get('href', '')
+        if not target and attrs.get('imagesrcset'):
+            target = attrs['imagesrcset'].split(',')[0].split()[0]
+        if not target:
+            continue
+        params = ''.join(f'; {name}="{attrs[name]}"' if name in ('imagesrcset', 'imagesizes') else f'; {name}={attrs[name]}'
+                         for name in LINK_PARAMS if name in attrs)
+        link = f"<{target}>{params}"
+        if link not in links:
+            links.append(link)
+    return links
+
+
+def rule(path, headers, detach=False):
+    lines = [path]
+    if detach:
+        lines.append("  ! Cache-Control")
+    lines += [f"  {name}: {value}" for name, value in headers]
+    return '\n'.join(lines)
+
+
+def write_headers(pages, fixed_assets, url_of, path=HEADERS_FILE):
+    """
+    pages: built HTML files; url_of: file -> served URL; fixed_assets: URLs
+    under /assets/ that are not fingerprinted. Returns stats.
+    """
+    rules = [rule('/assets/*', [('Cache-Control', CACHE_POLICIES['immutable'])])]
+    for url in sorted(set(fixed_assets)):
+        rules.append(rule(url, [('Cache-Control', CACHE_POLICIES['asset'])], detach=True))
+    for url in FIXED_NAME_ASSETS:
+        rules.append(rule(url, [('Cache-Control', CACHE_POLICIES['index'])], detach=True))
+    for directory in IMAGE_DIRS:
+        if os.path.isdir(directory):
+            rules.append(rule(f'/{directory}/*', [('Cache-Control', CACHE_POLICIES['asset'])]))
+    for name in FEED_FILES:
+        if os.path.exists(name):
+            rules.append(rule(f'/{name}', [('Cache-Control', CACHE_POLICIES['feed'])]))
+
+    hints = 0
+    for page in sorted(pages, key=url_of):
+        with open(page, 'r', encoding='utf-8') as f:
+            links = preload_links(f.read())
+        headers = [('Cache-Control', CACHE_POLICIES['html'])]
+        if links:
+            headers.append(('Link', ', '.join(links)))
+            hints += 1
+        rules.append(rule(url_of(page), headers))
+
+    content = ("# Generated by build.py (cache_headers.py) - do not edit, change CACHE_POLICIES instead\n\n"
+               + '\n\n'.join(rules) + '\n')
+    existing = None
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            existing = f.read()
+    if content != existing:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    return {'rules': len(rules), 'pages': len(pages), 'hints': hints,
+            'changed': content != existing, 'over_limit': len(rules) > MAX_RULES}
@@ -0,0 +1,277 @@
+"""
+Critical CSS and non-blocking resource loading.
+
+Runs after the stylesheet is compiled (tailwind_css.py). For every page
+template (home, blog index, post, other pages) the Tailwind classes used
+above the fold are collected from all pages of that template, compiled into
+one small stylesheet with the same compiler and inlined:
+
+    <link as="image" data-critical="" href="/images/hero.png" rel="preload"/>   (first fold image, if any)
+    <style data-critical="post">...above-the-fold utilities...</style>
+    <link as="style" data-critical="" href="/assets/tailwind.<hash>.css" onload="..." rel="preload"/>
+    <noscript><link data-critical="" href="/assets/tailwind.<hash>.css" rel="stylesheet"/></noscript>
+
+"Above the fold" is approximated from the markup: fixed/sticky elements
+(the nav, bottom bars) plus the first FOLD_ELEMENTS visible elements in
+document order. Hover/focus/active variants are left to the full stylesheet,
+only the preflight rules for elements found in the fold are inlined, and the
+--tw-* variable defaults are cut down to the ones the fold utilities read;
+templates over CRITICAL_BUDGET are reported by build.py. Same-origin <script src> tags that can safely run later
+(no inline script after them, no document.write) get `defer`.
+
+The per-page fold analysis is cached in .critical-css-cache.json by the hash
+of the page without its critical block, so pages build.py regenerates (and
+prettifies) unchanged are not parsed again; each template is compiled once.
+"""
+import os
+import re
+import json
+import hashlib
+
+from bs4 import BeautifulSoup, Tag
+
+from page_types import template_of
+from tailwind_css import compile_css, split_variants, PREFLIGHT, STYLESHEET_HREF_RE, HEAD_CLOSE_RE, COMPILER_VERSION
+
+# ================= Configuration =================
+CACHE_FILE = ".critical-css-cache.json"
+CACHE_VERSION = 2
+FOLD_ELEMENTS = 40 # Visible elements after the pinned ones that are assumed to be on the first screen
+CRITICAL_BUDGET = 14 * 1024 # Bytes of inlined CSS per template; every page of the template carries it
+SKIP_TAGS = {'script', 'style', 'template', 'noscript', 'head'}
+DISPLAY_UTILITIES = {'block', 'inline-block', 'inline', 'flex', 'inline-flex', 'grid', 'inline-grid',
+                     'table', 'contents', 'flow-root', 'list-item'}
+# States that cannot apply before the user interacts: their rules arrive with the full stylesheet
+INTERACTION_VARIANTS = {'hover', 'focus', 'focus-visible', 'focus-within', 'active', 'visited'}
+ASYNC_ONLOAD = "this.onload=null;this.rel='stylesheet'"
+
+CRITICAL_STYLE_RE = re.compile(r'[ \t]*<style[^>]*\bdata-critical\b[^>]*>.*?</style>\n?', re.S)
+CRITICAL_NOSCRIPT_RE = re.compile(r'[ \t]*<noscript>\s*<link[^>]*\bdata-critical\b[^>]*>\s*</noscript>\n?')
+CRITICAL_LINK_RE = re.compile(r'[ \t]*<link[^>]*\bdata-critical\b[^>]*>\n?')
+STYLESHEET_LINK_RE = re.compile(r'[ \t]*<link[^>]*href="' + STYLESHEET_HREF_RE.pattern + r'"[^>]*>\n?')
+SCRIPT_TAG_RE = re.compile(r'<script(?P<attrs>[^>]*)>(?P<body>.*?)</script>', re.S)
+SRC_ATTR_RE = re.compile(r'\ssrc="([^"]*)"')
+TYPE_ATTR_RE = re.compile(r'\stype="([^"]*)"')
+IMG_TAG_RE = r'<img\b[^>]*\ssrc="{src}"[^>]*>'
+ELEMENT_SELECTOR_RE = re.compile(r'\s*([a-z][a-z0-9]*)')
+
+
+def is_hidden(classes):
+    """
+    Not painted on first render: `hidden` without a responsive display utility
+    (hidden md:flex is visible on desktop), or `invisible` (hover dropdowns)
+    """
+    if 'invisible' in classes:
+        return True
+    return 'hidden' in classes and not any(':' in c and c.rsplit(':', 1)[1] in DISPLAY_UTILITIES for c in classes)
+
+
+def analyse_fold(html):
+    """Classes and elements used above the fold and the first fold image: {'classes', 'tags', 'hero'}"""
+    soup = BeautifulSoup(html, 'html.parser')
+    body = soup.body
+    if body is None:
+        return {'classes': [], 'tags': [], 'hero': None}
+    classes = set(body.get('class', []))
+    tags = {'html', 'body'}
+    if soup.html:
+        classes.update(soup.html.get('class', []))
+    budget = [FOLD_ELEMENTS]
+    hero = []
+
+    def visit(element, pinned):
+        for child in element.children:
+            if not isinstance(child, Tag) or child.name in SKIP_TAGS:
+                continue
+            cls = child.get('class', [])
+            if is_hidden(cls):
+                continue
+            child_pinned = pinned or 'fixed' in cls or 'sticky' in cls
+            in_fold = child_pinned
+            if not child_pinned and budget[0] > 0:
+                budget[0] -= 1
+                in_fold = True
+            if in_fold:
+                classes.update(cls)
+                tags.add(child.name)
+                if child.name == 'img' and child.get('src') and not hero:
+                    hero.append(child)
+            visit(child, child_pinned)
+
+    visit(body, False)
+    return {'classes': sorted(classes), 'tags': sorted(tags), 'hero': hero_hint(hero[0]) if hero else None}
+
+
+def critical_preflight(tags, css):
+    """
+    The preflight rules the fold needs: those matching an element in `tags` or
+    not tied to an element (*, ::before, [hidden]), with the --tw-* defaults
+    limited to the variables `css` (the fold utilities) reads
+    """
+    rules = []
+    for rule in PREFLIGHT.strip().split('\n'):
+        selectors, decls = rule[:-1].split('{', 1)
+        elements = [ELEMENT_SELECTOR_RE.match(selector) for selector in selectors.split(',')]
+        if all(elements) and not any(element.group(1) in tags for element in elements):
+            continue
+        decls = ';'.join(decl for decl in decls.split(';')
+                         if not decl.startswith('--tw-') or f"var({decl.split(':', 1)[0]}" in css)
+        if decls:
+            rules.append(f"{selectors}{{{decls}}}")
+    return '\n'.join(rules)
+
+
+def is_interaction(candidate):
+    return any(variant.replace('group-', '', 1) in INTERACTION_VARIANTS for variant in split_variants(candidate)[0])
+
+
+def strip_critical(html):
+    """The page without what inline_critical_css() adds (and the plain stylesheet link it replaces)"""
+    html = CRITICAL_STYLE_RE.sub('', html)
+    html = CRITICAL_NOSCRIPT_RE.sub('', html)
+    html = CRITICAL_LINK_RE.sub('', html)
+    return STYLESHEET_LINK_RE.sub('', html)
+
+
+def hero_hint(img):
+    """Preload attributes for the first fold image (the <picture> source the browser will pick first)"""
+    hint = {'src': img['src']}
+    picture = img.parent if img.parent and img.parent.name == 'picture' else None
+    source = picture.find('source', srcset=True) if picture else None
+    if source:
+        hint.update({'type': source.get('type', ''), 'srcset': source['srcset'], 'sizes': source.get('sizes', '')})
+    elif img.get('srcset'):
+        hint.update({'srcset': img['srcset'], 'sizes': img.get('sizes', '')})
+    return hint
+
+
+def preload_tag(hint):
+    attrs = 'as="image" data-critical=""'
+    if hint.get('srcset'):
+        attrs += f' imagesizes="{hint["sizes"]}" imagesrcset="{hint["srcset"]}"'
+        if hint.get('type'):
+            attrs += f' type="{hint["type"]}"'
+    else:
+        attrs += f' href="{hint["src"]}"'
+    return f'<link {attrs} fetchpriority="high" rel="preload"/>'
+
+
+def is_classic(attrs):
+    """Classic JavaScript (not a module, JSON-LD or template type)"""
+    script_type = TYPE_ATTR_RE.search(attrs)
+    return script_type is None or script_type.group(1) in ('text/javascript', 'application/javascript')
+
+
+def defer_scripts(html):
+    """Add defer to same-origin classic scripts that no later inline script could depend on"""
+    tags = list(SCRIPT_TAG_RE.finditer(html))
+    last_inline = max((m.start() for m in tags if is_classic(m.group('attrs')) and not SRC_ATTR_RE.search(m.group('attrs'))),
+                      default=-1)
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        attrs = match.group('attrs')
+        src = SRC_ATTR_RE.search(attrs)
+        if (not src or not is_classic(attrs) or match.start() < last_inline
+                or re.search(r'\s(defer|async)\b', attrs)):
+            return match.group(0)
+        url = src.group(1)
+        if not url.startswith('/') or url.startswith('//'):
+            return match.group(0)
+        local = url.split('?')[0].lstrip('/')
+        if not os.path.exists(local):
+            return match.group(0)
+        with open(local, 'r', encoding='utf-8', errors='ignore') as f:
+            if 'document.write' in f.read():
+                return match.group(0)
+        count += 1
+        return f'<script defer=""{attrs}>{match.group("body")}</script>'
+
+    return SCRIPT_TAG_RE.sub(replace, html), count
+
+
+def load_cache(path=CACHE_FILE):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == [CACHE_VERSION, COMPILER_VERSION, FOLD_ELEMENTS]:
+            return data.get('pages', {})
+    return {}
+
+
+def save_cache(pages, path=CACHE_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': [CACHE_VERSION, COMPILER_VERSION, FOLD_ELEMENTS], 'pages': pages}, f, ensure_ascii=False)
+
+
+def inline_critical_css(paths, href, extra_css='', cache_path=CACHE_FILE):
+    """
+    Inline per-template critical CSS, load `href` (the compiled stylesheet)
+    asynchronously, preload the hero image and defer safe scripts on every
+    page that links the stylesheet. Returns stats.
+    """
+    cache = load_cache(cache_path)
+    pages, contents = {}, {}
+    analysed = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        if not STYLESHEET_HREF_RE.search(html):
+            continue
+        key = path.replace(os.sep, '/')
+        stripped = strip_critical(html)
+        # Keyed on the page without the critical block: build.py prettifies it differently than it is
+        # written here, and a changed template stylesheet alone does not move the fold
+        digest = hashlib.sha1(stripped.encode('utf-8')).hexdigest()
+        entry = cache.get(key)
+        if not entry or entry['sha1'] != digest:
+            entry = dict(analyse_fold(html), sha1=digest)
+            analysed += 1
+        contents[key] = (html, stripped)
+        pages[key] = entry
+
+    # One critical stylesheet per template: the union of its pages' fold classes and elements
+    template_classes, template_tags = {}, {}
+    for key, entry in pages.items():
+        template_classes.setdefault(template_of(key), set()).update(entry['classes'])
+        template_tags.setdefault(template_of(key), set()).update(entry['tags'])
+    template_css = {}
+    for template, classes in template_classes.items():
+        classes = {candidate for candidate in classes if not is_interaction(candidate)}
+        css = compile_css(classes, extra_css, preflight='').split('\n', 1)[1] # Drop the banner comment
+        template_css[template] = critical_preflight(template_tags[template], css) + '\n' + css
+
+    changed = deferred = preloads = 0
+    for key, (html, updated) in contents.items():
+        entry = pages[key]
+        template = template_of(key)
+        block = []
+        if entry['hero']:
+            block.append(preload_tag(entry['hero']))
+            img_re = re.compile(IMG_TAG_RE.format(src=re.escape(entry['hero']['src'])))
+            updated = img_re.sub(lambda m: promote_image(m.group(0)), updated, count=1)
+            preloads += 1
+        block.append(f'<style data-critical="{template}">\n{template_css[template].strip()}\n</style>')
+        block.append(f'<link as="style" data-critical="" href="{href}" onload="{ASYNC_ONLOAD}" rel="preload"/>')
+        block.append(f'<noscript><link data-critical="" href="{href}" rel="stylesheet"/></noscript>')
+        updated = HEAD_CLOSE_RE.sub(lambda m: ''.join(f"\n  {tag}" for tag in block) + "\n </head>", updated, count=1)
+        updated, count = defer_scripts(updated)
+        deferred += count
+        if updated != html:
+            with open(key, 'w', encoding='utf-8') as f:
+                f.write(updated)
+            changed += 1
+
+    save_cache(pages, cache_path)
+    sizes = {t: len(css.encode('utf-8')) for t, css in sorted(template_css.items())}
+    return {'templates': sizes, 'over_budget': [t for t, size in sizes.items() if size > CRITICAL_BUDGET],
+            'pages': changed, 'analysed': analysed, 'deferred': deferred, 'preloads': preloads}
+
+
+def promote_image(tag):
+    """The hero image must not wait for lazy-loading"""
+    tag = re.sub(r'\sloading="lazy"', ' loading="eager"', tag)
+    if 'fetchpriority=' not in tag:
+        tag = tag.replace('<img', '<img fetchpriority="high"', 1)
+    return tag
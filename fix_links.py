@@ -0,0 +1,195 @@
+"""
+Link fixer: rewrites the hrefs of <a> tags in built pages with a set of
+declarative rules, in one tokenizer pass per file.
+
+Rules (applied in FIX_RULES order to every page link; external, mailto:,
+tel: etc. are never touched, query strings and fragments are kept):
+
+    cta_target        CTA buttons pointing at #products -> /go/buy
+    relative_to_root  '../about.html' on blog/x.html -> '/about.html'
+    collapse_index    '/index.html' -> '/', '/blog/index' -> '/blog/' (the URL serve.py / the host answers)
+    strip_html        '/about.html' -> '/about'
+
+Links on our own domain (https://tgmai.top/about.html) are cleaned the same
+way and stay absolute. <script>, <style>, <textarea> and comments are
+skipped; the rest of the file is written back byte-for-byte.
+
+Usage:
+    python fix_links.py                      # every page of the site
+    python fix_links.py index.html blog/     # only these files / directories
+    python fix_links.py --check --diff       # report what would change, exit 1 if anything would
+    python fix_links.py --rules strip_html,collapse_index
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import posixpath
+import concurrent.futures
+from collections import defaultdict
+
+from build import DOMAIN
+from optimize import EXCLUDE_DIRS
+
+# ================= Configuration =================
+FIX_RULES = ['cta_target', 'relative_to_root', 'collapse_index', 'strip_html']
+CTA_TARGETS = [
+    # (current href, button texts, new href)
+    ('#products', ['立即购买', '立即选号'], '/go/buy'),
+]
+SKIP_PREFIXES = ('javascript:', 'mailto:', 'tel:', 'tg:', 'data:', '//')
+PARALLEL_MIN_FILES = 200 # Below this, starting worker processes costs more than it saves
+
+TOKEN_RE = re.compile(r'<!--.*?-->'
+                      r'|<(?P<raw>script|style|textarea)\b[^>]*>.*?</(?P=raw)\s*>'
+                      r'|<a\b(?P<attrs>[^>]*)>(?P<text>.*?)</a\s*>', re.S | re.I)
+HREF_RE = re.compile(r'(\shref\s*=\s*)(["\'])(.*?)\2', re.S | re.I)
+TAG_RE = re.compile(r'<[^>]+>')
+SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+
+def fix_cta_target(path, link):
+    for href, texts, target in CTA_TARGETS:
+        if path == href and any(text in link['text'] for text in texts):
+            return target
+    return path
+
+
+def fix_relative_to_root(path, link):
+    if not path or path.startswith(('/', '#')):
+        return path
+    resolved = posixpath.normpath(posixpath.join(posixpath.dirname('/' + link['page']), path))
+    return resolved + '/' if path.endswith('/') and resolved != '/' else resolved
+
+
+def fix_collapse_index(path, link):
+    for suffix in ('/index.html', '/index'):
+        if path.endswith(suffix):
+            return path[:-len(suffix)] + '/'
+    return path
+
+
+def fix_strip_html(path, link):
+    return path[:-5] if path.endswith('.html') and path.startswith('/') else path
+
+
+RULE_FUNCTIONS = {rule_id: globals()['fix_' + rule_id] for rule_id in FIX_RULES}
+
+
+def fix_href(href, link, rules):
+    """Run the rules over one href; returns (new href, [rule ids that changed it])"""
+    origin = ''
+    if href.startswith(DOMAIN + '/') or href == DOMAIN:
+        origin, href = DOMAIN, href[len(DOMAIN):] or '/'
+    elif SCHEME_RE.match(href) or href.startswith(SKIP_PREFIXES):
+        return href, []
+    path, rest = re.match(r'([^?#]*)(.*)', href, re.S).groups()
+    if not path:
+        if not rest.startswith('#'):
+            return origin + href, []
+        path, rest = rest, '' # Fragment-only links ('#products') are matched whole
+    applied = []
+    for rule_id in rules:
+        fixed = RULE_FUNCTIONS[rule_id](path, link)
+        if fixed != path:
+            applied.append(rule_id)
+            path = fixed
+    return origin + path + rest, applied
+
+
+def fix_html(html, page, rules=FIX_RULES):
+    """Rewrite every <a href> of one document; returns (html, [(rule ids, old, new)])"""
+    changes = []
+
+    def replace(match):
+        if match.group('raw') or match.group('attrs') is None:
+            return match.group(0)
+        attrs = match.group('attrs')
+        href_match = HREF_RE.search(attrs)
+        if not href_match:
+            return match.group(0)
+        old = href_match.group(3)
+        link = {'page': page, 'text': TAG_RE.sub('', match.group('text'))}
+        new, applied = fix_href(old, link, rules)
+        if not applied:
+            return match.group(0)
+        changes.append((applied, old, new))
+        start, end = href_match.span(3)
+        return f"<a{attrs[:start]}{new}{attrs[end:]}>{match.group('text')}</a>"
+
+    return TOKEN_RE.sub(replace, html), changes
+
+
+def fix_file(path, rules=FIX_RULES, write=True):
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    fixed, changes = fix_html(html, path.replace(os.sep, '/'), rules)
+    if changes and write:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(fixed)
+    return path, changes
+
+
+def collect_pages(targets):
+    """HTML files under the given files/directories (the whole site by default)"""
+    pages = []
+    for target in targets or ['.']:
+        if os.path.isfile(target):
+            pages.append(os.path.relpath(target))
+            continue
+        for dirpath, dirnames, filenames in os.walk(target):
+            dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDE_DIRS and not d.startswith('.'))
+            pages.extend(os.path.relpath(os.path.join(dirpath, name)) for name in sorted(filenames) if name.endswith('.html'))
+    return sorted(set(pages))
+
+
+def run(pages, rules=FIX_RULES, write=True, workers=None):
+    """Fix every page (in parallel for large sets); returns {path: changes}"""
+    if len(pages) < PARALLEL_MIN_FILES and not workers:
+        return dict(fix_file(path, rules, write) for path in pages)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(fix_file, pages, [rules] * len(pages), [write] * len(pages), chunksize=16))
+
+
+def print_summary(results, elapsed, write, show_diff):
+    changed = {path: changes for path, changes in results.items() if changes}
+    total = sum(len(changes) for changes in changed.values())
+    verb = "Fixed" if write else "Would fix"
+    print(f"{verb} {total} link(s) in {len(changed)} of {len(results)} file(s) in {elapsed * 1000:.0f} ms")
+    by_rule = defaultdict(int)
+    for changes in changed.values():
+        for applied, _, _ in changes:
+            for rule_id in applied:
+                by_rule[rule_id] += 1
+    for rule_id in FIX_RULES:
+        if by_rule[rule_id]:
+            print(f"  {rule_id:<17} {by_rule[rule_id]:>5}")
+    for path, changes in sorted(changed.items()):
+        print(f"{path}: {len(changes)} change(s)")
+        if show_diff:
+            for applied, old, new in changes:
+                print(f"  - {old}\n  + {new}    ({', '.join(applied)})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite page links with the declarative fix rules")
+    parser.add_argument('paths', nargs='*', help="Files or directories (default: the whole site)")
+    parser.add_argument('--rules', default=','.join(FIX_RULES), help=f"Comma-separated subset of: {', '.join(FIX_RULES)}")
+    parser.add_argument('--check', action='store_true', help="Do not write; exit 1 if any link would change")
+    parser.add_argument('--diff', action='store_true', help="Show every changed href")
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f"Worker processes (default: CPU count from {PARALLEL_MIN_FILES} files, else none)")
+    args = parser.parse_args()
+
+    rules = [rule_id.strip() for rule_id in args.rules.split(',') if rule_id.strip()]
+    unknown = [rule_id for rule_id in rules if rule_id not in RULE_FUNCTIONS]
+    if unknown:
+        sys.exit(f"Unknown rule(s): {', '.join(unknown)}")
+    rules = [rule_id for rule_id in FIX_RULES if rule_id in rules] # Always in declaration order
+
+    start = time.perf_counter()
+    results = run(collect_pages(args.paths), rules, write=not args.check, workers=args.workers)
+    print_summary(results, time.perf_counter() - start, not args.check, args.diff)
+    if args.check and any(results.values()):
+        sys.exit(1)
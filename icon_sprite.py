@@ -0,0 +1,208 @@
+"""
+Font Awesome subsetting.
+
+Replaces the cdnjs Font Awesome stylesheet (+ its webfonts) with one SVG
+sprite that only contains the icons the pages use:
+
+    <i class="fa-solid fa-book text-6xl ..."></i>
+ -> <svg class="fa-icon text-6xl ..." viewBox="0 0 448 512" aria-hidden="true">
+      <use href="/assets/icons.<hash>.svg#solid-book"></use></svg>
+
+Icons on pages build.py prettified are written the way its next prettify()
+prints them (one tag per line, sorted lower-case attributes), so rebuilding
+an unchanged site does not rewrite the markup.
+
+The sprite lives in /assets/ (immutable cache, one request shared by every
+page). Pages that no longer contain any Font Awesome markup drop the
+stylesheet link and the cdnjs preconnect.
+
+Icon paths come from the Font Awesome Free metadata shipped with
+`pip install fontawesomefree`; without it the stage is skipped.
+"""
+import os
+import re
+import glob
+import json
+import hashlib
+
+try:
+    import fontawesomefree
+except ImportError:
+    fontawesomefree = None
+
+# ================= Configuration =================
+ASSETS_DIR = "assets"
+SPRITE_PREFIX = "icons."
+ICON_CLASS = "fa-icon"
+# Sizing of an icon <svg> the same way Font Awesome's own SVG framework does it (1em tall, width from viewBox);
+# added to the compiled stylesheet by build.py
+ICON_CSS = f".{ICON_CLASS}{{display:inline-block;height:1em;overflow:visible;vertical-align:-0.125em;fill:currentColor}}"
+
+STYLE_CLASSES = {'fa-solid': 'solid', 'fas': 'solid', 'fa-regular': 'regular', 'far': 'regular',
+                 'fa-brands': 'brands', 'fab': 'brands', 'fa': None}
+# Modifiers that need the Font Awesome CSS (animations, sizing, stacking): such icons are left as <i>
+UNSUPPORTED_MODIFIERS = re.compile(r'^fa-(\d*x|xs|sm|lg|xl|2xs|2xl|fw|spin|spin-pulse|pulse|beat|beat-fade|bounce|'
+                                   r'fade|flip|shake|rotate-\d+|rotate-by|flip-\w+|stack|stack-\dx|inverse|border|'
+                                   r'pull-\w+|ul|li|sr-only)$')
+
+ICON_TAG_RE = re.compile(r'(?P<indent>^[ \t]*)?<i(?P<attrs>\s[^>]*)?>(?P<inner>\s*)</i>', re.M)
+CLASS_ATTR_RE = re.compile(r'\sclass="([^"]*)"')
+ATTR_RE = re.compile(r'\s([^\s=/>]+)(?:="([^"]*)")?')
+SPRITE_REF_RE = re.compile(r'/' + re.escape(ASSETS_DIR) + r'/' + re.escape(SPRITE_PREFIX) + r'[0-9a-f]+\.svg#([a-z]+-[a-z0-9-]+)')
+REMAINING_FA_RE = re.compile(r'\sclass="[^"]*\bfa-(?!icon\b)[a-z]')
+FA_STYLESHEET_RE = re.compile(r'[ \t]*<link[^>]*href="[^"]*font-?awesome[^"]*"[^>]*/?>\n?')
+CDNJS_PRECONNECT_RE = re.compile(r'[ \t]*<link(?=[^>]*rel="preconnect")[^>]*href="https://cdnjs\.cloudflare\.com"[^>]*/?>\n?')
+
+
+def load_icons():
+    """{name: {style: {'viewBox': [...], 'path': str|list}}} with aliases resolved, or None without fontawesomefree"""
+    if fontawesomefree is None:
+        return None
+    path = os.path.join(os.path.dirname(fontawesomefree.__file__), 'static', 'fontawesomefree', 'metadata', 'icons.json')
+    with open(path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    icons = {}
+    for name, icon in metadata.items():
+        icons[name] = icon['svg']
+        for alias in (icon.get('aliases') or {}).get('names', []):
+            icons.setdefault(alias, icon['svg'])
+    return icons
+
+
+def parse_icon(class_attr):
+    """'fa-solid fa-book text-6xl' -> ('solid', 'book', ['text-6xl']) or None if it is not a plain FA icon"""
+    style, name, rest = None, None, []
+    for cls in class_attr.split():
+        if cls in STYLE_CLASSES:
+            style = STYLE_CLASSES[cls] or style
+        elif cls.startswith('fa-'):
+            if UNSUPPORTED_MODIFIERS.match(cls) or name:
+                return None
+            name = cls[3:]
+        else:
+            rest.append(cls)
+    if not name:
+        return None
+    return style, name, rest
+
+
+def resolve(icons, style, name):
+    """Pick the requested style, or the only style the icon has (fa-telegram without fa-brands etc.)"""
+    svg = icons.get(name)
+    if not svg:
+        return None
+    if style in svg:
+        return style
+    if style is None:
+        return 'solid' if 'solid' in svg else next(iter(svg))
+    return None
+
+
+def symbol(icons, symbol_id):
+    style, name = symbol_id.split('-', 1)
+    svg = icons[name][style]
+    paths = svg['path'] if isinstance(svg['path'], list) else [svg['path']]
+    view_box = ' '.join(str(v) for v in svg['viewBox'])
+    body = ''.join(f'<path d="{d}"/>' for d in paths if d)
+    return f'<symbol id="{symbol_id}" viewBox="{view_box}">{body}</symbol>'
+
+
+def build_sprite(pages, assets_dir=ASSETS_DIR):
+    """
+    Collect every icon referenced by the pages (new <i> markup and existing sprite
+    references), write assets/icons.<hash>.svg, rewrite the markup and drop the
+    Font Awesome stylesheet where it is no longer needed.
+    Returns stats, or None when fontawesomefree is not installed.
+    """
+    icons = load_icons()
+    if icons is None:
+        return None
+
+    contents = {}
+    used, missing = set(), set()
+    for path in pages:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        contents[path] = html
+        for sid in SPRITE_REF_RE.findall(html):
+            style, icon = sid.split('-', 1)
+            if style in icons.get(icon, {}):
+                used.add(sid)
+        for _, parsed in iter_icon_tags(html):
+            if not parsed:
+                continue
+            style = resolve(icons, parsed[0], parsed[1])
+            if style:
+                used.add(f"{style}-{parsed[1]}")
+            else:
+                missing.add(f"fa-{parsed[1]}")
+
+    sprite = ('<svg xmlns="http://www.w3.org/2000/svg">'
+              '<!-- Font Awesome Free by @fontawesome - https://fontawesome.com License - '
+              'https://fontawesome.com/license/free (Icons: CC BY 4.0) -->'
+              + ''.join(symbol(icons, sid) for sid in sorted(used)) + '</svg>\n')
+    name = f"{SPRITE_PREFIX}{hashlib.sha1(sprite.encode('utf-8')).hexdigest()[:10]}.svg"
+    sprite_path = os.path.join(assets_dir, name)
+    if not os.path.exists(sprite_path):
+        with open(sprite_path, 'w', encoding='utf-8') as f:
+            f.write(sprite)
+    for old in glob.glob(os.path.join(assets_dir, f"{SPRITE_PREFIX}*.svg")):
+        if os.path.basename(old) != name:
+            os.remove(old)
+
+    href = f"/{assets_dir}/{name}"
+    rewritten = 0
+    for path, html in contents.items():
+        updated = rewrite_icons(html, icons, href)
+        if updated != html:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(updated)
+            rewritten += 1
+    return {'href': href, 'icons': len(used), 'bytes': len(sprite.encode('utf-8')),
+            'pages': rewritten, 'missing': sorted(missing)}
+
+
+def iter_icon_tags(html):
+    """(match, parse_icon() result or None) for every empty <i> element"""
+    for match in ICON_TAG_RE.finditer(html):
+        yield match, _parse_tag(match)
+
+
+def _parse_tag(match):
+    class_match = CLASS_ATTR_RE.search(match.group('attrs') or '')
+    return parse_icon(class_match.group(1)) if class_match else None
+
+
+def rewrite_icons(html, icons, href):
+    def replace(match):
+        attrs = match.group('attrs') or ''
+        parsed = _parse_tag(match)
+        if not parsed:
+            return match.group(0)
+        style = resolve(icons, parsed[0], parsed[1])
+        if not style:
+            return match.group(0)
+        svg = icons[parsed[1]][style]
+        view_box = ' '.join(str(v) for v in svg['viewBox'])
+        classes = ' '.join([ICON_CLASS] + parsed[2])
+        other = CLASS_ATTR_RE.sub('', attrs)
+        if 'aria-' not in other:
+            other += ' aria-hidden="true"'
+        use_href = f"{href}#{style}-{parsed[1]}"
+        indent = match.group('indent')
+        if indent is None or '\n' not in match.group('inner'):
+            return (f'{indent or ""}<svg class="{classes}"{other} focusable="false" viewBox="{view_box}">'
+                    f'<use href="{use_href}"></use></svg>')
+        # A page build.py prettified: write what its next prettify() would, so a rebuild leaves it alone
+        names = dict(ATTR_RE.findall(other), **{'class': classes, 'focusable': 'false', 'viewbox': view_box})
+        attrs = ''.join(f' {name.lower()}="{value}"' for name, value in sorted(names.items()))
+        return (f'{indent}<svg{attrs}>\n{indent} <use href="{use_href}">\n{indent} </use>\n{indent}</svg>')
+
+    html = ICON_TAG_RE.sub(replace, html)
+    html = SPRITE_REF_RE.sub(lambda m: f"{href}#{m.group(1)}", html)
+    # Keep the Font Awesome CSS only where some icon could not be converted
+    if not REMAINING_FA_RE.search(html):
+        html = FA_STYLESHEET_RE.sub('', html)
+        if 'cdnjs.cloudflare.com/' not in html:
+            html = CDNJS_PRECONNECT_RE.sub('', html)
+    return html
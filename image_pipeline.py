@@ -0,0 +1,226 @@
+"""
+Image stage for build.py.
+
+- PNGs under images/ and assets/ are recompressed losslessly in place
+  (only kept when smaller).
+- Raster images under images/ get AVIF and WebP variants at several widths
+  in assets/img/, and <img> tags in posts that point at them are wrapped in
+  <picture> with srcset/sizes, intrinsic width/height, loading="lazy".
+- assets/favicon.ico is regenerated from assets/logo.png at 16/32/48 px.
+
+Everything is keyed by the source file's content hash in .image-cache.json,
+so unchanged images are never decoded again.
+
+Dependencies: pip install pillow (AVIF needs Pillow >= 11.3; without it only WebP
+is produced). Without Pillow the stage is skipped and <img> tags are left alone.
+"""
+import io
+import os
+import glob
+import json
+import hashlib
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = features = None
+
+from asset_manifest import FINGERPRINT_RE
+
+# ================= Configuration =================
+SOURCE_DIRS = ['images']                 # Content images: recompress + responsive variants
+RECOMPRESS_DIRS = ['images', 'assets']   # PNGs recompressed in place
+OUTPUT_DIR = os.path.join('assets', 'img')
+CACHE_FILE = '.image-cache.json'
+PIPELINE_VERSION = 1 # Bump when widths/encoder settings change so every image is reprocessed
+
+WIDTHS = (480, 768, 1200)
+# The post column is at most ~800px wide (lg:col-span-2 of max-w-7xl)
+SIZES = "(min-width: 1024px) 800px, 100vw"
+FORMATS = [
+    ('avif', 'image/avif', {'quality': 55}),
+    ('webp', 'image/webp', {'quality': 80, 'method': 6}),
+]
+RASTER_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp'}
+
+FAVICON_SOURCE = os.path.join('assets', 'logo.png')
+FAVICON_FILE = os.path.join('assets', 'favicon.ico')
+FAVICON_SIZES = [(16, 16), (32, 32), (48, 48)]
+
+
+def file_sha1(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def recompress_png(path):
+    """Lossless re-encode at maximum zlib compression; returns bytes saved (0 if the original was already smaller)"""
+    with open(path, 'rb') as f:
+        original = f.read()
+    with Image.open(io.BytesIO(original)) as im:
+        params = {'optimize': True}
+        if im.info.get('icc_profile'):
+            params['icc_profile'] = im.info['icc_profile']
+        if 'transparency' in im.info:
+            params['transparency'] = im.info['transparency']
+        buf = io.BytesIO()
+        im.save(buf, 'PNG', **params)
+    data = buf.getvalue()
+    if len(data) >= len(original):
+        return 0
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(original) - len(data)
+
+
+class ImagePipeline:
+    """
+    Usage (build.py):
+        images = ImagePipeline.load()
+        images.process()                   # before the posts are written
+        images.apply_picture(soup, img)    # for every <img> in a post
+        images.save()
+    """
+
+    def __init__(self):
+        self.entries = {} # rel_path -> {'sha1', 'width', 'height', 'variants': {fmt: [[width, url], ...]}}
+        self.formats = [fmt for fmt in FORMATS if features and features.check(fmt[0])]
+        self.stats = {'processed': 0, 'cached': 0, 'variants': 0, 'saved_bytes': 0, 'favicon': False}
+
+    @classmethod
+    def load(cls, path=CACHE_FILE):
+        pipeline = cls()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == PIPELINE_VERSION:
+                pipeline.entries = data.get('files', {})
+        return pipeline
+
+    def save(self, path=CACHE_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': PIPELINE_VERSION, 'files': self.entries}, f, indent=1)
+
+    def _recompress_sources(self):
+        # Fingerprinted copies (asset_manifest.py) are regenerated from their source, never edited
+        return [path for directory in RECOMPRESS_DIRS for path in sorted(glob.glob(os.path.join(directory, '*.png')))
+                if not FINGERPRINT_RE.match(os.path.basename(path))]
+
+    def _outputs_exist(self, entry):
+        return all(os.path.exists(url.lstrip('/')) for variants in entry['variants'].values() for _, url in variants)
+
+    def process(self):
+        """Recompress PNGs, build variants for changed content images and refresh the favicon (None without Pillow)"""
+        if Image is None:
+            return None
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        seen = set()
+        for path in self._recompress_sources():
+            entry = self.entries.get(path.replace(os.sep, '/'))
+            if entry and entry['sha1'] == file_sha1(path):
+                continue
+            self.stats['saved_bytes'] += recompress_png(path)
+
+        for directory in SOURCE_DIRS:
+            for path in sorted(glob.glob(os.path.join(directory, '**', '*'), recursive=True)):
+                if os.path.splitext(path)[1].lower() not in RASTER_EXTENSIONS:
+                    continue
+                rel = path.replace(os.sep, '/')
+                seen.add(rel)
+                digest = file_sha1(path)
+                entry = self.entries.get(rel)
+                if entry and entry['sha1'] == digest and self._outputs_exist(entry):
+                    self.stats['cached'] += 1
+                    continue
+                if entry:
+                    self._remove_variants(entry)
+                self.entries[rel] = self._build_variants(path, digest)
+                self.stats['processed'] += 1
+
+        # Also remember recompressed-only PNGs (assets/) so they are not re-encoded next time
+        for path in self._recompress_sources():
+            rel = path.replace(os.sep, '/')
+            if rel not in seen:
+                seen.add(rel)
+                self.entries[rel] = {'sha1': file_sha1(path), 'variants': {}}
+
+        for rel in [rel for rel in self.entries if rel not in seen and not rel.endswith('.ico')]:
+            self._remove_variants(self.entries.pop(rel))
+        self.build_favicon()
+        return self.stats
+
+    def _build_variants(self, path, digest):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        with Image.open(path) as im:
+            im.load()
+            width, height = im.size
+            if im.mode not in ('RGB', 'RGBA'):
+                im = im.convert('RGBA' if 'transparency' in im.info or im.mode in ('LA', 'PA') else 'RGB')
+            # Every configured width below the original, plus the original size itself (capped at the largest width)
+            widths = sorted({w for w in WIDTHS if w < width} | {min(width, WIDTHS[-1])})
+            variants = {}
+            for fmt, _, params in self.formats:
+                variants[fmt] = []
+                for w in widths:
+                    out = os.path.join(OUTPUT_DIR, f"{stem}-{digest[:8]}-{w}.{fmt}")
+                    if not os.path.exists(out):
+                        resized = im if w == width else im.resize((w, round(height * w / width)), Image.LANCZOS)
+                        resized.save(out, fmt.upper(), **params)
+                    variants[fmt].append([w, '/' + out.replace(os.sep, '/')])
+                    self.stats['variants'] += 1
+        # Hash after recompression, so the next build sees the file as unchanged
+        return {'sha1': file_sha1(path), 'width': width, 'height': height, 'variants': variants}
+
+    def _remove_variants(self, entry):
+        for variants in entry.get('variants', {}).values():
+            for _, url in variants:
+                if os.path.exists(url.lstrip('/')):
+                    os.remove(url.lstrip('/'))
+
+    def build_favicon(self):
+        """favicon.ico with only the sizes browsers request, regenerated when logo.png changes"""
+        if not os.path.exists(FAVICON_SOURCE):
+            return
+        digest = file_sha1(FAVICON_SOURCE)
+        entry = self.entries.get(FAVICON_FILE.replace(os.sep, '/'))
+        if entry and entry['sha1'] == digest and os.path.exists(FAVICON_FILE):
+            return
+        with Image.open(FAVICON_SOURCE) as im:
+            im.convert('RGBA').save(FAVICON_FILE, 'ICO', sizes=FAVICON_SIZES)
+        self.entries[FAVICON_FILE.replace(os.sep, '/')] = {'sha1': digest, 'variants': {}}
+        self.stats['favicon'] = True
+
+    def lookup(self, src):
+        """Root-relative src ('/images/foo.png') -> cache entry with variants, or None"""
+        if not src.startswith('/') or src.startswith('//'):
+            return None
+        entry = self.entries.get(src.split('?')[0].split('#')[0].lstrip('/'))
+        return entry if entry and entry.get('variants') else None
+
+    def apply_picture(self, soup, img):
+        """
+        Turn <img> into <picture> with AVIF/WebP <source>s (the <img> stays as the fallback).
+        Idempotent: an <img> already inside <picture> gets its <source>s regenerated.
+        """
+        entry = self.lookup(img.get('src', ''))
+        if not entry:
+            return False
+        if not img.get('width') and not img.get('height'):
+            img['width'] = str(entry['width'])
+            img['height'] = str(entry['height'])
+        img['loading'] = img.get('loading', 'lazy')
+        img['decoding'] = img.get('decoding', 'async')
+
+        picture = img.parent if img.parent and img.parent.name == 'picture' else None
+        if picture is None:
+            picture = soup.new_tag('picture')
+            img.wrap(picture)
+        for source in picture.find_all('source'):
+            source.decompose()
+        for fmt, mime, _ in self.formats:
+            variants = entry['variants'].get(fmt)
+            if not variants:
+                continue
+            srcset = ', '.join(f"{url} {w}w" for w, url in variants)
+            img.insert_before(soup.new_tag('source', attrs={'type': mime, 'srcset': srcset, 'sizes': SIZES}))
+        return True
@@ -0,0 +1,121 @@
+# Dependencies:
+# pip install numpy scipy
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, shortest_path
+
+
+class LinkGraph:
+    """
+    Compact CSR view of the auditor's internal link graph.
+
+    Pages are mapped to integer ids once; every metric below is computed on
+    NumPy/SciPy arrays so the cost stays linear in the number of links
+    instead of looping over the dict-of-sets graph in Python.
+    """
+
+    def __init__(self, internal_graph, pages=()):
+        # Stable node ids: known pages first, then any link target not scanned (e.g. /sitemap.xml)
+        self.nodes = []
+        self.index = {}
+        for page in pages:
+            self._add_node(page)
+        for source, targets in internal_graph.items():
+            self._add_node(source)
+            for target in targets:
+                self._add_node(target)
+
+        n = len(self.nodes)
+        rows = []
+        cols = []
+        for source, targets in internal_graph.items():
+            src_id = self.index[source]
+            for target in targets:
+                rows.append(src_id)
+                cols.append(self.index[target])
+
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        data = np.ones(len(rows), dtype=np.float64)
+        self.adjacency = csr_matrix((data, (rows, cols)), shape=(n, n))
+        # Duplicate edges collapse into one (graph is a set of targets anyway)
+        self.adjacency.data[:] = 1.0
+        self.out_degree = np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+    def _add_node(self, page):
+        if page not in self.index:
+            self.index[page] = len(self.nodes)
+            self.nodes.append(page)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def pagerank(self, damping=0.85, tol=1e-10, max_iter=100):
+        """Internal PageRank via power iteration. Returns {page: score} summing to 1."""
+        n = len(self.nodes)
+        if n == 0:
+            return {}
+
+        # Row-normalise the adjacency, then iterate with the transpose
+        inv_degree = np.zeros(n)
+        linked = self.out_degree > 0
+        inv_degree[linked] = 1.0 / self.out_degree[linked]
+        transition = (self.adjacency.multiply(inv_degree[:, None])).T.tocsr()
+        dangling = ~linked
+
+        rank = np.full(n, 1.0 / n)
+        teleport = (1.0 - damping) / n
+        for _ in range(max_iter):
+            # Dead-end pages spread their rank evenly over the whole site
+            dangling_mass = rank[dangling].sum() / n
+            new_rank = damping * (transition @ rank + dangling_mass) + teleport
+            delta = np.abs(new_rank - rank).sum()
+            rank = new_rank
+            if delta < tol:
+                break
+
+        return dict(zip(self.nodes, rank.tolist()))
+
+    def strongly_connected_components(self):
+        """
+        Returns ({page: component_id}, {component_id: size}).
+        Component ids are ordered by size, so 0 is always the largest component.
+        """
+        n = len(self.nodes)
+        if n == 0:
+            return {}, {}
+
+        _, labels = connected_components(self.adjacency, directed=True, connection='strong')
+        sizes = np.bincount(labels)
+        # Relabel so that the biggest component gets id 0
+        order = np.argsort(-sizes, kind='stable')
+        relabel = np.empty_like(order)
+        relabel[order] = np.arange(len(order))
+        labels = relabel[labels]
+        sizes = sizes[order]
+
+        return dict(zip(self.nodes, labels.tolist())), dict(enumerate(sizes.tolist()))
+
+    def hub_depths(self, hubs):
+        """
+        Unweighted shortest-path depth from every hub to every page.
+        Returns {hub: {page: depth}} plus the nearest-hub depth under the key None.
+        Unreachable pages get float('inf').
+        """
+        hub_ids = [self.index[h] for h in hubs if h in self.index]
+        if not hub_ids:
+            return {None: {page: float('inf') for page in self.nodes}}
+
+        # One BFS per hub, all in C: shape (len(hubs), n)
+        distances = shortest_path(self.adjacency, directed=True, unweighted=True, indices=hub_ids)
+        distances = np.atleast_2d(distances)
+
+        result = {}
+        for row, hub_id in zip(distances, hub_ids):
+            result[self.nodes[hub_id]] = self._depth_map(row)
+        result[None] = self._depth_map(distances.min(axis=0))
+        return result
+
+    def _depth_map(self, row):
+        return {page: (int(d) if np.isfinite(d) else float('inf')) for page, d in zip(self.nodes, row.tolist())}
@@ -0,0 +1,340 @@
+"""
+Post-build optimization stage.
+
+Run after build.py. Mirrors the deployable site into dist/ with:
+  - HTML minified (prettify() indentation removed; <pre>, <textarea> and
+    JSON-LD / other inline scripts kept byte-for-byte, inline <style> minified)
+  - CSS and JS minified (conservatively, see minify_css / minify_js)
+  - .br / .gz siblings written at maximum compression for text assets
+
+The siblings are for a server that negotiates them itself (serve.py, nginx
+gzip_static/brotli_static). Cloudflare Pages never requests them (pages link
+/about, not /about.html.br) and compresses on the fly, so dist/_headers is
+the site's own _headers, without Content-Encoding rules that could make it
+encode a response twice.
+
+Only files whose source content changed since the last run are reprocessed
+(tracked in dist/.optimize-manifest.json), in parallel across processes.
+
+Usage:
+    python optimize.py                # build/refresh dist/
+    python optimize.py --force        # reprocess everything
+
+Brotli output needs `pip install brotli`; without it only .gz siblings are written.
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+import argparse
+import concurrent.futures
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ================= Configuration =================
+DIST_DIR = "dist"
+MANIFEST_FILE = ".optimize-manifest.json"
+OPTIMIZER_VERSION = 3 # Bump when the minifiers change so every file is reprocessed
+
+# Tooling / sources that are not part of the deployed site
+EXCLUDE_DIRS = {'.git', '.github', '.vscode', '.idea', '__pycache__', 'node_modules',
+                'MasterTool', 'scripts', 'soft-router-reference', DIST_DIR}
+EXCLUDE_FILES = {'layout_template.html', 'section.html', 'requests.jsonl', 'audit_report.csv', 'asset-manifest.json'}
+EXCLUDE_EXTENSIONS = {'.py', '.pyc', '.md', '.jsonl', '.csv', '.sh', '.patch'}
+
+COMPRESS_EXTENSIONS = {'.html', '.css', '.js', '.json', '.xml', '.svg', '.txt'}
+COMPRESS_MIN_SIZE = 512 # Below this the encoding overhead eats the saving
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.json': 'application/json; charset=utf-8',
+    '.xml': 'application/xml; charset=utf-8',
+    '.svg': 'image/svg+xml',
+    '.txt': 'text/plain; charset=utf-8',
+    '.ico': 'image/x-icon',
+}
+ENCODINGS = (('.br', 'br'), ('.gz', 'gzip'))
+
+# ================= Minifiers =================
+# Elements whose contents must not be touched (or get their own minifier)
+RAW_BLOCK_RE = re.compile(
+    r'<!--.*?-->|<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>|<[^>]+>',
+    re.DOTALL | re.IGNORECASE,
+)
+TAG_NAME_RE = re.compile(r'</?([a-zA-Z][a-zA-Z0-9-]*)')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Whitespace next to these tags never renders, so it can be dropped entirely.
+# Whitespace next to inline tags (a, span, strong, i, button, ...) is collapsed to one space instead.
+BLOCK_TAGS = {
+    'html', 'head', 'body', 'title', 'meta', 'link', 'script', 'style', 'noscript', 'base',
+    'div', 'p', 'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'nav', 'header', 'footer', 'main',
+    'section', 'article', 'aside', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'caption', 'form', 'fieldset',
+    'hr', 'br', 'figure', 'figcaption', 'details', 'summary', 'pre', 'textarea', 'option',
+    '!doctype',
+}
+
+
+def _tag_name(tag):
+    if tag.startswith('<!'):
+        return '!doctype' if tag[:9].lower() == '<!doctype' else None
+    match = TAG_NAME_RE.match(tag)
+    return match.group(1).lower() if match else None
+
+
+def minify_html(html):
+    """
+    Whitespace-only HTML minifier for the prettify() output build.py writes.
+    Comments are dropped (conditional comments kept); text whitespace is collapsed
+    and trimmed next to block-level tags. Tags and attributes are emitted unchanged.
+    """
+    out = []
+
+    def add_text(text):
+        # A dropped comment leaves two text runs next to each other: merge them
+        if out and out[-1][0] == 'text':
+            out[-1] = ('text', out[-1][1] + text, None)
+        else:
+            out.append(('text', text, None))
+
+    pos = 0
+    for match in RAW_BLOCK_RE.finditer(html):
+        add_text(html[pos:match.start()])
+        token = match.group(0)
+        if token.startswith('<!--'):
+            if token.startswith('<!--[if'):
+                out.append(('tag', token, None))
+        elif match.group(1) and match.group(1).lower() == 'style':
+            open_end = token.index('>') + 1
+            close_start = token.lower().rindex('</style')
+            css = minify_css(token[open_end:close_start])
+            out.append(('tag', token[:open_end] + css + token[close_start:], 'style'))
+        else:
+            out.append(('tag', token, _tag_name(token)))
+        pos = match.end()
+    add_text(html[pos:])
+
+    result = []
+    for i, item in enumerate(out):
+        if item[0] == 'tag':
+            result.append(item[1])
+            continue
+        text = WHITESPACE_RE.sub(' ', item[1])
+        if not text.strip():
+            # Pure whitespace between two tags: keep one space only between inline tags
+            prev_tag = out[i - 1][2] if i > 0 else 'html'
+            next_tag = out[i + 1][2] if i + 1 < len(out) else 'html'
+            text = '' if (prev_tag in BLOCK_TAGS or next_tag in BLOCK_TAGS or not text) else ' '
+        else:
+            if i == 0 or out[i - 1][2] in BLOCK_TAGS:
+                text = text.lstrip()
+            if i + 1 >= len(out) or out[i + 1][2] in BLOCK_TAGS:
+                text = text.rstrip()
+        result.append(text)
+    return ''.join(result)
+
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_PUNCT_RE = re.compile(r'\s*([{};,])\s*')
+EMPTY_PROPERTY_RE = re.compile(r'(--[\w-]+):(?=[;}])')
+
+
+def minify_css(css):
+    """Drop comments, collapse whitespace and the spaces around { } ; , (not around : or +/- which calc() needs)"""
+    css = CSS_COMMENT_RE.sub('', css)
+    css = WHITESPACE_RE.sub(' ', css)
+    css = CSS_PUNCT_RE.sub(r'\1', css)
+    # Keep the space in empty custom properties (`--tw-blur: ;`), `--x:;` is not valid everywhere
+    css = EMPTY_PROPERTY_RE.sub(r'\1: ', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(js):
+    """
+    Line-level JS minifier without a parser: strips indentation, blank lines,
+    whole-line // comments and comment blocks that start a line.
+    Files with template literals are returned unchanged, since their line
+    breaks and indentation are part of the string.
+    """
+    if '`' in js:
+        return js
+    lines = []
+    in_comment = False
+    for line in js.splitlines():
+        stripped = line.strip()
+        if in_comment:
+            if '*/' in stripped:
+                in_comment = False
+                rest = stripped.split('*/', 1)[1].strip()
+                if rest:
+                    lines.append(rest)
+            continue
+        if not stripped or stripped.startswith('//'):
+            continue
+        if stripped.startswith('/*'):
+            if '*/' not in stripped:
+                in_comment = True
+                continue
+            rest = stripped.split('*/', 1)[1].strip()
+            if not rest:
+                continue
+            stripped = rest
+        lines.append(stripped)
+    # Newlines are kept so automatic semicolon insertion still works
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {'.html': minify_html, '.css': minify_css, '.js': minify_js}
+
+# ================= Build Stage =================
+
+def iter_site_files(root='.', skip_dirs=()):
+    """Yield the relative paths of every file that gets deployed"""
+    skip_dirs = {os.path.abspath(d) for d in skip_dirs}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDE_DIRS and not d.startswith('.')
+                             and os.path.abspath(os.path.join(dirpath, d)) not in skip_dirs)
+        for filename in sorted(filenames):
+            rel = os.path.relpath(os.path.join(dirpath, filename), root)
+            if filename in EXCLUDE_FILES or filename.startswith('.'):
+                continue
+            if os.path.splitext(filename)[1].lower() in EXCLUDE_EXTENSIONS:
+                continue
+            yield rel.replace(os.sep, '/')
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def output_paths(rel, dist_dir):
+    dest = os.path.join(dist_dir, rel)
+    return [dest] + [dest + suffix for suffix, _ in ENCODINGS]
+
+
+def optimize_file(rel, src_root, dist_dir):
+    """Worker: write the minified file plus its .br/.gz siblings. Returns size stats."""
+    src = os.path.join(src_root, rel)
+    dest = os.path.join(dist_dir, rel)
+    os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+    ext = os.path.splitext(rel)[1].lower()
+
+    with open(src, 'rb') as f:
+        data = f.read()
+    original = len(data)
+
+    minifier = MINIFIERS.get(ext)
+    if minifier:
+        try:
+            data = minifier(data.decode('utf-8')).encode('utf-8')
+        except UnicodeDecodeError:
+            pass # Not UTF-8 text: ship it as-is
+
+    with open(dest, 'wb') as f:
+        f.write(data)
+    shutil.copystat(src, dest)
+
+    stats = {'original': original, 'minified': len(data), 'br': None, 'gz': None}
+    siblings = {}
+    if ext in COMPRESS_EXTENSIONS and len(data) >= COMPRESS_MIN_SIZE:
+        siblings['.gz'] = gzip.compress(data, compresslevel=9, mtime=0)
+        if brotli is not None:
+            siblings['.br'] = brotli.compress(data, quality=11)
+    for suffix, _ in ENCODINGS:
+        path = dest + suffix
+        body = siblings.get(suffix)
+        # Only keep a sibling if it is actually smaller than the plain file
+        if body is not None and len(body) < len(data):
+            with open(path, 'wb') as f:
+                f.write(body)
+            stats[suffix[1:]] = len(body)
+        elif os.path.exists(path):
+            os.remove(path)
+    return stats
+
+
+def load_manifest(dist_dir):
+    path = os.path.join(dist_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == OPTIMIZER_VERSION and data.get('brotli') == (brotli is not None):
+            return data.get('files', {})
+    return {}
+
+
+def save_manifest(dist_dir, files):
+    with open(os.path.join(dist_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'version': OPTIMIZER_VERSION, 'brotli': brotli is not None, 'files': files}, f, indent=1)
+
+
+def run(src_root='.', dist_dir=DIST_DIR, force=False, workers=None):
+    os.makedirs(dist_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(dist_dir)
+
+    sources = {rel: file_digest(os.path.join(src_root, rel)) for rel in iter_site_files(src_root, [dist_dir])}
+    changed = [rel for rel, digest in sources.items()
+               if manifest.get(rel, {}).get('sha1') != digest
+               or not os.path.exists(os.path.join(dist_dir, rel))]
+
+    # Sources that disappeared: remove their outputs
+    removed = [rel for rel in manifest if rel not in sources]
+    for rel in removed:
+        for path in output_paths(rel, dist_dir):
+            if os.path.exists(path):
+                os.remove(path)
+        del manifest[rel]
+
+    if changed:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(optimize_file, rel, src_root, dist_dir): rel for rel in changed}
+            for future in concurrent.futures.as_completed(futures):
+                rel = futures[future]
+                manifest[rel] = {'sha1': sources[rel], 'stats': future.result()}
+
+    save_manifest(dist_dir, manifest)
+    return changed, removed, manifest
+
+
+def print_summary(changed, removed, manifest):
+    print(f"Optimized {len(changed)} changed file(s), removed {len(removed)}, "
+          f"{len(manifest) - len(changed)} unchanged.")
+    for kind in ('html', 'css', 'js'):
+        entries = [e['stats'] for rel, e in manifest.items() if rel.endswith('.' + kind)]
+        if not entries:
+            continue
+        original = sum(s['original'] for s in entries)
+        minified = sum(s['minified'] for s in entries)
+        line = f"  {kind:<5} {len(entries):>4} files  {original / 1024:8.1f} KB -> {minified / 1024:8.1f} KB minified"
+        for encoding in ('br', 'gz'):
+            sizes = [s[encoding] if s[encoding] else s['minified'] for s in entries]
+            if any(s[encoding] for s in entries):
+                line += f" / {sum(sizes) / 1024:.1f} KB {encoding}"
+        print(line)
+    if brotli is None:
+        print("  Note: brotli not installed (pip install brotli), only .gz siblings written.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Minify and precompress the built site into dist/")
+    parser.add_argument('--dist', default=DIST_DIR, help=f"Output directory (default: {DIST_DIR})")
+    parser.add_argument('--force', action='store_true', help="Reprocess every file")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if os.path.abspath(args.dist) == os.path.abspath('.'):
+        sys.exit("Refusing to write into the source tree; choose another --dist")
+    print_summary(*run('.', args.dist, force=args.force, workers=args.workers))
@@ -0,0 +1,20 @@
+"""
+Page type of a built page, from its path alone.
+
+Shared by the build (critical_css.py: one critical stylesheet per type),
+serve.py (benchmark groups) and the auditor (audit_rules.py: per-type
+budgets), without pulling in either side's dependencies.
+"""
+import os
+
+
+def template_of(path):
+    """'index.html' -> 'home', 'blog/index.html' -> 'blog-index', 'blog/x.html' -> 'post', else 'page'"""
+    path = path.replace(os.sep, '/')
+    if path == 'index.html':
+        return 'home'
+    if path == 'blog/index.html':
+        return 'blog-index'
+    if path.startswith('blog/'):
+        return 'post'
+    return 'page'
@@ -0,0 +1,97 @@
+import os
+import re
+import json
+import hashlib
+import unicodedata
+from collections import defaultdict
+
+SEARCH_DIR = os.path.join('assets', 'search')
+SHARD_COUNT = 32 # Terms are bucketed by their first character, so one query term = one shard
+FIELD_WEIGHTS = {'title': 4, 'headings': 2, 'description': 1}
+
+TERM_RE = re.compile(r'[\u4e00-\u9fa5]+|[a-z0-9]+')
+
+
+def tokenize(text):
+    """Chinese runs become character bigrams (single characters stay as-is); Latin/digit runs stay whole words"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    terms = []
+    for run in TERM_RE.findall(text):
+        if run[0] >= '\u4e00' and len(run) > 1:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.append(run)
+    return terms
+
+
+def shard_of(term):
+    """Must match shardOf() in assets/search.js"""
+    return format(ord(term[0]) % SHARD_COUNT, '02x')
+
+
+class SearchIndexBuilder:
+    """
+    Collects title / description / headings for every post while build.py
+    already has the page parsed, then writes a static, sharded index:
+
+        assets/search/docs.json   {"v": hash, "shards": N, "docs": [[url, title, description], ...]}
+        assets/search/<xx>.json   {term: [doc_id, weight, doc_id, weight, ...], ...}
+
+    The browser fetches docs.json once and then only the shards its query
+    terms fall into.
+    """
+
+    def __init__(self):
+        self.docs = []
+        self.postings = defaultdict(lambda: defaultdict(int)) # term -> {doc_id: weight}
+
+    def add(self, url, title, description='', headings=()):
+        doc_id = len(self.docs)
+        self.docs.append([url, title, description])
+        fields = {'title': title, 'description': description, 'headings': ' '.join(headings)}
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text or ''):
+                self.postings[term][doc_id] += weight
+        return doc_id
+
+    def _shards(self):
+        shards = defaultdict(dict)
+        for term in sorted(self.postings):
+            flat = []
+            for doc_id, weight in sorted(self.postings[term].items()):
+                flat.extend((doc_id, weight))
+            shards[shard_of(term)][term] = flat
+        return {name: json.dumps(terms, ensure_ascii=False, separators=(',', ':'))
+                for name, terms in shards.items()}
+
+    def write(self, out_dir=SEARCH_DIR):
+        """
+        Write the index. Files whose content did not change are left untouched
+        (stable mtimes for later build steps); shards that no longer exist are removed.
+        Returns (files_written, total_bytes, largest_shard_bytes).
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        shards = self._shards()
+        version = hashlib.sha1(''.join(shards[name] for name in sorted(shards)).encode('utf-8')).hexdigest()[:10]
+        files = {f"{name}.json": body for name, body in shards.items()}
+        files['docs.json'] = json.dumps({'v': version, 'shards': SHARD_COUNT, 'docs': self.docs},
+                                        ensure_ascii=False, separators=(',', ':'))
+
+        written = 0
+        for filename, body in files.items():
+            path = os.path.join(out_dir, filename)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    if f.read() == body:
+                        continue
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(body)
+            written += 1
+
+        for filename in os.listdir(out_dir):
+            if filename.endswith('.json') and filename not in files:
+                os.remove(os.path.join(out_dir, filename))
+
+        sizes = [len(body.encode('utf-8')) for name, body in files.items() if name != 'docs.json']
+        return written, sum(len(body.encode('utf-8')) for body in files.values()), max(sizes, default=0)
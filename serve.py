@@ -0,0 +1,469 @@
+"""
+Local static server with production (Cloudflare Pages) semantics.
+
+- Clean URLs: /about serves about.html, /blog/ serves blog/index.html;
+  /about.html, /blog/index and /blog are 308-redirected to the canonical form
+- _redirects (exact paths and trailing-* splats) and _headers (including
+  `! Header` detaches) are applied like the host does
+- Precompressed .br/.gz siblings (optimize.py) are served when the client accepts them
+- The route table is built from the file tree once at startup; file bodies
+  go out with sendfile(), responses carry ETag and honour If-None-Match
+
+Usage:
+    python serve.py                          # dist/ if it exists, else the repo root, on :8000
+    python serve.py --root . --port 8080 --workers 4
+    python serve.py --bench                  # starts a server, reports req/s and p99 per page type
+    python serve.py --bench --url http://127.0.0.1:8080 --concurrency 128 --duration 20
+
+From Python (audit.py, tests):
+    with serve_in_background('dist') as base_url:
+        requests.get(base_url + '/blog/')
+"""
+import os
+import re
+import sys
+import time
+import socket
+import random
+import asyncio
+import argparse
+import mimetypes
+import threading
+import contextlib
+import subprocess
+from email.utils import formatdate
+from urllib.parse import unquote, urlsplit
+
+from optimize import iter_site_files, CONTENT_TYPES, ENCODINGS, DIST_DIR
+from page_types import template_of
+
+# ================= Configuration =================
+HOST = "127.0.0.1"
+PORT = 8000
+KEEPALIVE_TIMEOUT = 15 # Seconds an idle keep-alive connection is kept open
+MAX_HEADER_LINES = 100
+HOST_FILES = {'_headers', '_redirects'} # Read by the host, never served
+REDIRECT_STATUS = 308 # Cloudflare Pages uses 308 for its own clean-URL redirects
+REASONS = {200: 'OK', 301: 'Moved Permanently', 302: 'Found', 303: 'See Other', 304: 'Not Modified',
+           307: 'Temporary Redirect', 308: 'Permanent Redirect', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed'}
+
+
+# ================= Route Table =================
+class Site:
+    """Everything a request needs, resolved once: routes, redirects, header rules"""
+
+    def __init__(self, root):
+        self.root = root
+        self.routes = {}    # URL path -> {'path', 'type', 'size', 'etag', 'encodings': {encoding: (path, size)}, 'page'}
+        self.redirects = {} # URL path -> (location, status)
+        self.splats = []    # (prefix, location, status) for "/from/* /to/:splat"
+        self.header_rules = []
+        self._scan()
+        self._load_redirects()
+        self._load_headers()
+
+    def _entry(self, rel):
+        path = os.path.join(self.root, rel)
+        stat = os.stat(path)
+        ext = os.path.splitext(rel)[1].lower()
+        content_type = CONTENT_TYPES.get(ext) or mimetypes.guess_type(rel)[0] or 'application/octet-stream'
+        encodings = {}
+        for suffix, encoding in ENCODINGS:
+            if os.path.exists(path + suffix):
+                encodings[encoding] = (path + suffix, os.path.getsize(path + suffix))
+        return {'path': path, 'type': content_type, 'size': stat.st_size, 'encodings': encodings,
+                'etag': f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', 'page': None}
+
+    def _scan(self):
+        skip = [] if os.path.abspath(self.root).endswith(os.sep + DIST_DIR) else [os.path.join(self.root, DIST_DIR)]
+        for rel in iter_site_files(self.root, skip):
+            if rel in HOST_FILES or any(rel.endswith(suffix) for suffix, _ in ENCODINGS):
+                continue
+            entry = self._entry(rel)
+            if not rel.endswith('.html'):
+                self.routes['/' + rel] = entry
+                continue
+            entry['page'] = template_of(rel)
+            if rel == 'index.html' or rel.endswith('/index.html'):
+                url = '/' + rel[:-len('index.html')]
+                self.routes[url] = entry
+                for alias in (url + 'index.html', url + 'index', url.rstrip('/')):
+                    if alias and alias != url:
+                        self.redirects.setdefault(alias, (url, REDIRECT_STATUS))
+            else:
+                url = '/' + rel[:-len('.html')]
+                self.routes[url] = entry
+                self.redirects.setdefault(url + '.html', (url, REDIRECT_STATUS))
+                self.redirects.setdefault(url + '/', (url, REDIRECT_STATUS))
+        self.not_found = self.routes.get('/404')
+
+    def _load_redirects(self):
+        path = os.path.join(self.root, '_redirects')
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split('#', 1)[0].split()
+                if len(parts) < 2:
+                    continue
+                source, target = parts[0], parts[1]
+                status = int(parts[2]) if len(parts) > 2 else 302
+                if source.endswith('*'):
+                    self.splats.append((source[:-1], target, status))
+                else:
+                    # _redirects wins over files and the clean-URL aliases
+                    self.redirects[source] = (target, status)
+
+    def _load_headers(self):
+        path = os.path.join(self.root, '_headers')
+        if not os.path.exists(path):
+            return
+        rule = None
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                if not line[0].isspace():
+                    pattern = '^' + re.sub(r'\\\*', '.*', re.sub(r'\\?:\w+', '[^/]+', re.escape(line.strip()))) + '$'
+                    rule = {'re': re.compile(pattern), 'headers': [], 'detach': set()}
+                    self.header_rules.append(rule)
+                elif rule is not None:
+                    text = line.strip()
+                    if text.startswith('!'):
+                        rule['detach'].add(text[1:].strip().lower())
+                    elif ':' in text:
+                        name, value = text.split(':', 1)
+                        rule['headers'].append((name.strip(), value.strip()))
+
+    def headers_for(self, url):
+        """Merged headers of every matching rule; a `! Name` removes Name set by the other rules"""
+        matching = [rule for rule in self.header_rules if rule['re'].match(url)]
+        merged = {}
+        for rule in matching:
+            detached = set().union(*(other['detach'] for other in matching if other is not rule))
+            for name, value in rule['headers']:
+                if name.lower() in detached:
+                    continue
+                key = name.lower()
+                merged[key] = (name, f"{merged[key][1]}, {value}" if key in merged else value)
+        return list(merged.values())
+
+    def redirect_for(self, url):
+        if url in self.redirects:
+            return self.redirects[url]
+        for prefix, target, status in self.splats:
+            if url.startswith(prefix):
+                return target.replace(':splat', url[len(prefix):]), status
+        return None
+
+
+# ================= Server =================
+class Server:
+    def __init__(self, site, quiet=False):
+        self.site = site
+        self.quiet = quiet
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                request_headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    request_headers[name.strip().lower()] = value.strip()
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    await self.respond(writer, 400, [], b'Bad Request\n', 'GET', '-')
+                    break
+                method, target, version = parts
+                keep_alive = (version == 'HTTP/1.1' and request_headers.get('connection', '').lower() != 'close'
+                              or request_headers.get('connection', '').lower() == 'keep-alive')
+                await self.dispatch(writer, method, target, request_headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, writer, method, target, request_headers, keep_alive):
+        url = unquote(urlsplit(target).path) or '/'
+        connection = [('Connection', 'keep-alive' if keep_alive else 'close')]
+        if method not in ('GET', 'HEAD'):
+            await self.respond(writer, 405, connection + [('Allow', 'GET, HEAD')], b'', method, url)
+            return
+
+        redirect = self.site.redirect_for(url)
+        if redirect:
+            location, status = redirect
+            query = urlsplit(target).query
+            if query and '?' not in location:
+                location += '?' + query
+            headers = connection + [('Location', location)] + self.site.headers_for(url)
+            await self.respond(writer, status, headers, b'', method, url)
+            return
+
+        entry = self.site.routes.get(url)
+        status = 200
+        if entry is None:
+            entry, status = self.site.not_found, 404
+            if entry is None:
+                await self.respond(writer, 404, connection + [('Content-Type', 'text/plain; charset=utf-8')],
+                                   b'Not Found\n', method, url)
+                return
+
+        headers = connection + [('Content-Type', entry['type']), ('ETag', entry['etag'])]
+        if entry['encodings']:
+            headers.append(('Vary', 'Accept-Encoding'))
+        headers += self.site.headers_for(url)
+        if status == 200 and request_headers.get('if-none-match') == entry['etag']:
+            await self.respond(writer, 304, headers, b'', method, url)
+            return
+
+        path, size = entry['path'], entry['size']
+        accepted = {token.split(';')[0].strip() for token in request_headers.get('accept-encoding', '').split(',')}
+        for _, encoding in ENCODINGS:
+            if encoding in accepted and encoding in entry['encodings']:
+                path, size = entry['encodings'][encoding]
+                headers.append(('Content-Encoding', encoding))
+                break
+        await self.respond(writer, status, headers, None, method, url, path, size)
+
+    async def respond(self, writer, status, headers, body, method, url, path=None, size=None):
+        length = size if path else len(body)
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Date: {formatdate(usegmt=True)}",
+                "Server: tgmai-serve", f"Content-Length: {length if status != 304 else 0}"]
+        head += [f"{name}: {value}" for name, value in headers]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1', 'replace'))
+        if method != 'HEAD' and status != 304:
+            if path:
+                await writer.drain()
+                with open(path, 'rb') as f:
+                    await asyncio.get_running_loop().sendfile(writer.transport, f, 0, size)
+            else:
+                writer.write(body)
+        await writer.drain()
+        if not self.quiet:
+            print(f"{status} {method} {url}")
+
+
+async def serve(root, host=HOST, port=PORT, quiet=False, reuse_port=False, ready=None):
+    site = Site(root)
+    server = await asyncio.start_server(Server(site, quiet).handle, host, port, reuse_port=reuse_port or None,
+                                        backlog=1024)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+def _worker(root, host, port, quiet):
+    import signal
+    signal.signal(signal.SIGTERM, signal.SIG_DFL) # Not the parent's handler: terminate() must stop the worker
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(root, host, port, quiet, reuse_port=True))
+
+
+def run_workers(root, host, port, workers, quiet):
+    """N processes accepting on the same port (SO_REUSEPORT)"""
+    import signal
+    import multiprocessing
+    # Exit normally on SIGTERM too, so multiprocessing terminates the (daemon) workers
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    processes = [multiprocessing.Process(target=_worker, args=(root, host, port, quiet), daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+@contextlib.contextmanager
+def serve_in_background(root=None, host=HOST, port=0):
+    """Run the server in a daemon thread for the duration of the block; yields the base URL"""
+    root = root or default_root()
+    started = threading.Event()
+    state = {}
+
+    def ready(bound_port):
+        state['port'] = bound_port
+        started.set()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        state['loop'] = loop
+        try:
+            loop.run_until_complete(serve(root, host, port, quiet=True, ready=ready))
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    if not started.wait(30):
+        raise RuntimeError("serve.py: server did not start")
+    try:
+        yield f"http://{host}:{state['port']}"
+    finally:
+        loop = state['loop']
+        loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(loop)])
+        thread.join(5)
+
+
+def default_root():
+    return DIST_DIR if os.path.isdir(DIST_DIR) else '.'
+
+
+# ================= Benchmark =================
+def bench_targets(site):
+    """{page type: [URL paths]} - every page, the hashed assets, and the redirects"""
+    targets = {}
+    for url, entry in site.routes.items():
+        if entry['page']:
+            targets.setdefault(entry['page'], []).append(url)
+        elif url.startswith('/assets/') and os.path.splitext(url)[1] in ('.css', '.js', '.svg'):
+            targets.setdefault('asset', []).append(url)
+    redirects = [url for url, (_, status) in site.redirects.items() if status != REDIRECT_STATUS]
+    targets['redirect'] = redirects or [url for url in site.redirects][:20]
+    return {kind: urls for kind, urls in targets.items() if urls}
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length, close = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value.strip().lower() == 'close':
+            close = True
+    if length:
+        await reader.readexactly(length)
+    return status, close
+
+
+async def bench_worker(host, port, schedule, deadline, results):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        kind, urls = random.choice(schedule)
+        url = random.choice(urls)
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            request = (f"GET {url} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: br, gzip\r\n"
+                       f"User-Agent: serve.py-bench\r\n\r\n")
+            start = time.perf_counter()
+            writer.write(request.encode('utf-8'))
+            status, close = await read_response(reader)
+            results[kind]['latencies'].append(time.perf_counter() - start)
+            if status >= 400:
+                results[kind]['errors'] += 1
+            if close:
+                writer.close()
+                writer = None
+        except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+            results[kind]['errors'] += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_bench(base_url, targets, concurrency, duration):
+    parsed = urlsplit(base_url)
+    host, port = parsed.hostname, parsed.port or 80
+    # Every page type gets the same share of requests, whatever its number of URLs: pick a type, then one of its URLs
+    schedule = list(targets.items())
+    results = {kind: {'latencies': [], 'errors': 0} for kind in targets}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(bench_worker(host, port, schedule, deadline, results) for _ in range(concurrency)))
+    return results, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def print_bench(results, elapsed, concurrency):
+    total = sum(len(r['latencies']) for r in results.values())
+    print(f"\n{total} requests in {elapsed:.1f}s with {concurrency} connections: {total / elapsed:,.0f} req/s")
+    print(f"{'Type':<12} {'Requests':>9} {'Req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'Errors':>7}")
+    for kind, r in sorted(results.items()):
+        latencies = r['latencies']
+        print(f"{kind:<12} {len(latencies):>9} {len(latencies) / elapsed:>9,.0f} "
+              f"{percentile(latencies, 0.50) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f} {r['errors']:>7}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def bench(root, url, concurrency, duration, workers):
+    site = Site(root)
+    targets = bench_targets(site)
+    process = None
+    if url is None:
+        # Separate process, so the load generator does not share the server's event loop
+        port = free_port()
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--root', root, '--port', str(port),
+                                    '--workers', str(workers), '--quiet'])
+        url = f"http://{HOST}:{port}"
+        for _ in range(100):
+            with contextlib.suppress(OSError), socket.create_connection((HOST, port), timeout=0.1):
+                break
+            time.sleep(0.1)
+    print(f"Benchmarking {url} ({', '.join(f'{kind}: {len(urls)}' for kind, urls in sorted(targets.items()))} URLs)")
+    try:
+        results, elapsed = asyncio.run(run_bench(url, targets, concurrency, duration))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+    print_bench(results, elapsed, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the site locally with production routing and headers")
+    parser.add_argument('--root', default=None, help=f"Directory to serve (default: {DIST_DIR}/ if built, else .)")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--workers', type=int, default=1, help="Server processes sharing the port (SO_REUSEPORT)")
+    parser.add_argument('--quiet', action='store_true', help="No access log")
+    parser.add_argument('--bench', action='store_true', help="Run the load benchmark instead of serving")
+    parser.add_argument('--url', default=None, help="Benchmark an already running server instead of starting one")
+    parser.add_argument('--concurrency', type=int, default=64, help="Benchmark connections (default: 64)")
+    parser.add_argument('--duration', type=float, default=10, help="Benchmark seconds (default: 10)")
+    args = parser.parse_args()
+
+    root = args.root or default_root()
+    if args.bench:
+        bench(root, args.url, args.concurrency, args.duration, args.workers)
+    elif args.workers > 1:
+        print(f"Serving {root} on http://{args.host}:{args.port} ({args.workers} workers)")
+        run_workers(root, args.host, args.port, args.workers, args.quiet)
+    else:
+        print(f"Serving {root} on http://{args.host}:{args.port}")
+        try:
+            asyncio.run(serve(root, args.host, args.port, args.quiet))
+        except KeyboardInterrupt:
+            pass
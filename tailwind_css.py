@@ -0,0 +1,1057 @@
+"""
+Build-time replacement for the cdn.tailwindcss.com play runtime.
+
+Scans the built pages (plus build.py itself, for the class strings in
+CATEGORY_CONFIG and the card templates) for Tailwind class candidates and
+compiles only the ones in use into one static stylesheet:
+
+    assets/tailwind.<hash>.css
+
+Covers the Tailwind v3 default theme for the utilities and variants this
+site uses (no plugins - the play CDN was loaded without ?plugins=, so e.g.
+`prose` never produced CSS and still does not). Unknown candidates are
+ignored, exactly like the JIT compiler does.
+
+Candidate sets are cached per source file by content hash in
+.tailwind-cache.json, so unchanged pages are not rescanned.
+"""
+import os
+import re
+import glob
+import json
+import hashlib
+
+# ================= Configuration =================
+ASSETS_DIR = "assets"
+STYLESHEET_PREFIX = "tailwind."
+CACHE_FILE = ".tailwind-cache.json"
+COMPILER_VERSION = 1 # Bump when the generator changes so cached candidate sets are recomputed
+CDN_HOST = "cdn.tailwindcss.com"
+
+# ================= Theme (Tailwind v3 defaults) =================
+_SHADES = ('50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950')
+_PALETTE = {
+    'slate': 'f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617',
+    'gray': 'f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712',
+    'zinc': 'fafafa f4f4f5 e4e4e7 d4d4d8 a1a1aa 71717a 52525b 3f3f46 27272a 18181b 09090b',
+    'neutral': 'fafafa f5f5f5 e5e5e5 d4d4d4 a3a3a3 737373 525252 404040 262626 171717 0a0a0a',
+    'stone': 'fafaf9 f5f5f4 e7e5e4 d6d3d1 a8a29e 78716c 57534e 44403c 292524 1c1917 0c0a09',
+    'red': 'fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a',
+    'orange': 'fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407',
+    'amber': 'fffbeb fef3c7 fde68a fcd34d fbbf24 f59e0b d97706 b45309 92400e 78350f 451a03',
+    'yellow': 'fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12 422006',
+    'lime': 'f7fee7 ecfccb d9f99d bef264 a3e635 84cc16 65a30d 4d7c0f 3f6212 365314 1a2e05',
+    'green': 'f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16',
+    'emerald': 'ecfdf5 d1fae5 a7f3d0 6ee7b7 34d399 10b981 059669 047857 065f46 064e3b 022c22',
+    'teal': 'f0fdfa ccfbf1 99f6e4 5eead4 2dd4bf 14b8a6 0d9488 0f766e 115e59 134e4a 042f2e',
+    'cyan': 'ecfeff cffafe a5f3fc 67e8f9 22d3ee 06b6d4 0891b2 0e7490 155e75 164e63 083344',
+    'sky': 'f0f9ff e0f2fe bae6fd 7dd3fc 38bdf8 0ea5e9 0284c7 0369a1 075985 0c4a6e 082f49',
+    'blue': 'eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554',
+    'indigo': 'eef2ff e0e7ff c7d2fe a5b4fc 818cf8 6366f1 4f46e5 4338ca 3730a3 312e81 1e1b4b',
+    'violet': 'f5f3ff ede9fe ddd6fe c4b5fd a78bfa 8b5cf6 7c3aed 6d28d9 5b21b6 4c1d95 2e1065',
+    'purple': 'faf5ff f3e8ff e9d5ff d8b4fe c084fc a855f7 9333ea 7e22ce 6b21a8 581c87 3b0764',
+    'fuchsia': 'fdf4ff fae8ff f5d0fe f0abfc e879f9 d946ef c026d3 a21caf 86198f 701a75 4a044e',
+    'pink': 'fdf2f8 fce7f3 fbcfe8 f9a8d4 f472b6 ec4899 db2777 be185d 9d174d 831843 500724',
+    'rose': 'fff1f2 ffe4e6 fecdd3 fda4af fb7185 f43f5e e11d48 be123c 9f1239 881337 4c0519',
+}
+COLORS = {'black': '#000', 'white': '#fff'}
+for _family, _hexes in _PALETTE.items():
+    for _shade, _hex in zip(_SHADES, _hexes.split()):
+        COLORS[f"{_family}-{_shade}"] = '#' + _hex
+SPECIAL_COLORS = {'transparent': 'transparent', 'current': 'currentColor', 'inherit': 'inherit'}
+
+SPACING = {
+    '0': '0px', 'px': '1px', '0.5': '0.125rem', '1': '0.25rem', '1.5': '0.375rem', '2': '0.5rem',
+    '2.5': '0.625rem', '3': '0.75rem', '3.5': '0.875rem', '4': '1rem', '5': '1.25rem', '6': '1.5rem',
+    '7': '1.75rem', '8': '2rem', '9': '2.25rem', '10': '2.5rem', '11': '2.75rem', '12': '3rem',
+    '14': '3.5rem', '16': '4rem', '20': '5rem', '24': '6rem', '28': '7rem', '32': '8rem', '36': '9rem',
+    '40': '10rem', '44': '11rem', '48': '12rem', '52': '13rem', '56': '14rem', '60': '15rem',
+    '64': '16rem', '72': '18rem', '80': '20rem', '96': '24rem',
+}
+FRACTIONS = {f"{n}/{d}": f"{n / d * 100:.6f}".rstrip('0').rstrip('.') + '%'
+             for d in (2, 3, 4, 5, 6, 12) for n in range(1, d)}
+SCREENS = (('sm', '640px'), ('md', '768px'), ('lg', '1024px'), ('xl', '1280px'), ('2xl', '1536px'))
+
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+    '6xl': ('3.75rem', '1'), '7xl': ('4.5rem', '1'), '8xl': ('6rem', '1'), '9xl': ('8rem', '1'),
+}
+FONT_WEIGHTS = {'thin': '100', 'extralight': '200', 'light': '300', 'normal': '400', 'medium': '500',
+                'semibold': '600', 'bold': '700', 'extrabold': '800', 'black': '900'}
+FONT_FAMILIES = {
+    'sans': 'ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji"',
+    'serif': 'ui-serif, Georgia, Cambria, "Times New Roman", Times, serif',
+    'mono': 'ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace',
+}
+LINE_HEIGHTS = {'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5', 'relaxed': '1.625', 'loose': '2',
+                '3': '.75rem', '4': '1rem', '5': '1.25rem', '6': '1.5rem', '7': '1.75rem', '8': '2rem',
+                '9': '2.25rem', '10': '2.5rem'}
+LETTER_SPACING = {'tighter': '-0.05em', 'tight': '-0.025em', 'normal': '0em', 'wide': '0.025em',
+                  'wider': '0.05em', 'widest': '0.1em'}
+RADIUS = {'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem', 'xl': '0.75rem',
+          '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px'}
+MAX_WIDTHS = {'none': 'none', '0': '0rem', 'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem',
+              'xl': '36rem', '2xl': '42rem', '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem',
+              '7xl': '80rem', 'full': '100%', 'min': 'min-content', 'max': 'max-content',
+              'fit': 'fit-content', 'prose': '65ch', **{f"screen-{k}": v for k, v in SCREENS}}
+SHADOWS = {
+    'sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '': '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+    'md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'xl': '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+    '2xl': '0 25px 50px -12px rgb(0 0 0 / 0.25)',
+    'inner': 'inset 0 2px 4px 0 rgb(0 0 0 / 0.05)',
+    'none': '0 0 #0000',
+}
+DROP_SHADOWS = {
+    'sm': 'drop-shadow(0 1px 1px rgb(0 0 0 / 0.05))',
+    '': 'drop-shadow(0 1px 2px rgb(0 0 0 / 0.1)) drop-shadow(0 1px 1px rgb(0 0 0 / 0.06))',
+    'md': 'drop-shadow(0 4px 3px rgb(0 0 0 / 0.07)) drop-shadow(0 2px 2px rgb(0 0 0 / 0.06))',
+    'lg': 'drop-shadow(0 10px 8px rgb(0 0 0 / 0.04)) drop-shadow(0 4px 3px rgb(0 0 0 / 0.1))',
+    'xl': 'drop-shadow(0 20px 13px rgb(0 0 0 / 0.03)) drop-shadow(0 8px 5px rgb(0 0 0 / 0.08))',
+    '2xl': 'drop-shadow(0 25px 25px rgb(0 0 0 / 0.15))',
+    'none': 'drop-shadow(0 0 #0000)',
+}
+BLURS = {'none': '0', 'sm': '4px', '': '8px', 'md': '12px', 'lg': '16px', 'xl': '24px', '2xl': '40px', '3xl': '64px'}
+OPACITIES = {str(n): _v for n, _v in ((n, f"{n / 100:g}") for n in range(0, 101, 5))}
+SCALES = {k: v for k, v in (('0', '0'), ('50', '.5'), ('75', '.75'), ('90', '.9'), ('95', '.95'), ('100', '1'),
+                            ('105', '1.05'), ('110', '1.1'), ('125', '1.25'), ('150', '1.5'))}
+ROTATES = {k: f"{k}deg" for k in ('0', '1', '2', '3', '6', '12', '45', '90', '180')}
+FILTER_PERCENT = ('0', '50', '75', '90', '95', '100', '105', '110', '125', '150', '200')
+DURATIONS = ('0', '75', '100', '150', '200', '300', '500', '700', '1000')
+EASINGS = {'linear': 'linear', 'in': 'cubic-bezier(0.4, 0, 1, 1)', 'out': 'cubic-bezier(0, 0, 0.2, 1)',
+           'in-out': 'cubic-bezier(0.4, 0, 0.2, 1)'}
+ANIMATIONS = {
+    'none': ('none', None),
+    'spin': ('spin 1s linear infinite', '@keyframes spin{to{transform:rotate(360deg)}}'),
+    'ping': ('ping 1s cubic-bezier(0, 0, 0.2, 1) infinite',
+             '@keyframes ping{75%,100%{transform:scale(2);opacity:0}}'),
+    'pulse': ('pulse 2s cubic-bezier(0.4, 0, 0.6, 1) infinite', '@keyframes pulse{50%{opacity:.5}}'),
+    'bounce': ('bounce 1s infinite',
+               '@keyframes bounce{0%,100%{transform:translateY(-25%);animation-timing-function:cubic-bezier(0.8,0,1,1)}'
+               '50%{transform:none;animation-timing-function:cubic-bezier(0,0,0.2,1)}}'),
+}
+
+TRANSFORM = ('transform:translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) '
+             'skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))')
+FILTER = ('filter:var(--tw-blur) var(--tw-brightness) var(--tw-contrast) var(--tw-grayscale) var(--tw-hue-rotate) '
+          'var(--tw-invert) var(--tw-saturate) var(--tw-sepia) var(--tw-drop-shadow)')
+_BACKDROP = ('var(--tw-backdrop-blur) var(--tw-backdrop-brightness) var(--tw-backdrop-contrast) '
+             'var(--tw-backdrop-grayscale) var(--tw-backdrop-hue-rotate) var(--tw-backdrop-invert) '
+             'var(--tw-backdrop-opacity) var(--tw-backdrop-saturate) var(--tw-backdrop-sepia)')
+BACKDROP_FILTER = f"-webkit-backdrop-filter:{_BACKDROP};backdrop-filter:{_BACKDROP}"
+BOX_SHADOW = 'box-shadow:var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)'
+TRANSITION_DEFAULTS = 'transition-timing-function:cubic-bezier(0.4, 0, 0.2, 1);transition-duration:150ms'
+
+# Preflight + the per-element variable defaults the play CDN injects before any utility
+PREFLIGHT = """*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+::before,::after{--tw-content:''}
+html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji";font-feature-settings:normal;font-variation-settings:normal;-webkit-tap-highlight-color:transparent}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+abbr:where([title]){-webkit-text-decoration:underline dotted;text-decoration:underline dotted}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace;font-feature-settings:normal;font-variation-settings:normal;font-size:1em}
+small{font-size:80%}
+sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}
+sub{bottom:-0.25em}
+sup{top:-0.5em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,input:where([type='button']),input:where([type='reset']),input:where([type='submit']){-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+:-moz-ui-invalid{box-shadow:none}
+progress{vertical-align:baseline}
+::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}
+[type='search']{-webkit-appearance:textfield;outline-offset:-2px}
+::-webkit-search-decoration{-webkit-appearance:none}
+::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+dialog{padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]:where(:not([hidden="until-found"])){display:none}
+*,::before,::after,::backdrop{--tw-border-spacing-x:0;--tw-border-spacing-y:0;--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-skew-x:0;--tw-skew-y:0;--tw-scale-x:1;--tw-scale-y:1;--tw-pan-x: ;--tw-pan-y: ;--tw-pinch-zoom: ;--tw-scroll-snap-strictness:proximity;--tw-gradient-from-position: ;--tw-gradient-via-position: ;--tw-gradient-to-position: ;--tw-ordinal: ;--tw-slashed-zero: ;--tw-numeric-figure: ;--tw-numeric-spacing: ;--tw-numeric-fraction: ;--tw-ring-inset: ;--tw-ring-offset-width:0px;--tw-ring-offset-color:#fff;--tw-ring-color:rgb(59 130 246 / 0.5);--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;--tw-shadow-colored:0 0 #0000;--tw-blur: ;--tw-brightness: ;--tw-contrast: ;--tw-grayscale: ;--tw-hue-rotate: ;--tw-invert: ;--tw-saturate: ;--tw-sepia: ;--tw-drop-shadow: ;--tw-backdrop-blur: ;--tw-backdrop-brightness: ;--tw-backdrop-contrast: ;--tw-backdrop-grayscale: ;--tw-backdrop-hue-rotate: ;--tw-backdrop-invert: ;--tw-backdrop-opacity: ;--tw-backdrop-saturate: ;--tw-backdrop-sepia: ;--tw-contain-size: ;--tw-contain-layout: ;--tw-contain-paint: ;--tw-contain-style: }
+"""
+
+# ================= Utilities =================
+# Plugin order = cascade order between utilities (same as Tailwind's corePlugins order),
+# so e.g. `p-4 pt-2` and `border border-b` resolve the same way they did with the CDN.
+PLUGIN_ORDER = [
+    'accessibility', 'pointerEvents', 'visibility', 'position', 'inset', 'inset-axis', 'inset-side',
+    'isolation', 'zIndex', 'order', 'gridColumn', 'gridRow', 'float', 'margin', 'margin-axis', 'margin-side',
+    'boxSizing', 'lineClamp', 'display', 'aspectRatio', 'size', 'height', 'maxHeight', 'minHeight', 'width',
+    'minWidth', 'maxWidth', 'flex', 'flexShrink', 'flexGrow', 'borderCollapse', 'transformOrigin',
+    'translate', 'rotate', 'scale', 'transform', 'animation', 'cursor', 'userSelect', 'scrollMargin',
+    'scrollPadding', 'listStylePosition', 'listStyleType', 'appearance', 'gridTemplateColumns',
+    'gridTemplateRows', 'flexDirection', 'flexWrap', 'alignContent', 'alignItems', 'justifyContent', 'gap',
+    'space', 'alignSelf', 'overflow', 'scrollBehavior', 'textOverflow', 'whitespace', 'wordBreak',
+    'borderRadius', 'borderRadius-side', 'borderRadius-corner', 'borderWidth', 'borderWidth-axis',
+    'borderWidth-side', 'borderStyle', 'borderColor', 'borderColor-side', 'borderOpacity',
+    'backgroundColor', 'backgroundOpacity', 'backgroundImage', 'gradientColorStops', 'backgroundSize',
+    'backgroundClip', 'backgroundPosition', 'backgroundRepeat', 'objectFit', 'padding', 'padding-axis',
+    'padding-side', 'textAlign', 'verticalAlign', 'fontFamily', 'fontSize', 'fontWeight', 'textTransform',
+    'fontStyle', 'lineHeight', 'letterSpacing', 'textColor', 'textOpacity', 'textDecoration', 'fontSmoothing',
+    'opacity', 'boxShadow', 'boxShadowColor', 'outlineStyle', 'ringWidth', 'ringColor', 'ringOpacity',
+    'blur', 'brightness', 'dropShadow', 'grayscale', 'invert', 'filter', 'backdropBlur', 'backdropFilter',
+    'transitionProperty', 'transitionDelay', 'transitionDuration', 'transitionTimingFunction', 'willChange',
+]
+PLUGIN_INDEX = {name: i for i, name in enumerate(PLUGIN_ORDER)}
+
+_TRANSITION_COLORS = 'color, background-color, border-color, text-decoration-color, fill, stroke'
+STATIC = {
+    'sr-only': ('accessibility', 'position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;'
+                                 'clip:rect(0, 0, 0, 0);white-space:nowrap;border-width:0'),
+    'not-sr-only': ('accessibility', 'position:static;width:auto;height:auto;padding:0;margin:0;overflow:visible;'
+                                     'clip:auto;white-space:normal'),
+    'pointer-events-none': ('pointerEvents', 'pointer-events:none'),
+    'pointer-events-auto': ('pointerEvents', 'pointer-events:auto'),
+    'visible': ('visibility', 'visibility:visible'),
+    'invisible': ('visibility', 'visibility:hidden'),
+    'collapse': ('visibility', 'visibility:collapse'),
+    'isolate': ('isolation', 'isolation:isolate'),
+    'box-border': ('boxSizing', 'box-sizing:border-box'),
+    'box-content': ('boxSizing', 'box-sizing:content-box'),
+    'line-clamp-none': ('lineClamp', 'overflow:visible;display:block;-webkit-box-orient:horizontal;-webkit-line-clamp:none'),
+    'hidden': ('display', 'display:none'),
+    'aspect-auto': ('aspectRatio', 'aspect-ratio:auto'),
+    'aspect-square': ('aspectRatio', 'aspect-ratio:1 / 1'),
+    'aspect-video': ('aspectRatio', 'aspect-ratio:16 / 9'),
+    'flex-1': ('flex', 'flex:1 1 0%'),
+    'flex-auto': ('flex', 'flex:1 1 auto'),
+    'flex-initial': ('flex', 'flex:0 1 auto'),
+    'flex-none': ('flex', 'flex:none'),
+    'flex-shrink': ('flexShrink', 'flex-shrink:1'),
+    'flex-shrink-0': ('flexShrink', 'flex-shrink:0'),
+    'shrink': ('flexShrink', 'flex-shrink:1'),
+    'shrink-0': ('flexShrink', 'flex-shrink:0'),
+    'flex-grow': ('flexGrow', 'flex-grow:1'),
+    'flex-grow-0': ('flexGrow', 'flex-grow:0'),
+    'grow': ('flexGrow', 'flex-grow:1'),
+    'grow-0': ('flexGrow', 'flex-grow:0'),
+    'border-collapse': ('borderCollapse', 'border-collapse:collapse'),
+    'border-separate': ('borderCollapse', 'border-collapse:separate'),
+    'transform': ('transform', TRANSFORM),
+    'transform-none': ('transform', 'transform:none'),
+    'select-none': ('userSelect', '-webkit-user-select:none;user-select:none'),
+    'select-text': ('userSelect', '-webkit-user-select:text;user-select:text'),
+    'select-all': ('userSelect', '-webkit-user-select:all;user-select:all'),
+    'select-auto': ('userSelect', '-webkit-user-select:auto;user-select:auto'),
+    'list-inside': ('listStylePosition', 'list-style-position:inside'),
+    'list-outside': ('listStylePosition', 'list-style-position:outside'),
+    'list-none': ('listStyleType', 'list-style-type:none'),
+    'list-disc': ('listStyleType', 'list-style-type:disc'),
+    'list-decimal': ('listStyleType', 'list-style-type:decimal'),
+    'appearance-none': ('appearance', '-webkit-appearance:none;-moz-appearance:none;appearance:none'),
+    'flex-row': ('flexDirection', 'flex-direction:row'),
+    'flex-row-reverse': ('flexDirection', 'flex-direction:row-reverse'),
+    'flex-col': ('flexDirection', 'flex-direction:column'),
+    'flex-col-reverse': ('flexDirection', 'flex-direction:column-reverse'),
+    'flex-wrap': ('flexWrap', 'flex-wrap:wrap'),
+    'flex-wrap-reverse': ('flexWrap', 'flex-wrap:wrap-reverse'),
+    'flex-nowrap': ('flexWrap', 'flex-wrap:nowrap'),
+    'scroll-auto': ('scrollBehavior', 'scroll-behavior:auto'),
+    'scroll-smooth': ('scrollBehavior', 'scroll-behavior:smooth'),
+    'truncate': ('textOverflow', 'overflow:hidden;text-overflow:ellipsis;white-space:nowrap'),
+    'text-ellipsis': ('textOverflow', 'text-overflow:ellipsis'),
+    'text-clip': ('textOverflow', 'text-overflow:clip'),
+    'break-normal': ('wordBreak', 'overflow-wrap:normal;word-break:normal'),
+    'break-words': ('wordBreak', 'overflow-wrap:break-word'),
+    'break-all': ('wordBreak', 'word-break:break-all'),
+    'break-keep': ('wordBreak', 'word-break:keep-all'),
+    'bg-clip-border': ('backgroundClip', 'background-clip:border-box'),
+    'bg-clip-padding': ('backgroundClip', 'background-clip:padding-box'),
+    'bg-clip-content': ('backgroundClip', 'background-clip:content-box'),
+    'bg-clip-text': ('backgroundClip', '-webkit-background-clip:text;background-clip:text'),
+    'bg-auto': ('backgroundSize', 'background-size:auto'),
+    'bg-cover': ('backgroundSize', 'background-size:cover'),
+    'bg-contain': ('backgroundSize', 'background-size:contain'),
+    'bg-center': ('backgroundPosition', 'background-position:center'),
+    'bg-top': ('backgroundPosition', 'background-position:top'),
+    'bg-bottom': ('backgroundPosition', 'background-position:bottom'),
+    'bg-repeat': ('backgroundRepeat', 'background-repeat:repeat'),
+    'bg-no-repeat': ('backgroundRepeat', 'background-repeat:no-repeat'),
+    'bg-none': ('backgroundImage', 'background-image:none'),
+    'object-contain': ('objectFit', 'object-fit:contain'),
+    'object-cover': ('objectFit', 'object-fit:cover'),
+    'uppercase': ('textTransform', 'text-transform:uppercase'),
+    'lowercase': ('textTransform', 'text-transform:lowercase'),
+    'capitalize': ('textTransform', 'text-transform:capitalize'),
+    'normal-case': ('textTransform', 'text-transform:none'),
+    'italic': ('fontStyle', 'font-style:italic'),
+    'not-italic': ('fontStyle', 'font-style:normal'),
+    'underline': ('textDecoration', 'text-decoration-line:underline'),
+    'overline': ('textDecoration', 'text-decoration-line:overline'),
+    'line-through': ('textDecoration', 'text-decoration-line:line-through'),
+    'no-underline': ('textDecoration', 'text-decoration-line:none'),
+    'antialiased': ('fontSmoothing', '-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale'),
+    'subpixel-antialiased': ('fontSmoothing', '-webkit-font-smoothing:auto;-moz-osx-font-smoothing:auto'),
+    'outline-none': ('outlineStyle', 'outline:2px solid transparent;outline-offset:2px'),
+    'outline': ('outlineStyle', 'outline-style:solid'),
+    'ring-inset': ('ringWidth', '--tw-ring-inset:inset'),
+    'grayscale': ('grayscale', f"--tw-grayscale:grayscale(100%);{FILTER}"),
+    'grayscale-0': ('grayscale', f"--tw-grayscale:grayscale(0);{FILTER}"),
+    'invert': ('invert', f"--tw-invert:invert(100%);{FILTER}"),
+    'invert-0': ('invert', f"--tw-invert:invert(0);{FILTER}"),
+    'filter': ('filter', FILTER),
+    'filter-none': ('filter', 'filter:none'),
+    'backdrop-filter': ('backdropFilter', BACKDROP_FILTER),
+    'backdrop-filter-none': ('backdropFilter', '-webkit-backdrop-filter:none;backdrop-filter:none'),
+    'transition-none': ('transitionProperty', 'transition-property:none'),
+    'transition': ('transitionProperty', f"transition-property:{_TRANSITION_COLORS}, opacity, box-shadow, transform, "
+                                         f"filter, -webkit-backdrop-filter, backdrop-filter;{TRANSITION_DEFAULTS}"),
+    'transition-all': ('transitionProperty', f"transition-property:all;{TRANSITION_DEFAULTS}"),
+    'transition-colors': ('transitionProperty', f"transition-property:{_TRANSITION_COLORS};{TRANSITION_DEFAULTS}"),
+    'transition-opacity': ('transitionProperty', f"transition-property:opacity;{TRANSITION_DEFAULTS}"),
+    'transition-shadow': ('transitionProperty', f"transition-property:box-shadow;{TRANSITION_DEFAULTS}"),
+    'transition-transform': ('transitionProperty', f"transition-property:transform;{TRANSITION_DEFAULTS}"),
+    'will-change-transform': ('willChange', 'will-change:transform'),
+}
+for _name in ('static', 'fixed', 'absolute', 'relative', 'sticky'):
+    STATIC[_name] = ('position', f"position:{_name}")
+for _name in ('block', 'inline-block', 'inline', 'flex', 'inline-flex', 'table', 'inline-table', 'table-row',
+              'table-cell', 'flow-root', 'grid', 'inline-grid', 'contents', 'list-item'):
+    STATIC[_name] = ('display', f"display:{_name}")
+for _name in ('auto', 'default', 'pointer', 'wait', 'text', 'move', 'help', 'not-allowed', 'none', 'grab'):
+    STATIC[f"cursor-{_name}"] = ('cursor', f"cursor:{_name}")
+for _name in ('auto', 'hidden', 'clip', 'visible', 'scroll'):
+    STATIC[f"overflow-{_name}"] = ('overflow', f"overflow:{_name}")
+    STATIC[f"overflow-x-{_name}"] = ('overflow', f"overflow-x:{_name}")
+    STATIC[f"overflow-y-{_name}"] = ('overflow', f"overflow-y:{_name}")
+for _name in ('normal', 'nowrap', 'pre', 'pre-line', 'pre-wrap', 'break-spaces'):
+    STATIC[f"whitespace-{_name}"] = ('whitespace', f"white-space:{_name}")
+for _name, _value in (('start', 'flex-start'), ('end', 'flex-end'), ('center', 'center'),
+                      ('baseline', 'baseline'), ('stretch', 'stretch')):
+    STATIC[f"items-{_name}"] = ('alignItems', f"align-items:{_value}")
+    STATIC[f"self-{_name}"] = ('alignSelf', f"align-self:{_value}")
+STATIC['self-auto'] = ('alignSelf', 'align-self:auto')
+for _name, _value in (('normal', 'normal'), ('start', 'flex-start'), ('end', 'flex-end'), ('center', 'center'),
+                      ('between', 'space-between'), ('around', 'space-around'), ('evenly', 'space-evenly'),
+                      ('stretch', 'stretch')):
+    STATIC[f"justify-{_name}"] = ('justifyContent', f"justify-content:{_value}")
+    STATIC[f"content-{_name}"] = ('alignContent', f"align-content:{_value}")
+for _name in ('left', 'center', 'right', 'justify', 'start', 'end'):
+    STATIC[f"text-{_name}"] = ('textAlign', f"text-align:{_name}")
+for _name in ('baseline', 'top', 'middle', 'bottom', 'text-top', 'text-bottom'):
+    STATIC[f"align-{_name}"] = ('verticalAlign', f"vertical-align:{_name}")
+for _name in ('solid', 'dashed', 'dotted', 'double', 'hidden', 'none'):
+    STATIC[f"border-{_name}"] = ('borderStyle', f"border-style:{_name}")
+for _name in ('center', 'top', 'top-right', 'right', 'bottom-right', 'bottom', 'bottom-left', 'left', 'top-left'):
+    STATIC[f"origin-{_name}"] = ('transformOrigin', f"transform-origin:{_name.replace('-', ' ')}")
+for _name, _value in FONT_FAMILIES.items():
+    STATIC[f"font-{_name}"] = ('fontFamily', f"font-family:{_value}")
+for _name, _value in FONT_WEIGHTS.items():
+    STATIC[f"font-{_name}"] = ('fontWeight', f"font-weight:{_value}")
+for _name, _value in EASINGS.items():
+    STATIC[f"ease-{_name}"] = ('transitionTimingFunction', f"transition-timing-function:{_value}")
+
+_DIRECTIONS = {'t': 'top', 'tr': 'top right', 'r': 'right', 'br': 'bottom right', 'b': 'bottom',
+               'bl': 'bottom left', 'l': 'left', 'tl': 'top left'}
+for _short, _long in _DIRECTIONS.items():
+    STATIC[f"bg-gradient-to-{_short}"] = ('backgroundImage',
+                                         f"background-image:linear-gradient(to {_long}, var(--tw-gradient-stops))")
+
+# --- Value helpers ---
+
+def arbitrary(value):
+    """'[70%_30%]' -> '70% 30%'; None if value is not an arbitrary value"""
+    if len(value) > 2 and value[0] == '[' and value[-1] == ']':
+        inner = value[1:-1]
+        return re.sub(r'(?<!\\)_', ' ', inner).replace('\\_', '_')
+    return None
+
+
+def negate(value):
+    if value in ('0px', '0', 'auto'):
+        return value if value != 'auto' else None
+    return value[1:] if value.startswith('-') else f"-{value}"
+
+
+def spacing(value, extra=None, negative=False, fractions=False):
+    """Resolve a spacing-scale value (plus optional extra keys / fractions / arbitrary)"""
+    resolved = (extra or {}).get(value) or SPACING.get(value)
+    if resolved is None and fractions:
+        resolved = FRACTIONS.get(value)
+    if resolved is None:
+        resolved = arbitrary(value)
+    if resolved is None:
+        return None
+    return negate(resolved) if negative else resolved
+
+
+HEX_RE = re.compile(r'^#([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+
+
+def hex_to_rgb(value):
+    match = HEX_RE.match(value)
+    if not match:
+        return None
+    digits = match.group(1)
+    if len(digits) == 3:
+        digits = ''.join(c * 2 for c in digits)
+    return ' '.join(str(int(digits[i:i + 2], 16)) for i in (0, 2, 4))
+
+
+def looks_like_color(value):
+    return bool(HEX_RE.match(value)) or value.startswith(('rgb', 'hsl')) or value in COLORS
+
+
+def top_level_slash(value):
+    """Index of the last '/' outside [...] (the opacity modifier), or None"""
+    depth = 0
+    found = None
+    for i, ch in enumerate(value):
+        if ch == '[':
+            depth += 1
+        elif ch == ']':
+            depth -= 1
+        elif ch == '/' and depth == 0:
+            found = i
+    return found
+
+
+def parse_color(value):
+    """
+    'slate-800' / 'white/10' / '[#24A1DE]/20' / 'white/[0.02]' -> (color, alpha) or None.
+    alpha is None when no opacity modifier was given.
+    """
+    alpha = None
+    slash = top_level_slash(value)
+    if slash is not None:
+        value, modifier = value[:slash], value[slash + 1:]
+        alpha = arbitrary(modifier) or OPACITIES.get(modifier)
+        if alpha is None:
+            return None
+    if value in SPECIAL_COLORS:
+        return SPECIAL_COLORS[value], alpha
+    color = COLORS.get(value)
+    if color is None:
+        color = arbitrary(value)
+        if color is None or not looks_like_color(color):
+            return None
+    return color, alpha
+
+
+def color_value(color, alpha, opacity_var=None):
+    """
+    CSS value for a color in Tailwind v3's format: an explicit alpha becomes
+    rgb(r g b / a); otherwise an opacity variable is used when given.
+    Returns (prefix_declarations, value).
+    """
+    rgb = hex_to_rgb(color)
+    if rgb is None:
+        if alpha is not None and color == 'transparent':
+            return '', 'transparent'
+        return '', color
+    if alpha is not None:
+        return '', f"rgb({rgb} / {alpha})"
+    if opacity_var:
+        return f"{opacity_var}:1;", f"rgb({rgb} / var({opacity_var}))"
+    return '', color
+
+
+def color_decls(value, prop, opacity_var=None):
+    parsed = parse_color(value)
+    if parsed is None:
+        return None
+    prefix, css = color_value(*parsed, opacity_var=opacity_var)
+    props = prop if isinstance(prop, tuple) else (prop,)
+    return prefix + ';'.join(f"{p}:{css}" for p in props)
+
+
+def transparent_of(color, alpha):
+    """The fully transparent version of a gradient stop (what Tailwind fades towards)"""
+    rgb = hex_to_rgb(color)
+    return f"rgb({rgb} / 0)" if rgb else 'rgb(255 255 255 / 0)'
+
+
+SHADOW_COLOR_RE = re.compile(r'(rgba?\([^)]*\)|hsla?\([^)]*\)|#[0-9a-fA-F]{3,8})')
+
+
+def colored_shadow(shadow):
+    """'0 0 20px rgba(...)' -> '0 0 20px var(--tw-shadow-color)' for every layer"""
+    layers = re.split(r',(?![^(]*\))', shadow)
+    return ', '.join(SHADOW_COLOR_RE.sub('var(--tw-shadow-color)', layer.strip()) for layer in layers)
+
+# --- Functional utilities: prefix -> [(plugin, handler(value, negative) -> declarations or (declarations, suffix))] ---
+
+def _sides(props):
+    margin = props[0].startswith('margin')
+    def handler(value, negative):
+        if negative and not margin:
+            return None
+        s = spacing(value, {'auto': 'auto'} if margin else None, negative)
+        return None if s is None else ';'.join(f"{p}:{s}" for p in props)
+    return handler
+
+
+def _inset(props):
+    extra = {'auto': 'auto', 'full': '100%'}
+    return lambda v, neg: None if (s := spacing(v, extra, neg, fractions=True)) is None \
+        else ';'.join(f"{p}:{s}" for p in props)
+
+
+def _size(prop, extra):
+    return lambda v, neg: None if neg or (s := spacing(v, extra, fractions=True)) is None else f"{prop}:{s}"
+
+
+def _lookup(table, template, allow_arbitrary=True):
+    def handler(value, negative):
+        if negative:
+            return None
+        resolved = table.get(value)
+        if resolved is None and allow_arbitrary:
+            resolved = arbitrary(value)
+        return None if resolved is None else template.format(resolved)
+    return handler
+
+
+def _translate(axis):
+    def handler(value, negative):
+        s = spacing(value, {'full': '100%'}, negative, fractions=True)
+        return None if s is None else f"--tw-translate-{axis}:{s};{TRANSFORM}"
+    return handler
+
+
+def _scale(axes):
+    def handler(value, negative):
+        s = SCALES.get(value) or arbitrary(value)
+        if s is None:
+            return None
+        s = negate(s) if negative else s
+        return ';'.join(f"--tw-scale-{a}:{s}" for a in axes) + f";{TRANSFORM}"
+    return handler
+
+
+def _rotate(value, negative):
+    s = ROTATES.get(value) or arbitrary(value)
+    if s is None:
+        return None
+    return f"--tw-rotate:{negate(s) if negative else s};{TRANSFORM}"
+
+
+def _z_index(value, negative):
+    if value == 'auto' and not negative:
+        return 'z-index:auto'
+    if value.isdigit() or arbitrary(value):
+        s = arbitrary(value) or value
+        return f"z-index:{negate(s) if negative else s}"
+    return None
+
+
+def _span(prop):
+    def handler(value, negative):
+        if negative:
+            return None
+        if value == 'full':
+            return f"{prop}:1 / -1"
+        if value.isdigit() and 1 <= int(value) <= 12:
+            return f"{prop}:span {value} / span {value}"
+        return None
+    return handler
+
+
+def _template(prop):
+    def handler(value, negative):
+        if negative:
+            return None
+        if value == 'none':
+            return f"{prop}:none"
+        if value.isdigit() and 1 <= int(value) <= 12:
+            return f"{prop}:repeat({value}, minmax(0, 1fr))"
+        custom = arbitrary(value)
+        return None if custom is None else f"{prop}:{custom}"
+    return handler
+
+
+def _line_clamp(value, negative):
+    if negative or not value.isdigit():
+        return None
+    return f"overflow:hidden;display:-webkit-box;-webkit-box-orient:vertical;-webkit-line-clamp:{value}"
+
+
+def _space(axis):
+    def handler(value, negative):
+        s = spacing(value, None, negative)
+        if s is None:
+            return None
+        start, end = ('left', 'right') if axis == 'x' else ('top', 'bottom')
+        return (f"--tw-space-{axis}-reverse:0;margin-{end}:calc({s} * var(--tw-space-{axis}-reverse));"
+                f"margin-{start}:calc({s} * calc(1 - var(--tw-space-{axis}-reverse)))",
+                ' > :not([hidden]) ~ :not([hidden])')
+    return handler
+
+
+def _radius(props):
+    def handler(value, negative):
+        r = RADIUS.get(value) if value else RADIUS['']
+        if r is None:
+            r = arbitrary(value)
+        if negative or r is None:
+            return None
+        return ';'.join(f"{p}:{r}" for p in props)
+    return handler
+
+
+def _border_width(props):
+    def handler(value, negative):
+        if negative:
+            return None
+        if value.isdigit():
+            width = f"{value}px"
+        else:
+            width = arbitrary(value)
+            if width is None or looks_like_color(width):
+                return None
+        return ';'.join(f"{p}:{width}" for p in props)
+    return handler
+
+
+def _border_color(props):
+    return lambda v, neg: None if neg else color_decls(v, props, '--tw-border-opacity')
+
+
+def _font_size(value, negative):
+    if negative:
+        return None
+    if value in FONT_SIZES:
+        size, line_height = FONT_SIZES[value]
+        return f"font-size:{size};line-height:{line_height}"
+    custom = arbitrary(value)
+    if custom is None or looks_like_color(custom):
+        return None
+    return f"font-size:{custom}"
+
+
+def _opacity_scale(template):
+    def handler(value, negative):
+        s = OPACITIES.get(value) or arbitrary(value)
+        return None if negative or s is None else template.format(s)
+    return handler
+
+
+def _gradient_stop(position):
+    def handler(value, negative):
+        parsed = parse_color(value) if not negative else None
+        if parsed is None:
+            return None
+        _, css = color_value(*parsed)
+        fade = transparent_of(*parsed)
+        if position == 'from':
+            return (f"--tw-gradient-from:{css} var(--tw-gradient-from-position);"
+                    f"--tw-gradient-to:{fade} var(--tw-gradient-to-position);"
+                    "--tw-gradient-stops:var(--tw-gradient-from), var(--tw-gradient-to)")
+        if position == 'via':
+            return (f"--tw-gradient-to:{fade} var(--tw-gradient-to-position);"
+                    f"--tw-gradient-stops:var(--tw-gradient-from), {css} var(--tw-gradient-via-position), "
+                    "var(--tw-gradient-to)")
+        return f"--tw-gradient-to:{css} var(--tw-gradient-to-position)"
+    return handler
+
+
+def _shadow(value, negative):
+    if negative:
+        return None
+    shadow = SHADOWS.get(value)
+    if shadow is None:
+        shadow = arbitrary(value)
+        if shadow is None or looks_like_color(shadow):
+            return None
+    return f"--tw-shadow:{shadow};--tw-shadow-colored:{colored_shadow(shadow)};{BOX_SHADOW}"
+
+
+def _shadow_color(value, negative):
+    decls = None if negative else color_decls(value, '--tw-shadow-color')
+    return None if decls is None else f"{decls};--tw-shadow:var(--tw-shadow-colored)"
+
+
+def _ring_width(value, negative):
+    if negative:
+        return None
+    if value.isdigit():
+        width = f"{value}px"
+    else:
+        width = arbitrary(value)
+        if width is None or looks_like_color(width):
+            return None
+    return ("--tw-ring-offset-shadow:var(--tw-ring-inset) 0 0 0 var(--tw-ring-offset-width) var(--tw-ring-offset-color);"
+            f"--tw-ring-shadow:var(--tw-ring-inset) 0 0 0 calc({width} + var(--tw-ring-offset-width)) var(--tw-ring-color);"
+            "box-shadow:var(--tw-ring-offset-shadow), var(--tw-ring-shadow), var(--tw-shadow, 0 0 #0000)")
+
+
+def _blur(var, tail):
+    def handler(value, negative):
+        size = BLURS.get(value) or arbitrary(value)
+        return None if negative or size is None else f"{var}:blur({size});{tail}"
+    return handler
+
+
+def _filter_percent(var, function, tail):
+    def handler(value, negative):
+        if negative:
+            return None
+        amount = f"{int(value) / 100:g}" if value in FILTER_PERCENT else arbitrary(value)
+        return None if amount is None else f"{var}:{function}({amount});{tail}"
+    return handler
+
+
+def _drop_shadow(value, negative):
+    if negative:
+        return None
+    shadow = DROP_SHADOWS.get(value)
+    if shadow is None:
+        custom = arbitrary(value)
+        if custom is None:
+            return None
+        shadow = ' '.join(f"drop-shadow({layer.strip()})" for layer in re.split(r',(?![^(]*\))', custom))
+    return f"--tw-drop-shadow:{shadow};{FILTER}"
+
+
+def _ms(prop):
+    def handler(value, negative):
+        ms = f"{value}ms" if value in DURATIONS else arbitrary(value)
+        return None if negative or ms is None else f"{prop}:{ms}"
+    return handler
+
+
+def _animation(value, negative):
+    if negative or value not in ANIMATIONS:
+        return None
+    return f"animation:{ANIMATIONS[value][0]}"
+
+
+def _list_style(value, negative):
+    custom = arbitrary(value)
+    return None if negative or custom is None else f"list-style-type:{custom}"
+
+
+_SIZE_EXTRA = {'auto': 'auto', 'full': '100%', 'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content'}
+FUNCTIONAL = {
+    'inset': [('inset', _inset(('inset',)))],
+    'inset-x': [('inset-axis', _inset(('left', 'right')))],
+    'inset-y': [('inset-axis', _inset(('top', 'bottom')))],
+    'top': [('inset-side', _inset(('top',)))],
+    'right': [('inset-side', _inset(('right',)))],
+    'bottom': [('inset-side', _inset(('bottom',)))],
+    'left': [('inset-side', _inset(('left',)))],
+    'z': [('zIndex', _z_index)],
+    'col-span': [('gridColumn', _span('grid-column'))],
+    'row-span': [('gridRow', _span('grid-row'))],
+    'm': [('margin', _sides(('margin',)))],
+    'mx': [('margin-axis', _sides(('margin-left', 'margin-right')))],
+    'my': [('margin-axis', _sides(('margin-top', 'margin-bottom')))],
+    'mt': [('margin-side', _sides(('margin-top',)))],
+    'mr': [('margin-side', _sides(('margin-right',)))],
+    'mb': [('margin-side', _sides(('margin-bottom',)))],
+    'ml': [('margin-side', _sides(('margin-left',)))],
+    'line-clamp': [('lineClamp', _line_clamp)],
+    'aspect': [('aspectRatio', _lookup({}, 'aspect-ratio:{}'))],
+    'size': [('size', lambda v, neg: None if neg or (s := spacing(v, _SIZE_EXTRA, fractions=True)) is None
+              else f"width:{s};height:{s}")],
+    'h': [('height', _size('height', {**_SIZE_EXTRA, 'screen': '100vh', 'dvh': '100dvh'}))],
+    'max-h': [('maxHeight', _size('max-height', {'none': 'none', 'full': '100%', 'screen': '100vh'}))],
+    'min-h': [('minHeight', _size('min-height', {**_SIZE_EXTRA, 'screen': '100vh'}))],
+    'w': [('width', _size('width', {**_SIZE_EXTRA, 'screen': '100vw'}))],
+    'min-w': [('minWidth', _size('min-width', _SIZE_EXTRA))],
+    'max-w': [('maxWidth', _lookup(MAX_WIDTHS, 'max-width:{}'))],
+    'basis': [('flex', _size('flex-basis', _SIZE_EXTRA))],
+    'translate-x': [('translate', _translate('x'))],
+    'translate-y': [('translate', _translate('y'))],
+    'rotate': [('rotate', _rotate)],
+    'scale': [('scale', _scale(('x', 'y')))],
+    'scale-x': [('scale', _scale(('x',)))],
+    'scale-y': [('scale', _scale(('y',)))],
+    'animate': [('animation', _animation)],
+    'scroll-mt': [('scrollMargin', lambda v, neg: None if (s := spacing(v, None, neg)) is None
+                   else f"scroll-margin-top:{s}")],
+    'scroll-pt': [('scrollPadding', lambda v, neg: None if neg or (s := spacing(v)) is None
+                   else f"scroll-padding-top:{s}")],
+    'list': [('listStyleType', _list_style)],
+    'grid-cols': [('gridTemplateColumns', _template('grid-template-columns'))],
+    'grid-rows': [('gridTemplateRows', _template('grid-template-rows'))],
+    'gap': [('gap', lambda v, neg: None if neg or (s := spacing(v)) is None else f"gap:{s}")],
+    'gap-x': [('gap', lambda v, neg: None if neg or (s := spacing(v)) is None else f"column-gap:{s}")],
+    'gap-y': [('gap', lambda v, neg: None if neg or (s := spacing(v)) is None else f"row-gap:{s}")],
+    'space-x': [('space', _space('x'))],
+    'space-y': [('space', _space('y'))],
+    'rounded': [('borderRadius', _radius(('border-radius',)))],
+    'rounded-t': [('borderRadius-side', _radius(('border-top-left-radius', 'border-top-right-radius')))],
+    'rounded-r': [('borderRadius-side', _radius(('border-top-right-radius', 'border-bottom-right-radius')))],
+    'rounded-b': [('borderRadius-side', _radius(('border-bottom-right-radius', 'border-bottom-left-radius')))],
+    'rounded-l': [('borderRadius-side', _radius(('border-top-left-radius', 'border-bottom-left-radius')))],
+    'rounded-tl': [('borderRadius-corner', _radius(('border-top-left-radius',)))],
+    'rounded-tr': [('borderRadius-corner', _radius(('border-top-right-radius',)))],
+    'rounded-br': [('borderRadius-corner', _radius(('border-bottom-right-radius',)))],
+    'rounded-bl': [('borderRadius-corner', _radius(('border-bottom-left-radius',)))],
+    'border': [('borderWidth', _border_width(('border-width',))),
+               ('borderColor', _border_color('border-color'))],
+    'border-x': [('borderWidth-axis', _border_width(('border-left-width', 'border-right-width'))),
+                 ('borderColor-side', _border_color(('border-left-color', 'border-right-color')))],
+    'border-y': [('borderWidth-axis', _border_width(('border-top-width', 'border-bottom-width'))),
+                 ('borderColor-side', _border_color(('border-top-color', 'border-bottom-color')))],
+    'border-opacity': [('borderOpacity', _opacity_scale('--tw-border-opacity:{}'))],
+    'bg': [('backgroundColor', lambda v, neg: None if neg else color_decls(v, 'background-color', '--tw-bg-opacity'))],
+    'bg-opacity': [('backgroundOpacity', _opacity_scale('--tw-bg-opacity:{}'))],
+    'from': [('gradientColorStops', _gradient_stop('from'))],
+    'via': [('gradientColorStops', _gradient_stop('via'))],
+    'to': [('gradientColorStops', _gradient_stop('to'))],
+    'p': [('padding', _sides(('padding',)))],
+    'px': [('padding-axis', _sides(('padding-left', 'padding-right')))],
+    'py': [('padding-axis', _sides(('padding-top', 'padding-bottom')))],
+    'pt': [('padding-side', _sides(('padding-top',)))],
+    'pr': [('padding-side', _sides(('padding-right',)))],
+    'pb': [('padding-side', _sides(('padding-bottom',)))],
+    'pl': [('padding-side', _sides(('padding-left',)))],
+    'text': [('fontSize', _font_size),
+             ('textColor', lambda v, neg: None if neg else color_decls(v, 'color', '--tw-text-opacity'))],
+    'text-opacity': [('textOpacity', _opacity_scale('--tw-text-opacity:{}'))],
+    'leading': [('lineHeight', _lookup(LINE_HEIGHTS, 'line-height:{}'))],
+    'tracking': [('letterSpacing', _lookup(LETTER_SPACING, 'letter-spacing:{}'))],
+    'opacity': [('opacity', _opacity_scale('opacity:{}'))],
+    'shadow': [('boxShadow', _shadow), ('boxShadowColor', _shadow_color)],
+    'ring': [('ringWidth', _ring_width),
+             ('ringColor', lambda v, neg: None if neg else color_decls(v, '--tw-ring-color', '--tw-ring-opacity'))],
+    'ring-opacity': [('ringOpacity', _opacity_scale('--tw-ring-opacity:{}'))],
+    'blur': [('blur', _blur('--tw-blur', FILTER))],
+    'brightness': [('brightness', _filter_percent('--tw-brightness', 'brightness', FILTER))],
+    'drop-shadow': [('dropShadow', _drop_shadow)],
+    'backdrop-blur': [('backdropBlur', _blur('--tw-backdrop-blur', BACKDROP_FILTER))],
+    'duration': [('transitionDuration', _ms('transition-duration'))],
+    'delay': [('transitionDelay', _ms('transition-delay'))],
+}
+for _side, _prop in (('t', 'top'), ('r', 'right'), ('b', 'bottom'), ('l', 'left')):
+    FUNCTIONAL[f"border-{_side}"] = [('borderWidth-side', _border_width((f"border-{_prop}-width",))),
+                                     ('borderColor-side', _border_color(f"border-{_prop}-color"))]
+# Utilities that also exist without a value (`border`, `rounded`, `shadow`, `ring`, `blur`, ...)
+DEFAULT_VALUES = {'border': '1', 'border-x': '1', 'border-y': '1', 'border-t': '1', 'border-r': '1',
+                  'border-b': '1', 'border-l': '1', 'rounded': '', 'shadow': '', 'ring': '3',
+                  'blur': '', 'backdrop-blur': '', 'drop-shadow': ''}
+
+# ================= Variants =================
+# Order matters: it is the order variant rules are emitted in (after the plain utilities)
+PSEUDO_VARIANTS = {
+    'first': ':first-child', 'last': ':last-child', 'odd': ':nth-child(odd)', 'even': ':nth-child(even)',
+    'visited': ':visited', 'open': '[open]', 'focus-within': ':focus-within', 'hover': ':hover',
+    'focus': ':focus', 'focus-visible': ':focus-visible', 'active': ':active', 'disabled': ':disabled',
+}
+GROUP_VARIANTS = {f"group-{name}": pseudo for name, pseudo in PSEUDO_VARIANTS.items()}
+VARIANT_ORDER = {name: i + 1 for i, name in enumerate(list(PSEUDO_VARIANTS) + list(GROUP_VARIANTS))}
+SCREEN_ORDER = {name: i + 1 for i, (name, _) in enumerate(SCREENS)}
+SCREEN_WIDTHS = dict(SCREENS)
+
+
+def split_variants(candidate):
+    """'md:hover:bg-[#fff]' -> (['md', 'hover'], 'bg-[#fff]'); colons inside [...] do not split"""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(candidate):
+        if ch == '[':
+            depth += 1
+        elif ch == ']':
+            depth -= 1
+        elif ch == ':' and depth == 0:
+            parts.append(candidate[start:i])
+            start = i + 1
+    parts.append(candidate[start:])
+    return parts[:-1], parts[-1]
+
+
+def escape_class(name):
+    return re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', name)
+
+
+def resolve_utility(utility):
+    """'border-l-4' -> (plugin, declarations, selector_suffix) or None"""
+    if utility in STATIC:
+        plugin, decls = STATIC[utility]
+        return plugin, decls, ''
+    negative = utility.startswith('-')
+    name = utility[1:] if negative else utility
+    if name in DEFAULT_VALUES:
+        return _apply(name, DEFAULT_VALUES[name], negative)
+    # Try every '-' as the prefix/value boundary, longest prefix first
+    for i in range(len(name) - 1, 0, -1):
+        if name[i] == '-' and name[:i] in FUNCTIONAL:
+            result = _apply(name[:i], name[i + 1:], negative)
+            if result:
+                return result
+    return None
+
+
+def _apply(prefix, value, negative):
+    for plugin, handler in FUNCTIONAL[prefix]:
+        result = handler(value, negative)
+        if result:
+            decls, suffix = result if isinstance(result, tuple) else (result, '')
+            return plugin, decls, suffix
+    return None
+
+
+def compile_candidate(candidate):
+    """
+    One class -> (sort_key, media, selector, declarations, keyframes) or None
+    if it is not a Tailwind class this compiler knows.
+    """
+    if len(candidate) > 200:
+        return None
+    variants, utility = split_variants(candidate)
+    resolved = resolve_utility(utility)
+    if resolved is None:
+        return None
+    plugin, decls, suffix = resolved
+
+    screen, pseudo, group, order = None, '', '', []
+    for variant in variants:
+        if variant in SCREEN_ORDER and screen is None:
+            screen = variant
+        elif variant in PSEUDO_VARIANTS:
+            pseudo += PSEUDO_VARIANTS[variant]
+            order.append(VARIANT_ORDER[variant])
+        elif variant in GROUP_VARIANTS and not group:
+            group = f".group{GROUP_VARIANTS[variant]} "
+            order.append(VARIANT_ORDER[variant])
+        else:
+            return None
+
+    selector = f"{group}.{escape_class(candidate)}{pseudo}{suffix}"
+    media = f"(min-width: {SCREEN_WIDTHS[screen]})" if screen else None
+    keyframes = ANIMATIONS[utility[len('animate-'):]][1] if plugin == 'animation' else None
+    sort_key = (SCREEN_ORDER.get(screen, 0), tuple(sorted(order)), PLUGIN_INDEX[plugin], candidate)
+    return sort_key, media, selector, decls, keyframes
+
+
+def compile_css(candidates, extra_css='', preflight=PREFLIGHT):
+    """
+    Compile a set of candidates into the full stylesheet text:
+    `preflight`, then `extra_css` (plain site rules), then the used utilities
+    (last, so utilities still win over the extra rules).
+    """
+    rules = sorted(filter(None, (compile_candidate(c) for c in candidates)))
+    lines = ["/* Generated by build.py (tailwind_css.py, Tailwind v3 default theme) - do not edit */"]
+    if preflight:
+        lines.append(preflight.rstrip('\n'))
+    if extra_css:
+        lines.append(extra_css.strip())
+    emitted_keyframes = set()
+    current_media = None
+    for _, media, selector, decls, keyframes in rules:
+        if media != current_media:
+            if current_media:
+                lines.append('}')
+            if media:
+                lines.append(f"@media {media}{{")
+            current_media = media
+        if keyframes and keyframes not in emitted_keyframes:
+            emitted_keyframes.add(keyframes)
+            lines.append(keyframes)
+        lines.append(f"{selector}{{{decls}}}")
+    if current_media:
+        lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+# ================= Build Integration =================
+CANDIDATE_RE = re.compile(r'[^\s"\'`<>={}]+')
+
+
+def extract_candidates(text):
+    """Every token that compiles to CSS (class attributes, classList strings, Python string literals alike)"""
+    return {token for token in set(CANDIDATE_RE.findall(text)) if compile_candidate(token)}
+
+
+def load_cache(path=CACHE_FILE):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == COMPILER_VERSION:
+            return data.get('files', {})
+    return {}
+
+
+def save_cache(files, path=CACHE_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': COMPILER_VERSION, 'files': files}, f, ensure_ascii=False)
+
+
+def build_stylesheet(sources, assets_dir=ASSETS_DIR, cache_path=CACHE_FILE, extra_css=''):
+    """
+    Scan `sources` (reusing cached candidate sets for files whose content hash
+    did not change), write assets/tailwind.<hash>.css and delete older builds.
+    Returns (href, stats).
+    """
+    cache = load_cache(cache_path)
+    files = {}
+    scanned = 0
+    for path in sources:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        key = path.replace(os.sep, '/')
+        entry = cache.get(key)
+        if not entry or entry['sha1'] != digest:
+            entry = {'sha1': digest, 'classes': sorted(extract_candidates(raw.decode('utf-8', 'ignore')))}
+            scanned += 1
+        files[key] = entry
+    if scanned or set(files) != set(cache):
+        save_cache(files, cache_path)
+
+    candidates = set()
+    for entry in files.values():
+        candidates.update(entry['classes'])
+    css = compile_css(candidates, extra_css)
+    name = f"{STYLESHEET_PREFIX}{hashlib.sha1(css.encode('utf-8')).hexdigest()[:10]}.css"
+    path = os.path.join(assets_dir, name)
+    if not os.path.exists(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(css)
+    for old in glob.glob(os.path.join(assets_dir, f"{STYLESHEET_PREFIX}*.css")):
+        if os.path.basename(old) != name:
+            os.remove(old)
+
+    href = f"/{assets_dir}/{name}"
+    return href, {'classes': len(candidates), 'bytes': len(css.encode('utf-8')), 'scanned': scanned}
+
+
+CDN_SCRIPT_RE = re.compile(r'[ \t]*<script[^>]*src="https://' + re.escape(CDN_HOST) + r'[^"]*"[^>]*>\s*</script>\n?')
+CDN_PRECONNECT_RE = re.compile(r'[ \t]*<link(?=[^>]*rel="preconnect")[^>]*href="https://' + re.escape(CDN_HOST)
+                               + r'"[^>]*/?>\n?')
+STYLESHEET_HREF_RE = re.compile(r'/' + re.escape(ASSETS_DIR) + r'/' + re.escape(STYLESHEET_PREFIX) + r'[0-9a-f]+\.css')
+HEAD_CLOSE_RE = re.compile(r'\n?[ \t]*</head>')
+
+
+def link_stylesheet(paths, href):
+    """
+    Point every page at the compiled stylesheet: the CDN <script> (and its
+    preconnect) is replaced by a <link> at the end of <head> - where the
+    runtime injected its <style>, so the cascade against inline styles is
+    unchanged - and links to an older build get the new hash.
+    Returns the number of files rewritten.
+    """
+    link = f'<link href="{href}" rel="stylesheet"/>'
+    changed = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        updated = STYLESHEET_HREF_RE.sub(href, html)
+        if CDN_SCRIPT_RE.search(updated):
+            updated = CDN_SCRIPT_RE.sub('', updated)
+            updated = CDN_PRECONNECT_RE.sub('', updated)
+            if href not in updated:
+                updated = HEAD_CLOSE_RE.sub(lambda m: f"\n  {link}\n </head>", updated, count=1)
+        if updated != html:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(updated)
+            changed += 1
+    return changed